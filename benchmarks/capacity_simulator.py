@@ -0,0 +1,367 @@
+#!/usr/bin/env python
+import argparse
+import heapq
+import json
+import os
+import random
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium_respectful import RespectfulWebdriver, MemoryBackend, SeleniumRespectfulRateLimitedError
+
+from common import StubWebDriver, percentile
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
+
+class VirtualClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class Call(object):
+
+    def __init__(self, index, at, url, realms, priority=0):
+        self.index = index
+        self.at = at
+        self.url = url
+        self.realms = realms
+        self.priority = priority
+
+        self.started_at = None
+        self.loaded_at = None
+        self.completed_at = None
+        self.reservation = None
+        self.ticket = None
+        self.deadline = None
+        self.turn = 0
+        self.dropped = False
+
+
+class Simulation(object):
+
+    def __init__(self, arguments, realms, calls):
+        self.arguments = arguments
+        self.calls = calls
+
+        self.clock = VirtualClock()
+        self.backend = MemoryBackend(clock=self.clock)
+        self.rng = random.Random(arguments.seed)
+
+        # Each worker drives a RespectfulWebdriver of its own on the virtual clock, with its own leases and
+        # throttled realms, around a stub WebDriver
+        self.drivers = [
+            self._driver(StubWebDriver(arguments.latency, arguments.latency_jitter, self.rng))
+            for _ in range(arguments.workers)
+        ]
+
+        self._events = list()
+        self._sequence = 0
+        self._pending = list()
+        self._next_pending = 0
+        self._waiting = dict()
+
+        for realm, realm_info in realms:
+            self.backend.register_realm(realm, realm_info)
+
+    def run(self):
+        for call in self.calls:
+            self._schedule(call.at, self._arrive, call)
+
+        while len(self._events):
+            at, _, handler, args = heapq.heappop(self._events)
+
+            self.clock.now = at
+            handler(*args)
+
+            self._wake_waiters()
+
+        return self.calls
+
+    def _driver(self, webdriver):
+        driver = RespectfulWebdriver(webdriver=webdriver, backend=self.backend, clock=self.clock)
+        driver.config = dict(
+            driver.config,
+            safety_threshold=self.arguments.safety_threshold,
+            queue_ttl=self.arguments.queue_ttl,
+            concurrency_ttl=self.arguments.concurrency_ttl,
+            lease_size=self.arguments.lease_size,
+            lease_ttl=self.arguments.lease_ttl
+        )
+
+        return driver
+
+    def _schedule(self, at, handler, *args):
+        self._sequence += 1
+        heapq.heappush(self._events, (at, self._sequence, handler, args))
+
+    def _arrive(self, call):
+        self._pending.append(call)
+        self._dispatch()
+
+    def _dispatch(self):
+        while len(self.drivers) and self._next_pending < len(self._pending):
+            call = self._pending[self._next_pending]
+            self._next_pending += 1
+
+            driver = self.drivers.pop()
+
+            # Like a worker blocked in a get call with wait switched on, it holds its WebDriver until it's served.
+            # Calls are dropped once they waited for max_wait since they arrived, whether for a worker or a slot
+            call.started_at = self.clock.now
+            call.deadline = None if self.arguments.max_wait is None else call.at + self.arguments.max_wait
+
+            if call.deadline is not None and self.clock.now > call.deadline:
+                self._drop(call, driver)
+                continue
+
+            # Without max_wait, calls don't wait and go through the throttled realms the driver remembers
+            if self.arguments.max_wait != 0:
+                call.ticket = driver._wait_ticket(call.priority)
+                call.ticket.enqueued_at = self.clock.now
+
+            self._attempt(call, driver)
+
+    def _attempt(self, call, driver):
+        reservation = driver._reserve_request(call.realms, ticket=call.ticket, priority=call.priority)
+
+        if reservation.reserved:
+            call.reservation = reservation
+            call.loaded_at = self.clock.now
+
+            self._schedule(self.clock.now + driver.webdriver.get(call.url), self._complete, call, driver)
+            return
+
+        if call.ticket is None:
+            self._drop(call, driver)
+            return
+
+        try:
+            delay = driver._retry_delay(driver._rate_limited_error(reservation), call.deadline)
+        except SeleniumRespectfulRateLimitedError:
+            self._drop(call, driver)
+            return
+
+        # Like RespectfulWebdriver._wait_turn, calls held back by waiters ahead of them or by the requests in flight
+        # on a realm are woken as soon as their turn comes, and others sleep for their retry delay. Waits rounding
+        # down to 0 at the edge of a window would retry at the same virtual instant forever
+        if call.ticket.blocked_on is not None:
+            self._waiting[call.ticket.id] = (call, driver)
+
+        self._schedule(self.clock.now + max(delay, 0.001), self._retry, call, driver, call.turn)
+
+    def _retry(self, call, driver, turn):
+        if turn != call.turn:
+            return
+
+        call.turn += 1
+        self._waiting.pop(call.ticket.id, None)
+
+        self._attempt(call, driver)
+
+    def _wake_waiters(self):
+        for ticket_id, (call, driver) in list(self._waiting.items()):
+            if self.backend.wait_turn(call.ticket, 0):
+                del self._waiting[ticket_id]
+
+                call.turn += 1
+                self._schedule(self.clock.now, self._retry, call, driver, call.turn)
+
+    def _drop(self, call, driver):
+        call.dropped = True
+
+        if call.ticket is not None:
+            self.backend.leave_queue(call.realms, call.ticket)
+
+        self._release(driver)
+
+    def _complete(self, call, driver):
+        call.completed_at = self.clock.now
+
+        driver.release_request(call.reservation)
+        self._release(driver)
+
+    def _release(self, driver):
+        self.drivers.append(driver)
+        self._dispatch()
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Replays a trace of get calls against the limiter on a virtual clock, to plan realm limits and "
+                    "worker counts offline"
+    )
+
+    parser.add_argument("--trace", help="JSON lines of {\"at\": seconds, \"realms\": [...], \"url\": ..., "
+                                        "\"priority\": ...} calls. Defaults to a synthetic trace")
+    parser.add_argument("--duration", type=float, default=3600, help="Seconds of synthetic traffic")
+    parser.add_argument("--rate", type=float, default=1, help="Synthetic calls per second, spread across the realms")
+    parser.add_argument("--seed", type=int, default=0)
+
+    parser.add_argument("--realm", action="append", dest="realms", type=realm_spec,
+                        help="NAME:MAX_REQUESTS:TIMESPAN[:MAX_CONCURRENT]. Can be repeated")
+    parser.add_argument("--algorithm", choices=RespectfulWebdriver.algorithms, default="sliding_window_log")
+    parser.add_argument("--safety-threshold", type=int, default=0)
+    parser.add_argument("--workers", type=int, default=8, help="WebDrivers performing calls in parallel")
+    parser.add_argument("--latency", type=float, default=2, help="Mean page load seconds")
+    parser.add_argument("--latency-jitter", type=float, default=0.5,
+                        help="Spread of page loads around the mean, as a fraction of it")
+    parser.add_argument("--max-wait", type=float, default=None,
+                        help="Seconds after its arrival a call is dropped at, if it wasn't served. Waits for as long as "
+                             "needed by default, and not at all with 0")
+    parser.add_argument("--queue-ttl", type=float, default=RespectfulWebdriver.default_config["queue_ttl"])
+    parser.add_argument("--concurrency-ttl", type=float, default=RespectfulWebdriver.default_config["concurrency_ttl"])
+    parser.add_argument("--lease-size", type=int, default=RespectfulWebdriver.default_config["lease_size"])
+    parser.add_argument("--lease-ttl", type=float, default=RespectfulWebdriver.default_config["lease_ttl"])
+
+    parser.add_argument("--json", action="store_true", help="Prints the report as a single JSON object")
+
+    arguments = parser.parse_args()
+    arguments.realms = arguments.realms or [realm_spec("Simulated:60:60")]
+
+    return arguments
+
+
+def realm_spec(value):
+    parts = value.split(":")
+
+    if len(parts) not in (3, 4):
+        raise argparse.ArgumentTypeError("Expected NAME:MAX_REQUESTS:TIMESPAN[:MAX_CONCURRENT], got '%s'" % value)
+
+    return parts[0], [int(part) for part in parts[1:]]
+
+
+def build_realms(arguments):
+    realms = list()
+
+    for realm, values in arguments.realms:
+        realm_info = {"max_requests": values[0], "timespan": values[1], "algorithm": arguments.algorithm}
+
+        if len(values) > 2:
+            realm_info["max_concurrent"] = values[2]
+
+        realms.append((realm, realm_info))
+
+    return realms
+
+
+def load_calls(arguments, realms):
+    if arguments.trace is not None:
+        with open(arguments.trace, "r") as f:
+            entries = [json.loads(line) for line in f if line.strip()]
+
+        entries.sort(key=lambda entry: entry["at"])
+
+        return [
+            Call(i, float(entry["at"]), entry.get("url", ""), entry["realms"], priority=entry.get("priority", 0))
+            for i, entry in enumerate(entries)
+        ]
+
+    rng = random.Random(arguments.seed)
+    realm_names = [realm for realm, _ in realms]
+
+    calls = list()
+    at = rng.expovariate(arguments.rate)
+
+    while at < arguments.duration:
+        realm = rng.choice(realm_names)
+        calls.append(Call(len(calls), at, "http://%s.simulated/%d" % (realm.lower(), len(calls)), [realm]))
+
+        at += rng.expovariate(arguments.rate)
+
+    return calls
+
+
+def report(arguments, realms, calls, wall_seconds):
+    served = [call for call in calls if call.reservation is not None]
+
+    start = min([call.at for call in calls]) if len(calls) else 0
+    end = max([call.at for call in calls] + [call.loaded_at for call in served]) if len(calls) else 0
+    duration = max(end - start, 1e-9)
+
+    result = dict(summarize(served, duration), **{
+        "virtual_seconds": end - start,
+        "wall_seconds": wall_seconds,
+        "calls": len(calls),
+        "dropped": len([call for call in calls if call.dropped]),
+        "realms": dict()
+    })
+
+    for realm, realm_info in realms:
+        realm_served = [call for call in served if realm in call.realms]
+
+        result["realms"][realm] = dict(summarize(realm_served, duration), **{
+            "calls": len([call for call in calls if realm in call.realms]),
+            "max_requests": realm_info["max_requests"],
+            "timespan": realm_info["timespan"],
+            "utilization": len(realm_served) / (realm_info["max_requests"] * duration / realm_info["timespan"])
+        })
+
+    return result
+
+
+def summarize(served, duration):
+    delays = sorted(call.loaded_at - call.at for call in served)
+
+    return {
+        "served": len(served),
+        "throughput": len(served) / duration,
+        "delay_p50": percentile(delays, 50),
+        "delay_p95": percentile(delays, 95),
+        "delay_p99": percentile(delays, 99),
+        "delay_max": delays[-1] if len(delays) else 0
+    }
+
+
+def main():
+    arguments = parse_arguments()
+
+    realms = build_realms(arguments)
+    calls = load_calls(arguments, realms)
+
+    started_at = monotonic()
+    Simulation(arguments, realms, calls).run()
+
+    result = report(arguments, realms, calls, monotonic() - started_at)
+
+    if arguments.json:
+        print(json.dumps(result, sort_keys=True))
+        return
+
+    print("%d calls over %.0f virtual seconds, simulated in %.2f seconds, %d workers, %.2fs mean page load" % (
+        result["calls"], result["virtual_seconds"], result["wall_seconds"], arguments.workers, arguments.latency
+    ))
+
+    columns = [
+        ("calls", "%8d"), ("served", "%8d"), ("throughput", "%9.3f"), ("utilization", "%6.1f%%"),
+        ("delay_p50", "%9.2f"), ("delay_p95", "%9.2f"), ("delay_p99", "%9.2f"), ("delay_max", "%9.2f")
+    ]
+
+    headers = ["calls", "served", "gets/s", "quota", "p50 s", "p95 s", "p99 s", "max s"]
+    width = max([len(realm) for realm, _ in realms] + [len("total")])
+
+    print(" ".join(["realm".ljust(width)] + [header.rjust(len(fmt % 0)) for header, (_, fmt) in zip(headers, columns)]))
+
+    for realm, _ in realms:
+        realm_result = dict(result["realms"][realm], utilization=100 * result["realms"][realm]["utilization"])
+        print(" ".join([realm.ljust(width)] + [fmt % realm_result[key] for key, fmt in columns]))
+
+    # Quota utilization is only meaningful per realm
+    print(" ".join(["total".ljust(width)] + [
+        fmt % result[key] if key in result else "-".rjust(len(fmt % 0)) for key, fmt in columns
+    ]))
+
+    if result["dropped"]:
+        print("%d calls dropped, not served within %s seconds of their arrival" % (result["dropped"], arguments.max_wait))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+import math
+import random
+
+from selenium.webdriver.remote.webdriver import WebDriver
+
+
+class StubWebDriver(WebDriver):
+
+    def __init__(self, latency=0, jitter=0, rng=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.rng = rng or random.Random()
+        self.url = None
+
+    @property
+    def current_url(self):
+        return self.url
+
+    @property
+    def page_source(self):
+        return "<html></html>"
+
+    def get(self, url):
+        self.url = url
+
+        return self.load_seconds()
+
+    def load_seconds(self):
+        return max(self.latency * (1 + self.rng.uniform(-self.jitter, self.jitter)), 0)
+
+    def quit(self):
+        pass
+
+
+def percentile(values, percent):
+    if not values:
+        return 0
+
+    return values[min(int(math.ceil(percent / 100.0 * len(values))) - 1, len(values) - 1)]
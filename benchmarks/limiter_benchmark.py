@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+import argparse
+import itertools
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from selenium_respectful import RespectfulWebdriver, MemoryBackend, RedisBackend
+from selenium_respectful import SeleniumRespectfulRateLimitedError
+
+from common import StubWebDriver, percentile
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
+
+REALM_PREFIX = "Benchmark"
+FILLER_REALM = "BenchmarkFiller"
+
+
+def parse_arguments():
+    parser = argparse.ArgumentParser(
+        description="Measures the overhead of the rate limiter on get calls, offline, with a stub WebDriver"
+    )
+
+    parser.add_argument("--backend", choices=["memory", "redis"], default="memory")
+    parser.add_argument("--host", default="localhost")
+    parser.add_argument("--port", type=int, default=6379)
+    parser.add_argument("--database", type=int, default=15)
+    parser.add_argument("--prefix", default="SeleniumRespectfulBenchmark")
+
+    parser.add_argument("--db-sizes", type=int_list, default=[0, 10000, 100000],
+                        help="Amounts of unrelated requests (or keys, on Redis) stored before measuring")
+    parser.add_argument("--realm-counts", type=int_list, default=[1, 100],
+                        help="Amounts of registered realms requests are spread across")
+    parser.add_argument("--realms-per-request", type=int_list, default=[1, 3])
+    parser.add_argument("--workers", type=int_list, default=[1, 4, 16],
+                        help="Amounts of threads performing requests, each with its own driver")
+
+    parser.add_argument("--requests", type=int, default=1000, help="Requests performed by each worker")
+    parser.add_argument("--algorithm", choices=RespectfulWebdriver.algorithms, default="sliding_window_log")
+    parser.add_argument("--max-requests", type=int, default=10 ** 9,
+                        help="Limit of each realm. Defaults to one requests never hit, to measure the overhead alone")
+    parser.add_argument("--timespan", type=int, default=60)
+    parser.add_argument("--lease-size", type=int, default=1)
+
+    parser.add_argument("--json", action="store_true", help="Prints one JSON object per scenario")
+
+    return parser.parse_args()
+
+
+def int_list(value):
+    return [int(item) for item in value.split(",") if item.strip()]
+
+
+def build_backend(arguments):
+    if arguments.backend == "redis":
+        backend = RedisBackend(
+            host=arguments.host,
+            port=arguments.port,
+            database=arguments.database,
+            prefix=arguments.prefix
+        )
+
+        backend.warmup()
+
+        return backend
+
+    return MemoryBackend()
+
+
+def populate(backend, db_size, arguments):
+    if not db_size:
+        return
+
+    if isinstance(backend, RedisBackend):
+        # Unrelated keys are what used to slow down SCAN-based checks
+        for start in range(0, db_size, 10000):
+            pipeline = backend.redis.pipeline(transaction=False)
+
+            for i in range(start, min(start + 10000, db_size)):
+                pipeline.set("%s:FILLER:%d" % (arguments.prefix, i), i)
+
+            pipeline.execute()
+    else:
+        backend.register_realm(FILLER_REALM, {"max_requests": db_size, "timespan": 3600})
+        backend.reserve([FILLER_REALM], request_id="filler", amount=db_size)
+
+
+def cleanup(backend, arguments):
+    for realm in backend.fetch_registered_realms():
+        if realm.startswith(REALM_PREFIX):
+            backend.unregister_realm(realm)
+
+    if isinstance(backend, RedisBackend):
+        keys = list(backend.redis.scan_iter(match="%s:FILLER:*" % arguments.prefix, count=10000))
+
+        for start in range(0, len(keys), 10000):
+            backend.redis.delete(*keys[start:start + 10000])
+
+
+def run_scenario(arguments, db_size, realm_count, realms_per_request, workers):
+    backend = build_backend(arguments)
+
+    cleanup(backend, arguments)
+    populate(backend, db_size, arguments)
+
+    realms = ["%s%d" % (REALM_PREFIX, i) for i in range(realm_count)]
+
+    for realm in realms:
+        backend.register_realm(realm, {
+            "max_requests": arguments.max_requests,
+            "timespan": arguments.timespan,
+            "algorithm": arguments.algorithm
+        })
+
+    drivers = list()
+
+    for _ in range(workers):
+        driver = RespectfulWebdriver(webdriver=StubWebDriver(), backend=backend)
+        driver.config["lease_size"] = arguments.lease_size
+
+        drivers.append(driver)
+
+    latencies = [list() for _ in range(workers)]
+    rejections = [0] * workers
+
+    start_barrier = threading.Barrier(workers + 1) if hasattr(threading, "Barrier") else None
+
+    def work(index):
+        driver = drivers[index]
+        offsets = itertools.cycle(range(realm_count))
+
+        for _ in range(index):
+            next(offsets)
+
+        if start_barrier is not None:
+            start_barrier.wait()
+
+        for _ in range(arguments.requests):
+            offset = next(offsets)
+            request_realms = [realms[(offset + j) % realm_count] for j in range(min(realms_per_request, realm_count))]
+
+            started_at = monotonic()
+
+            try:
+                driver.get("http://benchmark.local/", realms=request_realms)
+            except SeleniumRespectfulRateLimitedError:
+                rejections[index] += 1
+
+            latencies[index].append(monotonic() - started_at)
+
+    threads = [threading.Thread(target=work, args=(i,)) for i in range(workers)]
+
+    for thread in threads:
+        thread.start()
+
+    if start_barrier is not None:
+        start_barrier.wait()
+
+    started_at = monotonic()
+
+    for thread in threads:
+        thread.join()
+
+    elapsed = monotonic() - started_at
+
+    for driver in drivers:
+        driver.release_leases()
+
+    cleanup(backend, arguments)
+
+    latencies = sorted(itertools.chain.from_iterable(latencies))
+
+    return {
+        "backend": arguments.backend,
+        "algorithm": arguments.algorithm,
+        "db_size": db_size,
+        "realm_count": realm_count,
+        "realms_per_request": realms_per_request,
+        "workers": workers,
+        "requests": len(latencies),
+        "rejected": sum(rejections),
+        "throughput": len(latencies) / elapsed if elapsed else float("inf"),
+        "mean_ms": 1000 * sum(latencies) / len(latencies),
+        "p50_ms": 1000 * percentile(latencies, 50),
+        "p95_ms": 1000 * percentile(latencies, 95),
+        "p99_ms": 1000 * percentile(latencies, 99)
+    }
+
+
+def main():
+    arguments = parse_arguments()
+
+    columns = [
+        ("db_size", "%10d"), ("realm_count", "%7d"), ("realms_per_request", "%8d"), ("workers", "%7d"),
+        ("throughput", "%12.1f"), ("mean_ms", "%9.3f"), ("p50_ms", "%9.3f"), ("p95_ms", "%9.3f"),
+        ("p99_ms", "%9.3f"), ("rejected", "%8d")
+    ]
+
+    headers = ["db size", "realms", "per req", "workers", "gets/s", "mean ms", "p50 ms", "p95 ms", "p99 ms", "rejected"]
+
+    if not arguments.json:
+        print("%s backend, %s, lease_size=%d" % (arguments.backend, arguments.algorithm, arguments.lease_size))
+        print(" ".join(header.rjust(len(fmt % 0)) for header, (_, fmt) in zip(headers, columns)))
+
+    scenarios = itertools.product(
+        arguments.db_sizes, arguments.realm_counts, arguments.realms_per_request, arguments.workers
+    )
+
+    for db_size, realm_count, realms_per_request, workers in scenarios:
+        result = run_scenario(arguments, db_size, realm_count, realms_per_request, workers)
+
+        if arguments.json:
+            print(json.dumps(result, sort_keys=True))
+        else:
+            print(" ".join(fmt % result[key] for key, fmt in columns))
+
+        sys.stdout.flush()
+
+
+if __name__ == "__main__":
+    main()
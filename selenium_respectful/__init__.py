@@ -1,2 +1,12 @@
 from .exceptions import *
+from .metrics import MetricsSink, PrometheusMetricsSink
+from .page_result import PageResult
+from .page_cache import PageCache, RedisPageStore, FilePageStore
+from .backends import MemoryBackend, FileBackend, RedisBackend
 from .respectful_webdriver import RespectfulWebdriver
+from .respectful_webdriver_pool import RespectfulWebdriverPool
+
+try:
+    from .async_respectful_webdriver import AsyncRespectfulWebdriver
+except (ImportError, SyntaxError):  # Python 2 or redis-py without asyncio support
+    pass
@@ -0,0 +1,397 @@
+from .exceptions import SeleniumRespectfulRateLimitedError
+
+from .backends import Backend, MemoryBackend, AsyncRedisBackend, AsyncBackendAdapter
+
+from .respectful_webdriver import RespectfulWebdriver
+
+import asyncio
+import functools
+import itertools
+import uuid
+
+
+class AsyncRespectfulWebdriver(RespectfulWebdriver):
+
+    def __init__(self, **kwargs):
+        self.executor = kwargs.pop("executor", None)
+
+        backend = kwargs.pop("backend", None)
+
+        if backend is not None and not backend.asynchronous:
+            backend = AsyncBackendAdapter(backend, executor=self.executor)
+
+        super(AsyncRespectfulWebdriver, self).__init__(backend=backend, **kwargs)
+
+    def __getattr__(self, attr):
+        if attr == "get":
+            return getattr(self, "_selenium_webdriver_proxy_%s" % attr)
+
+        value = getattr(self.webdriver, attr)
+
+        if not callable(value):
+            return value
+
+        async def run_in_executor(*args, **kwargs):
+            return await self.run(functools.partial(value, *args, **kwargs))
+
+        return run_in_executor
+
+    async def run(self, func):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, func)
+
+    async def get_many(self, requests, lookahead=50):
+        requests = iter(requests)
+        pending = list()
+
+        while True:
+            for request in itertools.islice(requests, lookahead - len(pending)):
+                url, realms = request if isinstance(request, (tuple, list)) else (request, None)
+                page_result = None if self.page_cache is None else await self._cached_page(url)
+
+                if page_result is not None:
+                    yield page_result
+                    continue
+
+                if realms is None:
+                    realms = await self.resolve_realms(url)
+
+                pending.append([url, self._request_realms(realms, list()), None])
+
+            if not len(pending):
+                return
+
+            retry_at = None
+
+            for request in pending:
+                url, realms, ready_at = request
+
+                if ready_at is not None and ready_at > self.clock():
+                    retry_at = ready_at if retry_at is None else min(retry_at, ready_at)
+                    continue
+
+                try:
+                    await self._perform_webdriver_get(lambda: self.webdriver.get(url), realms=realms)
+                except SeleniumRespectfulRateLimitedError as e:
+                    retry_at = self._defer_request(request, e, retry_at)
+                    continue
+
+                pending.remove(request)
+
+                yield await self._fetched_page(url, realms)
+                break
+            else:
+                await asyncio.sleep(max(retry_at - self.clock(), 0))
+
+    async def resolve_realms(self, url):
+        if self._realm_index is None:
+            realms_info = await self.backend.fetch_realms_info(await self.fetch_registered_realms())
+            self._realm_index = self._build_realm_index(realms_info)
+
+        return self._realm_index.match(url)
+
+    async def register_realm(self, realm, max_requests, timespan, algorithm="sliding_window_log", patterns=None,
+                             min_requests=None, windows=None, max_concurrent=None, priority_shares=None):
+        realm_info = self._realm_info(
+            max_requests, timespan, algorithm=algorithm, patterns=patterns, min_requests=min_requests, windows=windows,
+            max_concurrent=max_concurrent, priority_shares=priority_shares
+        )
+
+        if await self.backend.register_realm(realm, realm_info):
+            self._clear_realms_cache()
+
+        return True
+
+    async def register_realms(self, realm_tuples):
+        realms_info = [(realm_tuple[0], self._realm_info(*realm_tuple[1:])) for realm_tuple in realm_tuples]
+
+        if len(await self.backend.register_realms(realms_info)):
+            self._clear_realms_cache()
+
+        return True
+
+    async def update_realm(self, realm, **kwargs):
+        realm_info = await self.backend.fetch_realm_info(realm) if self._updates_bounds(kwargs) else dict()
+        updates = self._realm_updates(kwargs, realm_info)
+
+        if len(updates) and await self.backend.update_realm(realm, updates):
+            self._clear_realms_cache()
+
+        return True
+
+    async def unregister_realm(self, realm):
+        await self.backend.unregister_realm(realm)
+        self._clear_realms_cache()
+
+        return True
+
+    async def unregister_realms(self, realms):
+        await self.backend.unregister_realms(list(realms))
+        self._clear_realms_cache()
+
+        return True
+
+    async def fetch_registered_realms(self):
+        await self._validate_realms_cache()
+
+        if self._registered_realms_cache is None:
+            self._registered_realms_cache = await self.backend.fetch_registered_realms()
+
+        return list(self._registered_realms_cache)
+
+    async def realm_max_requests(self, realm):
+        return (await self._fetch_realm_info(realm))["max_requests"]
+
+    async def realm_timespan(self, realm):
+        return (await self._fetch_realm_info(realm))["timespan"]
+
+    async def realm_algorithm(self, realm):
+        return (await self._fetch_realm_info(realm))["algorithm"]
+
+    async def realm_patterns(self, realm):
+        return (await self._fetch_realm_info(realm))["patterns"]
+
+    async def realm_min_requests(self, realm):
+        return (await self._fetch_realm_info(realm))["min_requests"]
+
+    async def realm_windows(self, realm):
+        return [tuple(window) for window in (await self._fetch_realm_info(realm))["windows"]]
+
+    async def realm_max_concurrent(self, realm):
+        return (await self._fetch_realm_info(realm))["max_concurrent"]
+
+    async def realm_priority_shares(self, realm):
+        return dict((priority, share) for priority, share in (await self._fetch_realm_info(realm))["priority_shares"])
+
+    async def realm_current_max_requests(self, realm):
+        return Backend.effective_max_requests(await self.backend.fetch_realm_info(realm))
+
+    async def adapt_rates(self, realms, throttled):
+        rates = dict()
+
+        for realm in realms:
+            if (await self._fetch_realm_info(realm)).get("min_requests") is None:
+                continue
+
+            started_at = self.clock()
+
+            rates[realm] = await self.backend.adapt_rate(realm, throttled, **self._adapt_rate_kwargs())
+
+            if self.metrics.enabled:
+                self._record_round_trip("adapt", started_at)
+
+        return rates
+
+    async def realms_status(self, realms=None):
+        if realms is None:
+            realms = await self.fetch_registered_realms()
+
+        if not len(realms):
+            return dict()
+
+        return self._realms_status(await self._reserve_requests(list(realms)))
+
+    async def migrate_legacy_requests(self, realms=None):
+        if realms is None:
+            realms = await self.fetch_registered_realms()
+
+        return await self.backend.migrate_legacy_requests(realms)
+
+    async def warmup(self):
+        await self.backend.warmup()
+
+        realms = await self.fetch_registered_realms()
+        self._realms_cache.update(await self.backend.fetch_realms_info(realms))
+
+        return True
+
+    async def release_leases(self):
+        for lease in self._pop_leases():
+            await self._release_lease(lease)
+
+        return True
+
+    async def reserve_request(self, realms, wait=False, max_wait=None, priority=0):
+        priority = self._request_priority(priority)
+
+        if not wait:
+            return self._granted_reservation(await self._reserve_request(realms, priority=priority))
+
+        deadline = self._wait_deadline(max_wait)
+        ticket = self._wait_ticket(priority)
+        waited = 0
+
+        try:
+            while True:
+                reservation = await self._reserve_request(realms, ticket=ticket, priority=priority)
+
+                if reservation.reserved:
+                    return reservation
+
+                delay = self._retry_delay(self._rate_limited_error(reservation), deadline)
+
+                waited_at = self.clock()
+                await self._wait_turn(ticket, delay)
+                waited += self.clock() - waited_at
+        finally:
+            if not ticket.served:
+                await self.backend.leave_queue(realms, ticket)
+
+            if self.metrics.enabled:
+                self.metrics.observe("wait_seconds", waited)
+
+    async def release_request(self, reservation):
+        await self._release_concurrency(reservation)
+
+        return True
+
+    def _build_backend(self):
+        if self.config["backend"] == "memory":
+            return AsyncBackendAdapter(MemoryBackend.shared(), executor=self.executor)
+
+        return AsyncRedisBackend(**self._redis_backend_kwargs())
+
+    async def _can_perform_get(self, realm):
+        return not len((await self._reserve_requests([realm])).rate_limited_realms)
+
+    async def _fetch_realm_info(self, realm):
+        await self._validate_realms_cache()
+
+        if realm not in self._realms_cache:
+            self._realms_cache[realm] = await self.backend.fetch_realm_info(realm)
+
+        return self._realms_cache[realm]
+
+    async def _validate_realms_cache(self, realms_version=None):
+        if realms_version is None:
+            if self._realms_cache_is_fresh():
+                return
+
+            realms_version = await self.backend.realms_version()
+
+        self._track_realms_version(realms_version)
+
+    async def _requests_in_timespan(self, realm):
+        return (await self._reserve_requests([realm])).counts[realm]
+
+    async def _reserve_requests(self, realms, request_uuid=None, amount=1, ticket=None, priority=0):
+        started_at = self.clock()
+
+        reservation = await self.backend.reserve(realms, **self._reserve_kwargs(request_uuid, amount, ticket, priority))
+
+        self._track_reservation(reservation, request_uuid, ticket, started_at)
+        await self._validate_realms_cache(realms_version=reservation.realms_version)
+        self._remember_throttled_realms(reservation, priority)
+
+        return reservation
+
+    async def _selenium_webdriver_proxy_get(self, *args, **kwargs):
+        url = self._get_url(args, kwargs)
+
+        if self.page_cache is not None:
+            page_result = await self._cached_page(url)
+
+            if page_result is not None:
+                return page_result
+
+        realms, additional_realms, wait, max_wait, priority = self._pop_get_options(kwargs)
+
+        if realms is None:
+            realms = await self.resolve_realms(url)
+
+        realms = self._request_realms(realms, additional_realms)
+
+        result = await self._webdriver_get(
+            lambda: self.webdriver.get(*args, **kwargs), realms=realms, wait=wait, max_wait=max_wait, priority=priority)
+
+        if self.page_cache is None:
+            return result
+
+        return await self._fetched_page(url, realms)
+
+    async def _webdriver_get(self, get_func, realms=None, wait=False, max_wait=None, priority=0):
+        return await self._perform_webdriver_get(
+            get_func, realms=realms, wait=wait, max_wait=max_wait, priority=priority)
+
+    async def _wait_turn(self, ticket, delay):
+        if ticket.blocked_on is None:
+            await asyncio.sleep(delay)
+        else:
+            await self.backend.wait_turn(ticket, delay)
+
+    async def _cached_page(self, url):
+        if self.page_cache.store is None:
+            return super(AsyncRespectfulWebdriver, self)._cached_page(url)
+
+        return await self.run(functools.partial(super(AsyncRespectfulWebdriver, self)._cached_page, url))
+
+    async def _fetched_page(self, url, realms):
+        return await self.run(functools.partial(super(AsyncRespectfulWebdriver, self)._fetched_page, url, realms))
+
+    async def _perform_webdriver_get(self, get_func, realms=None, wait=False, max_wait=None, priority=0):
+        self._validate_get_func(get_func)
+
+        reservation = await self.reserve_request(realms, wait=wait, max_wait=max_wait, priority=priority)
+
+        try:
+            return await self._load_page(get_func, realms)
+        finally:
+            await self.release_request(reservation)
+
+    async def _load_page(self, get_func, realms):
+        if self.throttle_detector is None and not self.metrics.enabled:
+            return await self.run(get_func)
+
+        started_at = self.clock()
+
+        try:
+            result = await self.run(get_func)
+        finally:
+            load_seconds = self._observe_load(started_at)
+
+        if self.throttle_detector is not None:
+            throttled = await self.run(lambda: self.throttle_detector(self.webdriver, load_seconds))
+            await self.adapt_rates(realms, throttled)
+
+        return result
+
+    async def _reserve_request(self, realms, ticket=None, priority=0):
+        reservation, stale_leases = self._local_reservation(realms, ticket, priority)
+
+        for lease in stale_leases:
+            await self._release_lease(lease)
+
+        if reservation is not None:
+            return reservation
+
+        reservation = await self._reserve_requests(
+            realms, request_uuid=str(uuid.uuid4()), amount=self.config["lease_size"], ticket=ticket, priority=priority
+        )
+
+        replaced_lease = self._store_lease(realms, reservation, priority)
+
+        if replaced_lease is not None:
+            await self._release_lease(replaced_lease)
+
+        return reservation
+
+    async def _release_concurrency(self, reservation):
+        if len(reservation.concurrent_realms):
+            started_at = self.clock()
+
+            await self.backend.release_concurrency(reservation)
+
+            if self.metrics.enabled:
+                self._record_round_trip("release_concurrency", started_at)
+
+    async def _release_lease(self, lease):
+        if lease.remaining > 0:
+            self._forget_throttled_realms(lease.reservation.realms)
+
+            started_at = self.clock()
+
+            await self.backend.release(
+                lease.reservation, lease.remaining, safety_threshold=self.config["safety_threshold"])
+
+            if self.metrics.enabled:
+                self._record_round_trip("release", started_at)
@@ -0,0 +1,9 @@
+from .base import Backend, Reservation, QueueTicket
+from .memory_backend import MemoryBackend
+from .file_backend import FileBackend
+from .redis_backend import RedisBackend
+
+try:
+    from .async_backends import AsyncRedisBackend, AsyncBackendAdapter
+except (ImportError, SyntaxError):  # Python 2 or redis-py without asyncio support
+    pass
@@ -0,0 +1,271 @@
+from .redis_backend import RedisBackend
+
+from ..exceptions import SeleniumRespectfulError
+
+from redis import ConnectionError
+from redis.asyncio import StrictRedis
+
+import asyncio
+import functools
+
+try:
+    from redis.asyncio.cluster import RedisCluster
+except ImportError:  # redis-py < 4.3
+    RedisCluster = None
+
+
+class AsyncRedisBackend(RedisBackend):
+
+    asynchronous = True
+
+    async def warmup(self):
+        try:
+            await self.redis.echo("Testing Connection")
+        except ConnectionError:
+            raise SeleniumRespectfulError("Could not establish a connection to the provided Redis server")
+
+        return True
+
+    async def register_realm(self, realm, realm_info):
+        return len(await self.register_realms([(realm, realm_info)])) > 0
+
+    async def register_realms(self, realms_info):
+        realms_info = list(realms_info)
+
+        if not len(realms_info):
+            return list()
+
+        if self.cluster:
+            return await self._register_realms_across_slots(realms_info)
+
+        registered = await self._register_realms_script(
+            keys=self._register_keys([realm for realm, _ in realms_info]),
+            args=self._register_args(realms_info)
+        )
+
+        return [realms_info[i - 1][0] for i in registered]
+
+    async def update_realm(self, realm, realm_info):
+        redis_key = self.realm_key(realm)
+
+        if not await self.redis.exists(redis_key):
+            return False
+
+        stale_keys = self._stale_requests_keys(
+            realm, realm_info, *await self.redis.hmget(redis_key, "algorithm", "windows")
+        )
+
+        if len(stale_keys):
+            await self.redis.delete(*stale_keys)
+
+        await self.redis.hset(redis_key, mapping=self._encode_realm_info(realm_info))
+        await self.redis.incr(self.realms_version_key())
+
+        return True
+
+    async def unregister_realm(self, realm):
+        return await self.unregister_realms([realm])
+
+    async def unregister_realms(self, realms):
+        realms = list(realms)
+
+        if not len(realms):
+            return True
+
+        if self.cluster:
+            return await self._unregister_realms_across_slots(realms)
+
+        await self._unregister_realms_script(keys=self._unregister_keys(realms), args=realms)
+
+        return True
+
+    async def fetch_registered_realms(self):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for registry_key in self.registry_keys():
+            pipeline.smembers(registry_key)
+
+        return self._registered_realms(await pipeline.execute())
+
+    async def fetch_realm_info(self, realm):
+        return self._decode_realm_info(await self.redis.hgetall(self.realm_key(realm)))
+
+    async def fetch_realms_info(self, realms):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for realm in realms:
+            pipeline.hgetall(self.realm_key(realm))
+
+        return dict(zip(realms, map(self._decode_realm_info, await pipeline.execute())))
+
+    async def realms_version(self):
+        return int(await self.redis.get(self.realms_version_key()) or 0)
+
+    async def reserve(self, realms, request_id=None, safety_threshold=0, amount=1, ticket=None, concurrency_ttl=60,
+                      priority=0):
+        if self.cluster and len(realms) > 1:
+            return await self._reserve_across_slots(
+                realms, request_id, safety_threshold, amount, ticket, concurrency_ttl, priority)
+
+        reply = await self._reserve_requests_script(
+            keys=self._reserve_keys(realms),
+            args=[safety_threshold, request_id or "", amount] + self._ticket_args(ticket, leave=True) + [
+                int(concurrency_ttl * 1000), priority
+            ]
+        )
+
+        return self._reservation(realms, request_id, reply)
+
+    async def release(self, reservation, unused, safety_threshold=0):
+        for part in reservation.parts or [reservation]:
+            await self._release_requests_script(
+                keys=self._realms_keys(part.realms),
+                args=self._release_args(part, unused, safety_threshold)
+            )
+
+        return unused
+
+    async def adapt_rate(self, realm, throttled, increase=1, decrease=0.5):
+        rate = await self._adapt_rate_script(
+            keys=[self.realm_key(realm)],
+            args=[int(bool(throttled)), increase, decrease]
+        )
+
+        return None if rate is None else float(rate)
+
+    async def release_concurrency(self, reservation):
+        for part in reservation.parts or [reservation]:
+            if len(part.concurrent_realms):
+                await self._release_concurrency_script(
+                    keys=[self.realm_requests_key(realm) for realm in part.concurrent_realms],
+                    args=[part.request_id]
+                )
+
+        return True
+
+    async def leave_queue(self, realms, ticket):
+        for queue_keys in self._queue_keys(realms):
+            await self._leave_queue_script(keys=queue_keys, args=[ticket.id])
+
+        return True
+
+    async def wait_turn(self, ticket, timeout):
+        return await self.redis.blpop(
+            [self.realm_wake_key(ticket.blocked_on, ticket.id)], timeout=self._blocking_timeout(timeout)
+        ) is not None
+
+    async def migrate_legacy_requests(self, realms):
+        migrated = 0
+
+        for realm in realms:
+            realm_info = await self.fetch_realm_info(realm)
+
+            if realm_info.get("algorithm") != "sliding_window_log":
+                continue
+
+            legacy_keys = [
+                legacy_key async for legacy_key in self.redis.scan_iter(
+                    match=self._legacy_requests_pattern(realm), count=1000
+                )
+            ]
+
+            if not len(legacy_keys):
+                continue
+
+            pipeline = self.redis.pipeline(transaction=False)
+
+            for legacy_key in legacy_keys:
+                pipeline.pttl(legacy_key)
+
+            requests = self._legacy_requests(realm_info, legacy_keys, await pipeline.execute(), await self.redis.time())
+            await self._migrate_pipeline(realm, realm_info, legacy_keys, requests).execute()
+
+            migrated += len(requests)
+
+        return migrated
+
+    def _connect(self, check=False):
+        if self.cluster:
+            if RedisCluster is None:
+                raise SeleniumRespectfulError("Redis Cluster support requires redis-py >= 4.3")
+
+            return RedisCluster(host=self.host, port=self.port)
+
+        return StrictRedis(host=self.host, port=self.port, db=self.database)
+
+    async def _register_realms_across_slots(self, realms_info):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for realm, _ in realms_info:
+            pipeline.hexists(self.realm_key(realm), "max_requests")
+
+        registered = list()
+        pipeline = self._register_pipeline(realms_info, await pipeline.execute(), registered)
+
+        await pipeline.execute()
+
+        return registered
+
+    async def _unregister_realms_across_slots(self, realms):
+        for realm in realms:
+            await self._unregister_realms_script(keys=self._realms_keys([realm]), args=[])
+
+        await self._unregister_pipeline(realms).execute()
+
+        return True
+
+    async def _reserve_across_slots(self, realms, request_id, safety_threshold, amount, ticket=None,
+                                    concurrency_ttl=60, priority=0):
+        parts = list()
+
+        for realm in realms:
+            reserving = request_id is not None and all([part.reserved for part in parts])
+
+            reply = await self._reserve_requests_script(
+                keys=self._reserve_keys([realm]),
+                args=[safety_threshold, request_id if reserving else "", amount] + self._ticket_args(ticket) + [
+                    int(concurrency_ttl * 1000), priority
+                ]
+            )
+
+            parts.append(self._reservation([realm], request_id, reply))
+
+            if parts[-1].reserved:
+                amount = min(amount, parts[-1].amount)
+
+        reservation = self._merge_reservations(realms, request_id, parts, amount)
+
+        for part in parts:
+            if part.reserved and part.amount > reservation.amount:
+                await self.release(part, part.amount - reservation.amount, safety_threshold=safety_threshold)
+
+            part.amount = reservation.amount
+
+            if part.reserved and not reservation.reserved:
+                await self.release_concurrency(part)
+
+        if ticket is not None and reservation.reserved:
+            await self.leave_queue(realms, ticket)
+
+        return reservation
+
+
+class AsyncBackendAdapter:
+
+    asynchronous = True
+
+    def __init__(self, backend, executor=None):
+        self.backend = backend
+        self.executor = executor
+
+    def __getattr__(self, attr):
+        method = getattr(self.backend, attr)
+
+        if not callable(method):
+            return method
+
+        async def run_in_executor(*args, **kwargs):
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self.executor, functools.partial(method, *args, **kwargs))
+
+        return run_in_executor
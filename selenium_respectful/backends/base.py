@@ -0,0 +1,186 @@
+import time
+import uuid
+
+
+class Reservation(object):
+
+    def __init__(self, reserved, realms, rate_limited_realms=None, counts=None, waits=None, realms_version=None,
+                 request_id=None, reserved_at=None, amount=None, parts=None, availables=None, binding_windows=None,
+                 queued_realms=None, concurrent_realms=None, queue_lengths=None, held_shares=None):
+        self.reserved = reserved
+        self.realms = realms
+        self.rate_limited_realms = rate_limited_realms or list()
+        self.counts = counts or dict()
+        self.waits = waits or dict()
+        self.availables = availables or dict()
+        self.binding_windows = binding_windows or dict()
+        self.queued_realms = queued_realms or list()
+        self.concurrent_realms = concurrent_realms or list()
+        self.queue_lengths = queue_lengths or dict()
+        self.held_shares = held_shares or dict()
+        self.realms_version = realms_version
+        self.request_id = request_id
+        self.reserved_at = reserved_at
+        self.amount = amount if amount is not None else int(reserved)
+        self.parts = parts
+
+    @property
+    def retry_after(self):
+        if not len(self.rate_limited_realms):
+            return None
+
+        waits = [self.waits.get(realm) for realm in self.rate_limited_realms]
+
+        if None in waits:
+            return None
+
+        return max(waits)
+
+
+class QueueTicket(object):
+
+    # Tickets of a higher priority are queued ahead of every lower priority, each priority taking
+    # its own band of scores, then in the order they started waiting
+    priority_band = 10 ** 10
+
+    def __init__(self, ttl=5, priority=0):
+        self.id = str(uuid.uuid4())
+        self.enqueued_at = time.time()
+        self.ttl = ttl
+        self.priority = priority
+        self.blocked_on = None
+        self.served = False
+
+    @property
+    def score(self):
+        return self.enqueued_at - self.priority * self.priority_band
+
+    @classmethod
+    def priority_bound(cls, priority):
+        return (1 - priority) * cls.priority_band
+
+    def track(self, reservation):
+        self.blocked_on = reservation.queued_realms[0] if len(reservation.queued_realms) else None
+        self.served = reservation.reserved
+
+
+class Backend(object):
+
+    asynchronous = False
+
+    realm_defaults = {"algorithm": "sliding_window_log", "patterns": list(), "min_requests": None, "windows": list(),
+                      "max_concurrent": None, "priority_shares": list()}
+
+    def warmup(self):
+        return True
+
+    def register_realm(self, realm, realm_info):
+        raise NotImplementedError()
+
+    def register_realms(self, realms_info):
+        return [realm for realm, realm_info in realms_info if self.register_realm(realm, realm_info)]
+
+    def update_realm(self, realm, realm_info):
+        raise NotImplementedError()
+
+    def unregister_realm(self, realm):
+        raise NotImplementedError()
+
+    def unregister_realms(self, realms):
+        for realm in realms:
+            self.unregister_realm(realm)
+
+        return True
+
+    def fetch_registered_realms(self):
+        raise NotImplementedError()
+
+    def fetch_realm_info(self, realm):
+        raise NotImplementedError()
+
+    def fetch_realms_info(self, realms):
+        return dict([(realm, self.fetch_realm_info(realm)) for realm in realms])
+
+    def realms_version(self):
+        raise NotImplementedError()
+
+    def reserve(self, realms, request_id=None, safety_threshold=0, amount=1, ticket=None, concurrency_ttl=60,
+                priority=0):
+        raise NotImplementedError()
+
+    def release(self, reservation, unused, safety_threshold=0):
+        raise NotImplementedError()
+
+    def adapt_rate(self, realm, throttled, increase=1, decrease=0.5):
+        raise NotImplementedError()
+
+    def release_concurrency(self, reservation):
+        return True
+
+    def leave_queue(self, realms, ticket):
+        return True
+
+    def wait_turn(self, ticket, timeout):
+        time.sleep(timeout)
+
+        return False
+
+    def migrate_legacy_requests(self, realms):
+        return 0
+
+    @staticmethod
+    def effective_max_requests(realm_info):
+        if realm_info.get("min_requests") is None:
+            return realm_info["max_requests"]
+
+        return int(Backend._clamped_rate(realm_info, realm_info.get("rate", realm_info["min_requests"])))
+
+    @staticmethod
+    def realm_windows(realm_info):
+        windows = [(Backend.effective_max_requests(realm_info), realm_info["timespan"])]
+        windows.extend(tuple(window) for window in realm_info.get("windows") or list())
+
+        return windows
+
+    @staticmethod
+    def _held_share(priority_shares, demand, priority, now, timespan):
+        held = 0
+
+        # The share of a priority is only held back from lower priorities while it was requested within
+        # the timespan of the realm, and lent to them otherwise
+        for share_priority, share in priority_shares:
+            if share_priority > priority and any(
+                int(demand_priority) >= share_priority and now - seen < timespan
+                for demand_priority, seen in demand.items()
+            ):
+                held += share
+
+        return held
+
+    @staticmethod
+    def _binds_before(check, binding):
+        allowed, wait, available = check
+        binding_allowed, binding_wait, binding_available = binding
+
+        if allowed != binding_allowed:
+            return not allowed
+
+        if not allowed:
+            return binding_wait is not None and (wait is None or wait > binding_wait)
+
+        return available < binding_available
+
+    @staticmethod
+    def _adapted_rate(realm_info, throttled, increase, decrease):
+        rate = Backend._clamped_rate(realm_info, realm_info.get("rate", realm_info["min_requests"]))
+
+        if throttled:
+            rate *= decrease
+        else:
+            rate += increase / float(max(rate, 1))
+
+        return Backend._clamped_rate(realm_info, rate)
+
+    @staticmethod
+    def _clamped_rate(realm_info, rate):
+        return float(min(max(rate, realm_info["min_requests"]), realm_info["max_requests"]))
@@ -0,0 +1,75 @@
+from .memory_backend import MemoryBackend
+
+from ..exceptions import SeleniumRespectfulError
+
+from contextlib import contextmanager
+
+import os
+import json
+import time
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+
+
+class FileBackend(MemoryBackend):
+
+    def __init__(self, path, clock=None, poll_interval=0.05):
+        if fcntl is None:
+            raise SeleniumRespectfulError("The file backend requires a platform supporting fcntl file locks")
+
+        super(FileBackend, self).__init__(clock=clock or time.time)
+
+        self.path = path
+        self.poll_interval = poll_interval
+
+    def wait_turn(self, ticket, timeout):
+        deadline = monotonic() + timeout
+
+        # Waiters of this process are notified right away, those of other processes see their wake-up on the next poll
+        with self._turns:
+            while True:
+                with self._transaction():
+                    woken = ticket.id in self._woken
+                    self._woken.discard(ticket.id)
+
+                remaining = deadline - monotonic()
+
+                if woken or remaining <= 0:
+                    return woken
+
+                self._turns.wait(min(remaining, self.poll_interval))
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+
+            try:
+                fcntl.flock(fd, fcntl.LOCK_EX)
+
+                with os.fdopen(os.dup(fd), "r+") as f:
+                    contents = f.read()
+                    state = json.loads(contents) if len(contents) else self._initial_state()
+
+                    # Woken tickets are kept in the file, so that waiters of every process sharing it see them
+                    self._woken = set(state.get("woken", list()))
+
+                    yield state
+
+                    queued = set(ticket_id for queue in state.get("queues", dict()).values() for ticket_id in queue)
+                    state["woken"] = sorted(self._woken & queued)
+
+                    f.seek(0)
+                    f.truncate()
+                    json.dump(state, f)
+            finally:
+                fcntl.flock(fd, fcntl.LOCK_UN)
+                os.close(fd)
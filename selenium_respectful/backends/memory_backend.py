@@ -0,0 +1,490 @@
+from .base import Backend, Reservation, QueueTicket
+
+from ..exceptions import SeleniumRespectfulError
+
+from contextlib import contextmanager
+
+import copy
+import math
+import threading
+
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
+
+class MemoryBackend(Backend):
+
+    _shared_instance = None
+    _shared_instance_lock = threading.Lock()
+
+    def __init__(self, clock=None):
+        self.clock = clock or monotonic
+
+        self._lock = threading.RLock()
+        self._state = self._initial_state()
+
+        self._turns = threading.Condition(self._lock)
+        self._woken = set()
+
+    @classmethod
+    def shared(cls):
+        with cls._shared_instance_lock:
+            if cls._shared_instance is None:
+                cls._shared_instance = cls()
+
+        return cls._shared_instance
+
+    def register_realm(self, realm, realm_info):
+        return len(self.register_realms([(realm, realm_info)])) > 0
+
+    def register_realms(self, realms_info):
+        registered = list()
+
+        with self._transaction() as state:
+            for realm, realm_info in realms_info:
+                if realm in state["realms"]:
+                    continue
+
+                state["realms"][realm] = copy.deepcopy(self.realm_defaults)
+                state["realms"][realm].update(copy.deepcopy(realm_info))
+
+                registered.append(realm)
+
+            if len(registered):
+                state["version"] += 1
+
+        return registered
+
+    def update_realm(self, realm, realm_info):
+        with self._transaction() as state:
+            if realm not in state["realms"]:
+                return False
+
+            if realm_info.get("algorithm", state["realms"][realm]["algorithm"]) != state["realms"][realm]["algorithm"]:
+                state["requests"].pop(realm, None)
+                state.get("window_requests", dict()).pop(realm, None)
+            elif realm_info.get("windows", state["realms"][realm]["windows"]) != state["realms"][realm]["windows"]:
+                state.get("window_requests", dict()).pop(realm, None)
+
+            state["realms"][realm].update(copy.deepcopy(realm_info))
+            state["version"] += 1
+
+        return True
+
+    def unregister_realm(self, realm):
+        return self.unregister_realms([realm])
+
+    def unregister_realms(self, realms):
+        with self._transaction() as state:
+            for realm in realms:
+                state["realms"].pop(realm, None)
+                state["requests"].pop(realm, None)
+                state.get("window_requests", dict()).pop(realm, None)
+                state.get("queues", dict()).pop(realm, None)
+                state.get("in_flight", dict()).pop(realm, None)
+                state.get("demand", dict()).pop(realm, None)
+
+            state["version"] += 1
+
+        return True
+
+    def fetch_registered_realms(self):
+        with self._transaction() as state:
+            return list(state["realms"].keys())
+
+    def fetch_realm_info(self, realm):
+        with self._transaction() as state:
+            return copy.deepcopy(state["realms"].get(realm, dict()))
+
+    def realms_version(self):
+        with self._transaction() as state:
+            return state["version"]
+
+    def reserve(self, realms, request_id=None, safety_threshold=0, amount=1, ticket=None, concurrency_ttl=60,
+                priority=0):
+        with self._transaction() as state:
+            now = self.clock()
+
+            reservations = list()
+            rate_limited_realms = list()
+            counts = dict()
+            waits = dict()
+            availables = dict()
+            binding_windows = dict()
+            queued_realms = list()
+            concurrent_realms = list()
+            queue_lengths = dict()
+            held_shares = dict()
+            reserved_amount = amount
+
+            for realm in realms:
+                realm_info = state["realms"].get(realm)
+
+                if realm_info is None:
+                    raise SeleniumRespectfulError("Realm '%s' hasn't been registered" % realm)
+
+                check = getattr(self, "_check_%s" % realm_info["algorithm"])
+
+                binding = None
+                available = None
+                window_reservations = list()
+                held = 0
+
+                if len(realm_info.get("priority_shares") or list()):
+                    demand = state.setdefault("demand", dict()).setdefault(realm, dict())
+
+                    if priority > 0 and (request_id is not None or ticket is not None):
+                        demand[str(priority)] = now
+
+                    held = self._held_share(
+                        realm_info["priority_shares"], demand, priority, now, realm_info["timespan"]
+                    )
+                    held_shares[realm] = held
+
+                for requests, key, (max_requests, timespan) in self._realm_windows(state, realm, realm_info):
+                    allowed, count, wait, window_available, reserve = check(
+                        requests, key, self._limit(max_requests, safety_threshold, held), timespan, now
+                    )
+
+                    if binding is None or self._binds_before(
+                        (allowed, wait, window_available), (binding[0], binding[2], binding[3])
+                    ):
+                        binding = (allowed, count, wait, window_available, (max_requests, timespan))
+
+                    window_reservations.append(reserve)
+                    available = window_available if available is None else min(available, window_available)
+
+                allowed, count, wait, _, binding_window = binding
+
+                # Waiters queued ahead of this request get the next slots of the realm first, and a peek
+                # only sees the slots left over by the waiters of its priority or higher
+                ahead = self._queue_ahead(self._realm_queue(state, realm, now), ticket, priority)
+                queue_lengths[realm] = ahead
+
+                if ahead > 0:
+                    queued_realms.append(realm)
+
+                    if allowed and available - ahead < 1:
+                        allowed = False
+                        wait = binding_window[1] / float(max(binding_window[0], 1)) * (ahead - available + 1)
+
+                    available -= ahead
+
+                # Realms with a max_concurrent hold an in-flight slot for each granted request, until it
+                # completes or expires. Waiting requests are woken through the queue when a slot is released
+                max_concurrent = realm_info.get("max_concurrent")
+
+                if max_concurrent is not None and (request_id is not None or ticket is not None):
+                    in_flight = self._realm_in_flight(state, realm, now)
+
+                    if len(in_flight) + ahead >= max_concurrent:
+                        if not ahead:
+                            queued_realms.append(realm)
+
+                        if allowed:
+                            allowed = False
+                            wait = None
+
+                    concurrent_realms.append(realm)
+                    reserved_amount = min(reserved_amount, 1)
+
+                reservations.append(window_reservations)
+                counts[realm] = count
+                waits[realm] = wait
+                availables[realm] = max(available, 0)
+                binding_windows[realm] = binding_window
+                reserved_amount = min(reserved_amount, available)
+
+                if not allowed:
+                    rate_limited_realms.append(realm)
+
+            reserved = request_id is not None and not len(rate_limited_realms)
+
+            if reserved:
+                for realm, window_reservations in zip(realms, reservations):
+                    for reserve in window_reservations:
+                        reserve(request_id, reserved_amount)
+                    counts[realm] += reserved_amount
+                    availables[realm] -= reserved_amount
+
+                for realm in concurrent_realms:
+                    state["in_flight"][realm][request_id] = now + concurrency_ttl
+
+            if ticket is not None:
+                self._queue_ticket(state, realms, ticket, reserved, waits, now)
+
+            return Reservation(
+                reserved,
+                realms,
+                rate_limited_realms=rate_limited_realms,
+                counts=counts,
+                waits=waits,
+                availables=availables,
+                binding_windows=binding_windows,
+                queued_realms=queued_realms,
+                concurrent_realms=concurrent_realms if reserved else list(),
+                queue_lengths=queue_lengths,
+                held_shares=held_shares,
+                realms_version=state["version"],
+                request_id=request_id,
+                reserved_at=now,
+                amount=reserved_amount if reserved else 0
+            )
+
+    def release(self, reservation, unused, safety_threshold=0):
+        with self._transaction() as state:
+            now = self.clock()
+
+            for realm in reservation.realms:
+                realm_info = state["realms"].get(realm)
+
+                if realm_info is None or realm not in state["requests"]:
+                    continue
+
+                release = getattr(self, "_release_%s" % realm_info["algorithm"])
+                held = reservation.held_shares.get(realm, 0)
+
+                # Requests are given back under the limit they were reserved with, shares held back included
+                for requests, key, (max_requests, timespan) in self._realm_windows(state, realm, realm_info):
+                    if key in requests:
+                        release(
+                            requests, key, self._limit(max_requests, safety_threshold, held), timespan, now,
+                            reservation, unused
+                        )
+
+        return unused
+
+    def adapt_rate(self, realm, throttled, increase=1, decrease=0.5):
+        with self._transaction() as state:
+            realm_info = state["realms"].get(realm)
+
+            if realm_info is None or realm_info.get("min_requests") is None:
+                return None
+
+            realm_info["rate"] = self._adapted_rate(realm_info, throttled, increase, decrease)
+
+            return realm_info["rate"]
+
+    def release_concurrency(self, reservation):
+        with self._transaction() as state:
+            for realm in reservation.concurrent_realms:
+                in_flight = state.get("in_flight", dict()).get(realm, dict())
+
+                if in_flight.pop(reservation.request_id, None) is not None:
+                    self._wake_head(state.get("queues", dict()).get(realm, dict()))
+
+        return True
+
+    def leave_queue(self, realms, ticket):
+        with self._transaction() as state:
+            for realm in realms:
+                self._leave_queue(state.get("queues", dict()).get(realm, dict()), ticket.id)
+
+            self._woken.discard(ticket.id)
+
+        return True
+
+    def wait_turn(self, ticket, timeout):
+        deadline = monotonic() + timeout
+
+        with self._turns:
+            while ticket.id not in self._woken and deadline > monotonic():
+                self._turns.wait(deadline - monotonic())
+
+            woken = ticket.id in self._woken
+            self._woken.discard(ticket.id)
+
+        return woken
+
+    @contextmanager
+    def _transaction(self):
+        with self._lock:
+            yield self._state
+
+    @staticmethod
+    def _initial_state():
+        return {
+            "realms": dict(), "requests": dict(), "window_requests": dict(), "queues": dict(), "in_flight": dict(),
+            "demand": dict(), "version": 0
+        }
+
+    def _realm_queue(self, state, realm, now):
+        queue = state.setdefault("queues", dict()).setdefault(realm, dict())
+        expired = [ticket_id for ticket_id, (_, deadline) in queue.items() if deadline <= now]
+
+        for ticket_id in expired:
+            self._leave_queue(queue, ticket_id)
+
+        return queue
+
+    def _queue_ticket(self, state, realms, ticket, reserved, waits, now):
+        if reserved:
+            for realm in realms:
+                self._leave_queue(state["queues"][realm], ticket.id)
+
+            self._woken.discard(ticket.id)
+            return
+
+        known_waits = [wait for wait in waits.values() if wait is not None]
+        deadline = now + (max(known_waits) if len(known_waits) else 1) + ticket.ttl
+
+        for realm in realms:
+            state["queues"][realm][ticket.id] = [ticket.score, deadline]
+
+    def _leave_queue(self, queue, ticket_id):
+        if ticket_id not in queue:
+            return
+
+        head = self._queue_head(queue)
+        del queue[ticket_id]
+
+        if head == ticket_id:
+            self._wake_head(queue)
+
+    def _wake_head(self, queue):
+        if len(queue):
+            self._woken.add(self._queue_head(queue))
+            self._turns.notify_all()
+
+    def _realm_in_flight(self, state, realm, now):
+        in_flight = state.setdefault("in_flight", dict()).setdefault(realm, dict())
+
+        for request_id in [request_id for request_id, expires_at in in_flight.items() if expires_at <= now]:
+            del in_flight[request_id]
+
+        return in_flight
+
+    @staticmethod
+    def _limit(max_requests, safety_threshold, held):
+        return max_requests - safety_threshold - int(math.floor(held * max_requests))
+
+    @staticmethod
+    def _queue_ahead(queue, ticket, priority=0):
+        if ticket is None:
+            return len([score for score, _ in queue.values() if score < QueueTicket.priority_bound(priority)])
+
+        return len([
+            ticket_id for ticket_id, (score, _) in queue.items()
+            if (score, ticket_id) < (ticket.score, ticket.id)
+        ])
+
+    @staticmethod
+    def _queue_head(queue):
+        return min(queue, key=lambda ticket_id: (queue[ticket_id][0], ticket_id))
+
+    def _realm_windows(self, state, realm, realm_info):
+        windows = self.realm_windows(realm_info)
+
+        # Additional windows are tracked apart, keyed by their position, as realms are free to contain ":"
+        if len(windows) > 1:
+            window_requests = state.setdefault("window_requests", dict()).setdefault(realm, dict())
+
+        for w, window in enumerate(windows):
+            if w == 0:
+                yield state["requests"], realm, window
+            else:
+                yield window_requests, str(w), window
+
+    @staticmethod
+    def _check_sliding_window_log(requests, realm, limit, timespan, now):
+        log = requests.setdefault(realm, list())
+
+        expired = 0
+
+        while expired < len(log) and log[expired][0] <= now - timespan:
+            expired += 1
+
+        del log[:expired]
+
+        count = len(log)
+        wait = 0
+
+        if limit <= 0:
+            wait = None
+        elif count >= limit:
+            wait = log[count - limit][0] + timespan - now
+
+        def reserve(request_id, reserved):
+            for j in range(1, reserved + 1):
+                log.append([now, MemoryBackend._slot_id(request_id, j)])
+
+        return count < limit, count, wait, limit - count, reserve
+
+    @staticmethod
+    def _check_sliding_window_counter(requests, realm, limit, timespan, now):
+        state = requests.get(realm) or {"window": None, "current": 0, "previous": 0}
+
+        window = int(now // timespan)
+
+        current = 0
+        previous = 0
+
+        if state["window"] == window:
+            current = state["current"]
+            previous = state["previous"]
+        elif state["window"] == window - 1:
+            previous = state["current"]
+
+        elapsed = now - window * timespan
+        count = previous * (timespan - elapsed) / float(timespan) + current
+        wait = 0
+
+        if limit <= 0:
+            wait = None
+        elif current + 1 > limit:
+            wait = timespan - elapsed + max(timespan * (1 - (limit - 1) / float(current)), 0)
+        elif count + 1 > limit:
+            wait = timespan - elapsed - (limit - current - 1) * timespan / float(previous)
+
+        def reserve(request_id, reserved):
+            requests[realm] = {"window": window, "current": current + reserved, "previous": previous}
+
+        return count + 1 <= limit, int(math.ceil(count)), wait, int(math.floor(limit - count)), reserve
+
+    @staticmethod
+    def _check_gcra(requests, realm, limit, timespan, now):
+        if limit <= 0:
+            return False, 0, None, 0, None
+
+        interval = timespan / float(limit)
+        tat = max(requests.get(realm) or now, now)
+        count = int(math.ceil((tat - now) / interval))
+
+        def reserve(request_id, reserved):
+            requests[realm] = tat + reserved * interval
+
+        wait = tat + interval - now - timespan
+
+        return wait <= 1e-9, count, max(wait, 0), int(math.floor((now + timespan - tat + 1e-9) / interval)), reserve
+
+    @staticmethod
+    def _release_sliding_window_log(requests, realm, limit, timespan, now, reservation, unused):
+        released = set([
+            MemoryBackend._slot_id(reservation.request_id, j)
+            for j in range(reservation.amount - unused + 1, reservation.amount + 1)
+        ])
+
+        requests[realm] = [request for request in requests[realm] if request[1] not in released]
+
+    @staticmethod
+    def _release_sliding_window_counter(requests, realm, limit, timespan, now, reservation, unused):
+        state = requests[realm]
+        window = int(reservation.reserved_at // timespan)
+
+        if state["window"] == window:
+            state["current"] = max(state["current"] - unused, 0)
+        elif state["window"] == window + 1:
+            state["previous"] = max(state["previous"] - unused, 0)
+
+    @staticmethod
+    def _release_gcra(requests, realm, limit, timespan, now, reservation, unused):
+        if limit <= 0:
+            return
+
+        requests[realm] -= unused * timespan / float(limit)
+
+    @staticmethod
+    def _slot_id(request_id, j):
+        return "%s:%d" % (request_id, j)
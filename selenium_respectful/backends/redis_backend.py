@@ -0,0 +1,1200 @@
+from .base import Backend, Reservation
+
+from ..exceptions import SeleniumRespectfulError
+
+from redis import StrictRedis, ConnectionPool, ConnectionError
+
+import copy
+import json
+import math
+import threading
+import zlib
+
+try:
+    from redis.cluster import RedisCluster
+except ImportError:  # redis-py < 4.1
+    RedisCluster = None
+
+
+REALM_WINDOWS_LUA = """
+local function fetch_realm_info(key)
+    return redis.call(
+        "HMGET", key, "max_requests", "timespan", "algorithm", "min_requests", "rate", "windows", "max_concurrent",
+        "priority_shares"
+    )
+end
+
+-- Adaptive realms (registered with min_requests) are limited by their current rate, kept between
+-- min_requests and max_requests
+local function effective_max_requests(max_requests, min_requests, rate)
+    max_requests = tonumber(max_requests)
+    min_requests = tonumber(min_requests)
+
+    if not min_requests then
+        return max_requests
+    end
+
+    return math.floor(math.min(math.max(tonumber(rate) or min_requests, min_requests), max_requests))
+end
+
+-- The {requests key, max requests, timespan in ms} windows of a realm: its own, followed by its
+-- additional windows, each tracked under the requests key of the realm suffixed by its position
+local function realm_windows(realm_info, requests_key)
+    local max_requests = effective_max_requests(realm_info[1], realm_info[4], realm_info[5])
+    local windows = {{requests_key, max_requests, tonumber(realm_info[2]) * 1000}}
+
+    if realm_info[6] then
+        for w, window in ipairs(cjson.decode(realm_info[6])) do
+            table.insert(windows, {requests_key .. ":" .. w, tonumber(window[1]), tonumber(window[2]) * 1000})
+        end
+    end
+
+    return windows
+end
+"""
+
+
+QUEUE_LUA = """
+-- Waiters are queued per realm in a sorted set scored by the time they started waiting, along with a
+-- sorted set of their deadlines. The head of a queue is woken, through a list it blocks on, when it changes
+local function wake_head(queue_key)
+    local head = redis.call("ZRANGE", queue_key, 0, 0)[1]
+
+    if head then
+        local wake_key = queue_key .. ":WAKE:" .. head
+
+        redis.call("DEL", wake_key)
+        redis.call("RPUSH", wake_key, 1)
+        redis.call("PEXPIRE", wake_key, 60000)
+    end
+end
+
+local function leave_queue(queue_key, ticket)
+    local head = redis.call("ZRANGE", queue_key, 0, 0)[1]
+
+    redis.call("ZREM", queue_key, ticket)
+    redis.call("ZREM", queue_key .. ":DEADLINES", ticket)
+
+    if head == ticket then
+        wake_head(queue_key)
+    end
+end
+"""
+
+
+RESERVE_REQUESTS_LUA = REALM_WINDOWS_LUA + QUEUE_LUA + """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+
+local realms_version = -1
+local safety_threshold = tonumber(ARGV[1])
+local member = ARGV[2]
+local amount = tonumber(ARGV[3]) or 1
+local ticket = ARGV[4] or ""
+local ticket_score = tonumber(ARGV[5]) or 0
+local ticket_ttl = tonumber(ARGV[6]) or 0
+local leave = ARGV[7] == "1"
+local concurrency_ttl = tonumber(ARGV[8]) or 60000
+local priority = tonumber(ARGV[9]) or 0
+
+local server_time = redis.call("TIME")
+local now = tonumber(server_time[1]) * 1000 + math.floor(tonumber(server_time[2]) / 1000)
+
+-- The realms version key is optional, following the (realm, requests) key pairs, as it can't
+-- be accessed alongside the realm keys on Redis Cluster
+if #KEYS % 2 == 1 then
+    realms_version = tonumber(redis.call("GET", KEYS[#KEYS])) or 0
+end
+
+local checks = {}
+
+-- Each check returns whether a request is allowed, the requests counted, the milliseconds until
+-- a request would be allowed (-1 if that can't be known), the amount of requests that could be
+-- reserved at once and a function reserving a given amount of requests
+
+-- Sliding window log: one sorted set member per request, scored by its timestamp
+checks["sliding_window_log"] = function(key, limit, timespan)
+    redis.call("ZREMRANGEBYSCORE", key, "-inf", now - timespan)
+    local count = redis.call("ZCARD", key)
+    local wait = 0
+
+    if limit <= 0 then
+        wait = -1
+    elseif count >= limit then
+        local freeing_request = redis.call("ZRANGE", key, count - limit, count - limit, "WITHSCORES")
+        wait = tonumber(freeing_request[2]) + timespan - now
+    end
+
+    return count < limit, count, wait, limit - count, function(reserved)
+        for j = 1, reserved do
+            redis.call("ZADD", key, now, member .. ":" .. j)
+        end
+
+        redis.call("PEXPIRE", key, timespan)
+    end
+end
+
+-- Sliding window counter: the current and previous fixed windows, the previous one weighted by its overlap
+checks["sliding_window_counter"] = function(key, limit, timespan)
+    local window = now - (now % timespan)
+    local state = redis.call("HMGET", key, "window", "current", "previous")
+
+    local current = 0
+    local previous = 0
+
+    if tonumber(state[1]) == window then
+        current = tonumber(state[2])
+        previous = tonumber(state[3])
+    elseif tonumber(state[1]) == window - timespan then
+        previous = tonumber(state[2])
+    end
+
+    local elapsed = now - window
+    local count = previous * (timespan - elapsed) / timespan + current
+    local wait = 0
+
+    if limit <= 0 then
+        wait = -1
+    elseif current + 1 > limit then
+        wait = timespan - elapsed + math.max(timespan * (1 - (limit - 1) / current), 0)
+    elseif count + 1 > limit then
+        wait = timespan - elapsed - (limit - current - 1) * timespan / previous
+    end
+
+    return count + 1 <= limit, math.ceil(count), math.max(wait, -1), math.floor(limit - count), function(reserved)
+        redis.call("HMSET", key, "window", window, "current", current + reserved, "previous", previous)
+        redis.call("PEXPIRE", key, timespan * 2)
+    end
+end
+
+-- GCRA: a single theoretical arrival time, each request pushing it forward by timespan / limit
+checks["gcra"] = function(key, limit, timespan)
+    if limit <= 0 then
+        return false, 0, -1, 0, nil
+    end
+
+    local interval = timespan / limit
+    local tat = math.max(tonumber(redis.call("GET", key)) or now, now)
+    local count = math.ceil((tat - now) / interval)
+
+    local wait = tat + interval - now - timespan
+
+    return wait <= 0.001, count, math.max(wait, 0), math.floor((now + timespan - tat + 0.001) / interval), function(reserved)
+        local reserved_tat = tat + reserved * interval
+        redis.call("SET", key, string.format("%.3f", reserved_tat), "PX", math.ceil(reserved_tat - now))
+    end
+end
+
+-- The binding window of a realm is the one rate-limiting it for the longest, or the one with the least room left
+local function binds_before(check, binding)
+    if check.allowed ~= binding.allowed then
+        return not check.allowed
+    end
+
+    if not check.allowed then
+        return binding.wait ~= -1 and (check.wait == -1 or check.wait > binding.wait)
+    end
+
+    return check.available < binding.available
+end
+
+-- The amount of waiters queued ahead of the request, which get the next slots of the realm first
+local function queue_ahead(queue_key)
+    local expired = redis.call("ZRANGEBYSCORE", queue_key .. ":DEADLINES", "-inf", now, "LIMIT", 0, 100)
+
+    for _, expired_ticket in ipairs(expired) do
+        leave_queue(queue_key, expired_ticket)
+    end
+
+    -- Tickets of each priority take their own band of scores (see QueueTicket.priority_band)
+    if ticket == "" then
+        return redis.call("ZCOUNT", queue_key, "-inf", "(" .. string.format("%d", (1 - priority) * 10000000000000))
+    end
+
+    return redis.call("ZRANK", queue_key, ticket) or redis.call("ZCOUNT", queue_key, "-inf", "(" .. ticket_score)
+end
+
+local function enqueue(queue_key, deadline)
+    redis.call("ZADD", queue_key, "NX", ticket_score, ticket)
+    redis.call("ZADD", queue_key .. ":DEADLINES", deadline, ticket)
+
+    for _, key in ipairs({queue_key, queue_key .. ":DEADLINES"}) do
+        if redis.call("PTTL", key) < deadline - now then
+            redis.call("PEXPIRE", key, deadline - now)
+        end
+    end
+end
+
+-- The share of a priority is only held back from lower priorities while it was requested within
+-- the timespan of the realm, and lent to them otherwise
+local function held_share(shares, demand_key, timespan)
+    if priority > 0 and (member ~= "" or ticket ~= "") then
+        redis.call("HSET", demand_key, priority, now)
+        redis.call("PEXPIRE", demand_key, timespan)
+    end
+
+    local demand = redis.call("HGETALL", demand_key)
+    local held = 0
+
+    for _, share in ipairs(shares) do
+        if share[1] > priority then
+            for d = 1, #demand, 2 do
+                if tonumber(demand[d]) >= share[1] and now - tonumber(demand[d + 1]) < timespan then
+                    held = held + share[2]
+                    break
+                end
+            end
+        end
+    end
+
+    return held
+end
+
+local reservations = {}
+local counts = {}
+local waits = {}
+local availables = {}
+local bindings = {}
+local queued = {}
+local queue_lengths = {}
+local held_shares = {}
+local concurrent = {}
+local rate_limited = {}
+local reserved = amount
+
+for i = 1, math.floor(#KEYS / 2) do
+    local realm_info = fetch_realm_info(KEYS[i * 2 - 1])
+
+    if not realm_info[1] then
+        return {-1, {i}, {}, {}, realms_version, now, 0, {}, {}, {}, {}, {}, {}}
+    end
+
+    local check = checks[realm_info[3] or "sliding_window_log"]
+    local windows = realm_windows(realm_info, KEYS[i * 2])
+    local window_reservations = {}
+    local binding = nil
+    local available = nil
+    local held = 0
+
+    if realm_info[8] then
+        held = held_share(cjson.decode(realm_info[8]), KEYS[i * 2] .. ":DEMAND", windows[1][3])
+    end
+
+    -- Returned as a string, as Redis truncates numbers to integers, for the release to use the same limits
+    held_shares[i] = string.format("%.17g", held)
+
+    for w = 1, #windows do
+        local allowed, count, wait, window_available, reserve = check(
+            windows[w][1], windows[w][2] - safety_threshold - math.floor(held * windows[w][2]), windows[w][3]
+        )
+
+        local window_check = {allowed = allowed, count = count, wait = wait, available = window_available, window = w}
+
+        if binding == nil or binds_before(window_check, binding) then
+            binding = window_check
+        end
+
+        window_reservations[w] = reserve
+        available = math.min(available or window_available, window_available)
+    end
+
+    -- A peek only sees the slots left over by the waiters of its priority or higher
+    local ahead = queue_ahead(KEYS[i * 2] .. ":QUEUE")
+    queue_lengths[i] = ahead
+
+    if ahead > 0 then
+        table.insert(queued, i)
+
+        if binding.allowed and available - ahead < 1 then
+            local window = windows[binding.window]
+
+            binding.allowed = false
+            binding.wait = window[3] / math.max(window[2], 1) * (ahead - available + 1)
+        end
+
+        available = available - ahead
+    end
+
+    -- Realms with a max_concurrent hold an in-flight slot for each granted request, until it
+    -- completes or expires. Waiting requests are woken through the queue when a slot is released
+    local max_concurrent = tonumber(realm_info[7])
+
+    if max_concurrent and (member ~= "" or ticket ~= "") then
+        local in_flight_key = KEYS[i * 2] .. ":INFLIGHT"
+
+        redis.call("ZREMRANGEBYSCORE", in_flight_key, "-inf", now)
+
+        if redis.call("ZCARD", in_flight_key) + ahead >= max_concurrent then
+            if ahead == 0 then
+                table.insert(queued, i)
+            end
+
+            if binding.allowed then
+                binding.allowed = false
+                binding.wait = -1
+            end
+        end
+
+        table.insert(concurrent, i)
+        reserved = math.min(reserved, 1)
+    end
+
+    reservations[i] = function(reserved)
+        for w = 1, #window_reservations do
+            window_reservations[w](reserved)
+        end
+    end
+
+    counts[i] = binding.count
+    waits[i] = math.ceil(binding.wait)
+    availables[i] = math.max(available, 0)
+    bindings[i] = {windows[binding.window][2], windows[binding.window][3] / 1000}
+    reserved = math.min(reserved, available)
+
+    if not binding.allowed then
+        table.insert(rate_limited, i)
+    end
+end
+
+local granted = member ~= "" and #rate_limited == 0
+
+-- A waiting request keeps its place in the queues until it's granted, or until it stops refreshing
+-- its deadline, past the time it's expected to wake up
+if ticket ~= "" and not (granted and leave) then
+    local longest_wait = 0
+
+    for i = 1, #waits do
+        longest_wait = math.max(longest_wait, waits[i] == -1 and 1000 or waits[i])
+    end
+
+    for i = 1, math.floor(#KEYS / 2) do
+        enqueue(KEYS[i * 2] .. ":QUEUE", now + longest_wait + ticket_ttl)
+    end
+end
+
+if not granted then
+    return {0, rate_limited, counts, waits, realms_version, now, 0, availables, bindings, queued, {}, queue_lengths, held_shares}
+end
+
+for i = 1, #reservations do
+    reservations[i](reserved)
+    counts[i] = counts[i] + reserved
+    availables[i] = availables[i] - reserved
+end
+
+for _, i in ipairs(concurrent) do
+    local in_flight_key = KEYS[i * 2] .. ":INFLIGHT"
+
+    redis.call("ZADD", in_flight_key, now + concurrency_ttl, member)
+
+    if redis.call("PTTL", in_flight_key) < concurrency_ttl then
+        redis.call("PEXPIRE", in_flight_key, concurrency_ttl)
+    end
+end
+
+if ticket ~= "" and leave then
+    for i = 1, math.floor(#KEYS / 2) do
+        leave_queue(KEYS[i * 2] .. ":QUEUE", ticket)
+    end
+end
+
+return {1, rate_limited, counts, waits, realms_version, now, reserved, availables, bindings, queued, concurrent, queue_lengths, held_shares}
+"""
+
+
+RELEASE_REQUESTS_LUA = REALM_WINDOWS_LUA + """
+if redis.replicate_commands then
+    redis.replicate_commands()
+end
+
+local safety_threshold = tonumber(ARGV[1])
+local member = ARGV[2]
+local reserved_at = tonumber(ARGV[3])
+local amount = tonumber(ARGV[4])
+local unused = tonumber(ARGV[5])
+
+-- ARGV[5 + i] is the share held back from the priority of the reservation on the i-th realm when it was
+-- reserved, for its requests to be given back under the limit they were reserved with
+
+local server_time = redis.call("TIME")
+local now = tonumber(server_time[1]) * 1000 + math.floor(tonumber(server_time[2]) / 1000)
+
+local releases = {}
+
+-- Each release gives the last unused requests of a reservation back to its realm
+
+releases["sliding_window_log"] = function(key, limit, timespan)
+    for j = amount - unused + 1, amount do
+        redis.call("ZREM", key, member .. ":" .. j)
+    end
+end
+
+releases["sliding_window_counter"] = function(key, limit, timespan)
+    local window = reserved_at - (reserved_at % timespan)
+    local state = redis.call("HMGET", key, "window", "current", "previous")
+
+    if tonumber(state[1]) == window then
+        redis.call("HSET", key, "current", math.max(tonumber(state[2]) - unused, 0))
+    elseif tonumber(state[1]) == window + timespan then
+        redis.call("HSET", key, "previous", math.max(tonumber(state[3]) - unused, 0))
+    end
+end
+
+releases["gcra"] = function(key, limit, timespan)
+    local tat = tonumber(redis.call("GET", key))
+
+    if tat == nil or limit <= 0 then
+        return
+    end
+
+    tat = tat - unused * timespan / limit
+
+    if tat > now then
+        redis.call("SET", key, string.format("%.3f", tat), "PX", math.ceil(tat - now))
+    else
+        redis.call("DEL", key)
+    end
+end
+
+for i = 1, #KEYS / 2 do
+    local realm_info = fetch_realm_info(KEYS[i * 2 - 1])
+
+    if realm_info[1] then
+        local release = releases[realm_info[3] or "sliding_window_log"]
+
+        local held = tonumber(ARGV[5 + i]) or 0
+
+        for _, window in ipairs(realm_windows(realm_info, KEYS[i * 2])) do
+            release(window[1], window[2] - safety_threshold - math.floor(held * window[2]), window[3])
+        end
+    end
+end
+
+return unused
+"""
+
+
+LEAVE_QUEUE_LUA = QUEUE_LUA + """
+for i = 1, #KEYS do
+    leave_queue(KEYS[i], ARGV[1])
+end
+
+return 1
+"""
+
+
+RELEASE_CONCURRENCY_LUA = QUEUE_LUA + """
+for i = 1, #KEYS do
+    if redis.call("ZREM", KEYS[i] .. ":INFLIGHT", ARGV[1]) == 1 then
+        wake_head(KEYS[i] .. ":QUEUE")
+    end
+end
+
+return 1
+"""
+
+
+REGISTER_REALMS_LUA = """
+-- KEYS are the realm keys, followed by the registry key of each realm and the realms version key.
+-- ARGV holds, for each realm, its name, the amount of field and value arguments and those arguments
+local count = (#KEYS - 1) / 2
+local registered = {}
+local offset = 1
+
+for i = 1, count do
+    local length = tonumber(ARGV[offset + 1])
+
+    if redis.call("HEXISTS", KEYS[i], "max_requests") == 0 then
+        redis.call("HMSET", KEYS[i], unpack(ARGV, offset + 2, offset + 1 + length))
+        redis.call("SADD", KEYS[count + i], ARGV[offset])
+        table.insert(registered, i)
+    end
+
+    offset = offset + 2 + length
+end
+
+if #registered > 0 then
+    redis.call("INCR", KEYS[#KEYS])
+end
+
+return registered
+"""
+
+
+UNREGISTER_REALMS_LUA = """
+-- KEYS are the realm key and the requests key of each realm, followed by the registry key of each realm
+-- and the realms version key. ARGV holds the name of each realm. On a cluster, realms are unregistered one
+-- by one without ARGV, and removed from their registry separately
+local count = math.floor(#KEYS / 2)
+
+if #ARGV > 0 then
+    count = #ARGV
+end
+
+for i = 1, count do
+    local requests_key = KEYS[i * 2]
+    local keys = {
+        KEYS[i * 2 - 1], requests_key, requests_key .. ":INFLIGHT", requests_key .. ":DEMAND",
+        requests_key .. ":QUEUE", requests_key .. ":QUEUE:DEADLINES"
+    }
+    local windows = redis.call("HGET", KEYS[i * 2 - 1], "windows")
+
+    if windows then
+        for w = 1, #cjson.decode(windows) do
+            table.insert(keys, requests_key .. ":" .. w)
+        end
+    end
+
+    redis.call("UNLINK", unpack(keys))
+
+    if #ARGV > 0 then
+        redis.call("SREM", KEYS[count * 2 + i], ARGV[i])
+    end
+end
+
+if #ARGV > 0 then
+    redis.call("INCR", KEYS[#KEYS])
+end
+
+return 1
+"""
+
+
+ADAPT_RATE_LUA = """
+local realm_info = redis.call("HMGET", KEYS[1], "max_requests", "min_requests", "rate")
+
+if not realm_info[1] or not realm_info[2] then
+    return false
+end
+
+local max_requests = tonumber(realm_info[1])
+local min_requests = tonumber(realm_info[2])
+local rate = math.min(math.max(tonumber(realm_info[3]) or min_requests, min_requests), max_requests)
+
+-- Additive increase, spread over the page loads of a timespan, or multiplicative decrease when throttled
+if ARGV[1] == "1" then
+    rate = rate * tonumber(ARGV[3])
+else
+    rate = rate + tonumber(ARGV[2]) / math.max(rate, 1)
+end
+
+rate = string.format("%.6f", math.min(math.max(rate, min_requests), max_requests))
+
+redis.call("HSET", KEYS[1], "rate", rate)
+
+return rate
+"""
+
+
+class RedisBackend(Backend):
+
+    realm_field_types = {
+        "max_requests": int,
+        "timespan": int,
+        "algorithm": str,
+        "patterns": list,
+        "min_requests": int,
+        "rate": float,
+        "windows": list,
+        "max_concurrent": int,
+        "priority_shares": list
+    }
+
+    _shared_connections = dict()
+    _shared_connections_lock = threading.Lock()
+
+    def __init__(self, host="localhost", port=6379, database=0, prefix="SeleniumRequester", cluster=False,
+                 registry_shards=None):
+        self.host = host
+        self.port = port
+        self.database = database
+        self.prefix = prefix
+        self.cluster = cluster
+        self.registry_shards = registry_shards or (16 if cluster else 1)
+
+        self._redis = None
+        self._scripts = dict()
+
+    @property
+    def redis(self):
+        if self._redis is None:
+            self._redis = self._connect()
+
+        return self._redis
+
+    @property
+    def _reserve_requests_script(self):
+        return self._script(RESERVE_REQUESTS_LUA)
+
+    @property
+    def _release_requests_script(self):
+        return self._script(RELEASE_REQUESTS_LUA)
+
+    @property
+    def _leave_queue_script(self):
+        return self._script(LEAVE_QUEUE_LUA)
+
+    @property
+    def _release_concurrency_script(self):
+        return self._script(RELEASE_CONCURRENCY_LUA)
+
+    @property
+    def _register_realms_script(self):
+        return self._script(REGISTER_REALMS_LUA)
+
+    @property
+    def _unregister_realms_script(self):
+        return self._script(UNREGISTER_REALMS_LUA)
+
+    @property
+    def _adapt_rate_script(self):
+        return self._script(ADAPT_RATE_LUA)
+
+    def warmup(self):
+        self._redis = self._connect(check=True)
+
+        return True
+
+    def register_realm(self, realm, realm_info):
+        return len(self.register_realms([(realm, realm_info)])) > 0
+
+    def register_realms(self, realms_info):
+        realms_info = list(realms_info)
+
+        if not len(realms_info):
+            return list()
+
+        if self.cluster:
+            return self._register_realms_across_slots(realms_info)
+
+        registered = self._register_realms_script(
+            keys=self._register_keys([realm for realm, _ in realms_info]),
+            args=self._register_args(realms_info)
+        )
+
+        return [realms_info[i - 1][0] for i in registered]
+
+    def update_realm(self, realm, realm_info):
+        redis_key = self.realm_key(realm)
+
+        if not self.redis.exists(redis_key):
+            return False
+
+        stale_keys = self._stale_requests_keys(realm, realm_info, *self.redis.hmget(redis_key, "algorithm", "windows"))
+
+        if len(stale_keys):
+            self.redis.delete(*stale_keys)
+
+        self.redis.hset(redis_key, mapping=self._encode_realm_info(realm_info))
+        self.redis.incr(self.realms_version_key())
+
+        return True
+
+    def unregister_realm(self, realm):
+        return self.unregister_realms([realm])
+
+    def unregister_realms(self, realms):
+        realms = list(realms)
+
+        if not len(realms):
+            return True
+
+        if self.cluster:
+            return self._unregister_realms_across_slots(realms)
+
+        self._unregister_realms_script(keys=self._unregister_keys(realms), args=realms)
+
+        return True
+
+    def fetch_registered_realms(self):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for registry_key in self.registry_keys():
+            pipeline.smembers(registry_key)
+
+        return self._registered_realms(pipeline.execute())
+
+    def fetch_realm_info(self, realm):
+        return self._decode_realm_info(self.redis.hgetall(self.realm_key(realm)))
+
+    def fetch_realms_info(self, realms):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for realm in realms:
+            pipeline.hgetall(self.realm_key(realm))
+
+        return dict(zip(realms, map(self._decode_realm_info, pipeline.execute())))
+
+    def realms_version(self):
+        return int(self.redis.get(self.realms_version_key()) or 0)
+
+    def reserve(self, realms, request_id=None, safety_threshold=0, amount=1, ticket=None, concurrency_ttl=60,
+                priority=0):
+        if self.cluster and len(realms) > 1:
+            return self._reserve_across_slots(
+                realms, request_id, safety_threshold, amount, ticket, concurrency_ttl, priority)
+
+        reply = self._reserve_requests_script(
+            keys=self._reserve_keys(realms),
+            args=[safety_threshold, request_id or "", amount] + self._ticket_args(ticket, leave=True) + [
+                int(concurrency_ttl * 1000), priority
+            ]
+        )
+
+        return self._reservation(realms, request_id, reply)
+
+    def release(self, reservation, unused, safety_threshold=0):
+        for part in reservation.parts or [reservation]:
+            self._release_requests_script(
+                keys=self._realms_keys(part.realms),
+                args=self._release_args(part, unused, safety_threshold)
+            )
+
+        return unused
+
+    def adapt_rate(self, realm, throttled, increase=1, decrease=0.5):
+        rate = self._adapt_rate_script(keys=[self.realm_key(realm)], args=[int(bool(throttled)), increase, decrease])
+
+        return None if rate is None else float(rate)
+
+    def release_concurrency(self, reservation):
+        for part in reservation.parts or [reservation]:
+            if len(part.concurrent_realms):
+                self._release_concurrency_script(
+                    keys=[self.realm_requests_key(realm) for realm in part.concurrent_realms],
+                    args=[part.request_id]
+                )
+
+        return True
+
+    def leave_queue(self, realms, ticket):
+        for queue_keys in self._queue_keys(realms):
+            self._leave_queue_script(keys=queue_keys, args=[ticket.id])
+
+        return True
+
+    def wait_turn(self, ticket, timeout):
+        return self.redis.blpop(
+            [self.realm_wake_key(ticket.blocked_on, ticket.id)], timeout=self._blocking_timeout(timeout)
+        ) is not None
+
+    def migrate_legacy_requests(self, realms):
+        migrated = 0
+
+        for realm in realms:
+            realm_info = self.fetch_realm_info(realm)
+
+            if realm_info.get("algorithm") != "sliding_window_log":
+                continue
+
+            legacy_keys = list(self.redis.scan_iter(match=self._legacy_requests_pattern(realm), count=1000))
+
+            if not len(legacy_keys):
+                continue
+
+            pipeline = self.redis.pipeline(transaction=False)
+
+            for legacy_key in legacy_keys:
+                pipeline.pttl(legacy_key)
+
+            requests = self._legacy_requests(realm_info, legacy_keys, pipeline.execute(), self.redis.time())
+            self._migrate_pipeline(realm, realm_info, legacy_keys, requests).execute()
+
+            migrated += len(requests)
+
+        return migrated
+
+    def realms_key(self):
+        return "%s:REALMS" % self.prefix
+
+    def registry_keys(self):
+        if self.registry_shards == 1:
+            return [self.realms_key()]
+
+        return ["%s:REGISTRY:%d" % (self.prefix, shard) for shard in range(self.registry_shards)]
+
+    def registry_key(self, realm):
+        return self.registry_keys()[(zlib.crc32(realm.encode("utf-8")) & 0xffffffff) % self.registry_shards]
+
+    def realm_key(self, realm):
+        return "%s:REALMS:%s" % (self.prefix, self._hash_tag(realm))
+
+    def realm_requests_key(self, realm):
+        return "%s:REQUESTS:%s" % (self.prefix, self._hash_tag(realm))
+
+    def realm_window_requests_key(self, realm, window):
+        return "%s:%d" % (self.realm_requests_key(realm), window)
+
+    def realm_in_flight_key(self, realm):
+        return "%s:INFLIGHT" % self.realm_requests_key(realm)
+
+    def realm_demand_key(self, realm):
+        return "%s:DEMAND" % self.realm_requests_key(realm)
+
+    def realm_queue_key(self, realm):
+        return "%s:QUEUE" % self.realm_requests_key(realm)
+
+    def realm_wake_key(self, realm, ticket_id):
+        return "%s:WAKE:%s" % (self.realm_queue_key(realm), ticket_id)
+
+    def realms_version_key(self):
+        return "%s:REALMS_VERSION" % self.prefix
+
+    def _connect(self, check=False):
+        connection_key = (self.cluster, self.host, self.port, self.database)
+
+        try:
+            with self._shared_connections_lock:
+                if connection_key not in self._shared_connections:
+                    self._shared_connections[connection_key] = {"connection": self._connection(), "checked": False}
+
+                shared_connection = self._shared_connections[connection_key]
+
+            if self.cluster:
+                redis = shared_connection["connection"]
+            else:
+                redis = StrictRedis(connection_pool=shared_connection["connection"])
+
+            if check or not shared_connection["checked"]:
+                redis.echo("Testing Connection")
+                shared_connection["checked"] = True
+        except ConnectionError:
+            raise SeleniumRespectfulError("Could not establish a connection to the provided Redis server")
+
+        return redis
+
+    def _connection(self):
+        if self.cluster:
+            if RedisCluster is None:
+                raise SeleniumRespectfulError("Redis Cluster support requires redis-py >= 4.1")
+
+            return RedisCluster(host=self.host, port=self.port)
+
+        return ConnectionPool(host=self.host, port=self.port, db=self.database)
+
+    def _script(self, lua):
+        if lua not in self._scripts:
+            self._scripts[lua] = self.redis.register_script(lua)
+
+        return self._scripts[lua]
+
+    def _hash_tag(self, realm):
+        return "{%s}" % realm if self.cluster else realm
+
+    def _reserve_keys(self, realms):
+        if self.cluster:
+            return self._realms_keys(realms)
+
+        return self._realms_keys(realms) + [self.realms_version_key()]
+
+    def _register_realms_across_slots(self, realms_info):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for realm, _ in realms_info:
+            pipeline.hexists(self.realm_key(realm), "max_requests")
+
+        registered = list()
+        pipeline = self._register_pipeline(realms_info, pipeline.execute(), registered)
+
+        pipeline.execute()
+
+        return registered
+
+    def _register_pipeline(self, realms_info, existing, registered):
+        pipeline = self.redis.pipeline(transaction=False)
+
+        for (realm, realm_info), exists in zip(realms_info, existing):
+            if exists or realm in registered:
+                continue
+
+            pipeline.hset(self.realm_key(realm), mapping=self._encode_realm_info(realm_info))
+            pipeline.sadd(self.registry_key(realm), realm)
+
+            registered.append(realm)
+
+        if len(registered):
+            pipeline.incr(self.realms_version_key())
+
+        return pipeline
+
+    def _unregister_realms_across_slots(self, realms):
+        for realm in realms:
+            self._unregister_realms_script(keys=self._realms_keys([realm]), args=[])
+
+        self._unregister_pipeline(realms).execute()
+
+        return True
+
+    def _unregister_keys(self, realms):
+        return self._realms_keys(realms) + [self.registry_key(realm) for realm in realms] + [
+            self.realms_version_key()
+        ]
+
+    def _unregister_pipeline(self, realms):
+        pipeline = self.redis.pipeline(transaction=False)
+        registries = dict()
+
+        for realm in realms:
+            registries.setdefault(self.registry_key(realm), list()).append(realm)
+
+        for registry_key, registry_realms in registries.items():
+            pipeline.srem(registry_key, *registry_realms)
+
+        pipeline.incr(self.realms_version_key())
+
+        return pipeline
+
+    def _stale_requests_keys(self, realm, realm_info, algorithm, windows):
+        windows = self._decode_windows(windows)
+        window_keys = self._window_requests_keys(realm, windows)
+
+        if "algorithm" in realm_info and realm_info["algorithm"].encode("utf-8") != algorithm:
+            return [self.realm_requests_key(realm)] + window_keys
+
+        if "windows" in realm_info and realm_info["windows"] != windows:
+            return window_keys
+
+        return list()
+
+    def _window_requests_keys(self, realm, windows):
+        return [self.realm_window_requests_key(realm, w) for w in range(1, len(windows) + 1)]
+
+    @staticmethod
+    def _decode_windows(windows):
+        return json.loads(windows.decode("utf-8")) if windows else list()
+
+    # BLPOP blocks forever on a timeout of 0, and takes fractional timeouts down to the millisecond
+    @staticmethod
+    def _blocking_timeout(timeout):
+        return max(round(timeout, 3), 0.001)
+
+    def _legacy_requests_pattern(self, realm):
+        return "%s:REQUEST:%s:*" % (self.prefix, realm)
+
+    @staticmethod
+    def _legacy_requests(realm_info, legacy_keys, ttls, redis_time):
+        seconds, microseconds = redis_time
+        now = seconds * 1000 + microseconds // 1000
+        timespan = realm_info["timespan"] * 1000
+
+        requests = dict()
+
+        for legacy_key, ttl in zip(legacy_keys, ttls):
+            if ttl is None or ttl <= 0:
+                continue
+
+            request_uuid = legacy_key.decode("utf-8").rsplit(":", 1)[-1]
+            requests[request_uuid] = now - max(timespan - ttl, 0)
+
+        return requests
+
+    def _migrate_pipeline(self, realm, realm_info, legacy_keys, requests):
+        redis_key = self.realm_requests_key(realm)
+
+        pipeline = self.redis.pipeline(transaction=True)
+
+        if len(requests):
+            pipeline.zadd(redis_key, requests)
+            pipeline.pexpire(redis_key, realm_info["timespan"] * 1000)
+
+        pipeline.delete(*legacy_keys)
+
+        return pipeline
+
+    def _register_keys(self, realms):
+        return [self.realm_key(realm) for realm in realms] + [
+            self.registry_key(realm) for realm in realms
+        ] + [self.realms_version_key()]
+
+    def _register_args(self, realms_info):
+        args = list()
+
+        for realm, realm_info in realms_info:
+            fields = list()
+
+            for field, value in self._encode_realm_info(realm_info).items():
+                fields.extend([field, value])
+
+            args.extend([realm, len(fields)] + fields)
+
+        return args
+
+    def _reserve_across_slots(self, realms, request_id, safety_threshold, amount, ticket=None, concurrency_ttl=60,
+                              priority=0):
+        parts = list()
+
+        for realm in realms:
+            reserving = request_id is not None and all([part.reserved for part in parts])
+
+            # The ticket only leaves the queues once every realm is reserved
+            reply = self._reserve_requests_script(
+                keys=self._reserve_keys([realm]),
+                args=[safety_threshold, request_id if reserving else "", amount] + self._ticket_args(ticket) + [
+                    int(concurrency_ttl * 1000), priority
+                ]
+            )
+
+            parts.append(self._reservation([realm], request_id, reply))
+
+            if parts[-1].reserved:
+                amount = min(amount, parts[-1].amount)
+
+        reservation = self._merge_reservations(realms, request_id, parts, amount)
+
+        for part in parts:
+            if part.reserved and part.amount > reservation.amount:
+                self.release(part, part.amount - reservation.amount, safety_threshold=safety_threshold)
+
+            part.amount = reservation.amount
+
+            if part.reserved and not reservation.reserved:
+                self.release_concurrency(part)
+
+        if ticket is not None and reservation.reserved:
+            self.leave_queue(realms, ticket)
+
+        return reservation
+
+    def _queue_keys(self, realms):
+        if self.cluster:
+            return [[self.realm_queue_key(realm)] for realm in realms]
+
+        return [[self.realm_queue_key(realm) for realm in realms]]
+
+    @staticmethod
+    def _ticket_args(ticket, leave=False):
+        if ticket is None:
+            return ["", 0, 0, 0]
+
+        return [ticket.id, int(ticket.score * 1000), int(ticket.ttl * 1000), int(leave)]
+
+    def _realms_keys(self, realms):
+        keys = list()
+
+        for realm in realms:
+            keys.append(self.realm_key(realm))
+            keys.append(self.realm_requests_key(realm))
+
+        return keys
+
+    @staticmethod
+    def _release_args(reservation, unused, safety_threshold):
+        return [
+            safety_threshold,
+            reservation.request_id,
+            int(round(reservation.reserved_at * 1000)),
+            reservation.amount,
+            unused
+        ] + [repr(reservation.held_shares.get(realm, 0)) for realm in reservation.realms]
+
+    @staticmethod
+    def _registered_realms(registries):
+        realms = set()
+
+        for registry in registries:
+            realms.update([realm.decode("utf-8") for realm in registry])
+
+        return list(realms)
+
+    @staticmethod
+    def _merge_reservations(realms, request_id, parts, amount):
+        reserved = request_id is not None and all([part.reserved for part in parts])
+
+        counts = dict()
+        waits = dict()
+        availables = dict()
+        binding_windows = dict()
+        queued_realms = list()
+        concurrent_realms = list()
+        queue_lengths = dict()
+        held_shares = dict()
+
+        for part in parts:
+            counts.update(part.counts)
+            waits.update(part.waits)
+            availables.update(part.availables)
+            binding_windows.update(part.binding_windows)
+            queued_realms.extend(part.queued_realms)
+            concurrent_realms.extend(part.concurrent_realms)
+            queue_lengths.update(part.queue_lengths)
+            held_shares.update(part.held_shares)
+
+            if part.reserved:
+                counts[part.realms[0]] -= part.amount - (amount if reserved else 0)
+                availables[part.realms[0]] += part.amount - (amount if reserved else 0)
+
+        return Reservation(
+            reserved,
+            realms,
+            rate_limited_realms=[realm for part in parts for realm in part.rate_limited_realms],
+            counts=counts,
+            waits=waits,
+            availables=availables,
+            binding_windows=binding_windows,
+            queued_realms=queued_realms,
+            concurrent_realms=concurrent_realms if reserved else list(),
+            queue_lengths=queue_lengths,
+            held_shares=held_shares,
+            request_id=request_id,
+            amount=amount if reserved else 0,
+            parts=parts
+        )
+
+    @staticmethod
+    def _reservation(realms, request_id, reply):
+        status, rate_limited_indices, counts, waits, realms_version, reserved_at, amount = reply[:7]
+        availables, bindings, queued_indices, concurrent_indices, queue_lengths, held_shares = reply[7:]
+
+        if status == -1:
+            raise SeleniumRespectfulError("Realm '%s' hasn't been registered" % realms[rate_limited_indices[0] - 1])
+
+        return Reservation(
+            status == 1,
+            realms,
+            rate_limited_realms=[realms[i - 1] for i in rate_limited_indices],
+            counts=dict(zip(realms, counts)),
+            waits=dict(zip(realms, [None if wait == -1 else wait / 1000.0 for wait in waits])),
+            availables=dict(zip(realms, availables)),
+            binding_windows=dict(zip(realms, [tuple(binding) for binding in bindings])),
+            queued_realms=[realms[i - 1] for i in queued_indices],
+            concurrent_realms=[realms[i - 1] for i in concurrent_indices],
+            queue_lengths=dict(zip(realms, queue_lengths)),
+            held_shares=dict(zip(realms, [float(held) for held in held_shares])),
+            realms_version=None if realms_version == -1 else realms_version,
+            request_id=request_id,
+            reserved_at=reserved_at / 1000.0,
+            amount=amount
+        )
+
+    @classmethod
+    def _encode_realm_info(cls, realm_info):
+        encoded_realm_info = dict()
+
+        for field, value in realm_info.items():
+            if cls.realm_field_types.get(field) in (list, dict):
+                value = json.dumps(value)
+
+            encoded_realm_info[field] = value
+
+        return encoded_realm_info
+
+    @classmethod
+    def _decode_realm_info(cls, realm_info):
+        if not len(realm_info):
+            return dict()
+
+        decoded_realm_info = copy.deepcopy(cls.realm_defaults)
+
+        for field, value in realm_info.items():
+            field = field.decode("utf-8")
+            field_type = cls.realm_field_types.get(field, str)
+
+            if field_type in (list, dict):
+                decoded_realm_info[field] = json.loads(value.decode("utf-8"))
+            elif field_type is str:
+                decoded_realm_info[field] = value.decode("utf-8")
+            else:
+                decoded_realm_info[field] = field_type(value)
+
+        return decoded_realm_info
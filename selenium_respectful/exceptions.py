@@ -1,7 +1,12 @@
-
 class SeleniumRespectfulError(BaseException):
     pass
 
 
 class SeleniumRespectfulRateLimitedError(BaseException):
-    pass
+
+    def __init__(self, message, realms=None, retry_after=None, windows=None):
+        super(SeleniumRespectfulRateLimitedError, self).__init__(message)
+
+        self.realms = realms or list()
+        self.retry_after = retry_after
+        self.windows = windows or dict()
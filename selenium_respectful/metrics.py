@@ -0,0 +1,126 @@
+import threading
+
+
+class MetricsSink(object):
+
+    enabled = False
+
+    def increment(self, name, value=1, labels=None):
+        pass
+
+    def observe(self, name, value, labels=None):
+        pass
+
+
+class PrometheusMetricsSink(MetricsSink):
+
+    enabled = True
+
+    default_buckets = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+    descriptions = {
+        "limiter_round_trips_total": "Round trips to the backend of the rate limiter",
+        "limiter_seconds": "Time spent in the backend of the rate limiter",
+        "decisions_total": "Requests allowed or rejected by the rate limiter",
+        "wait_seconds": "Time spent waiting for rate-limited realms by get calls with wait switched on",
+        "get_seconds": "Time spent by the browser loading pages",
+        "page_cache_total": "Page loads served from the page cache or missing from it"
+    }
+
+    def __init__(self, namespace="selenium_respectful", buckets=None):
+        self.namespace = namespace
+        self.buckets = tuple(sorted(buckets or self.default_buckets))
+
+        self._counters = dict()
+        self._histograms = dict()
+        self._lock = threading.Lock()
+
+    def increment(self, name, value=1, labels=None):
+        key = self._key(labels)
+
+        with self._lock:
+            counters = self._counters.setdefault(name, dict())
+            counters[key] = counters.get(key, 0) + value
+
+    def observe(self, name, value, labels=None):
+        key = self._key(labels)
+
+        with self._lock:
+            histograms = self._histograms.setdefault(name, dict())
+            histogram = histograms.get(key)
+
+            if histogram is None:
+                histogram = histograms[key] = {"buckets": [0] * len(self.buckets), "sum": 0, "count": 0}
+
+            for i, bucket in enumerate(self.buckets):
+                if value <= bucket:
+                    histogram["buckets"][i] += 1
+
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    def render(self):
+        lines = list()
+
+        with self._lock:
+            for name, counters in sorted(self._counters.items()):
+                metric = self._metric_name(name)
+
+                lines.extend(self._header(name, metric, "counter"))
+
+                for key, value in sorted(counters.items()):
+                    lines.append("%s%s %s" % (metric, self._labels(key), self._value(value)))
+
+            for name, histograms in sorted(self._histograms.items()):
+                metric = self._metric_name(name)
+
+                lines.extend(self._header(name, metric, "histogram"))
+
+                for key, histogram in sorted(histograms.items()):
+                    for bucket, count in zip(self.buckets, histogram["buckets"]):
+                        lines.append("%s_bucket%s %d" % (metric, self._labels(key, le=self._value(bucket)), count))
+
+                    lines.append("%s_bucket%s %d" % (metric, self._labels(key, le="+Inf"), histogram["count"]))
+                    lines.append("%s_sum%s %s" % (metric, self._labels(key), self._value(histogram["sum"])))
+                    lines.append("%s_count%s %d" % (metric, self._labels(key), histogram["count"]))
+
+        return "\n".join(lines) + "\n"
+
+    def _metric_name(self, name):
+        return "%s_%s" % (self.namespace, name) if self.namespace else name
+
+    def _header(self, name, metric, metric_type):
+        header = list()
+
+        if name in self.descriptions:
+            header.append("# HELP %s %s" % (metric, self.descriptions[name]))
+
+        header.append("# TYPE %s %s" % (metric, metric_type))
+
+        return header
+
+    @staticmethod
+    def _key(labels):
+        return tuple(sorted((labels or dict()).items()))
+
+    @staticmethod
+    def _labels(key, le=None):
+        labels = list(key)
+
+        if le is not None:
+            labels.append(("le", le))
+
+        if not len(labels):
+            return ""
+
+        return "{%s}" % ",".join([
+            '%s="%s"' % (label, str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"'))
+            for label, value in labels
+        ])
+
+    @staticmethod
+    def _value(value):
+        return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+null_metrics = MetricsSink()
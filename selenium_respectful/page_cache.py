@@ -0,0 +1,221 @@
+from .exceptions import SeleniumRespectfulError
+from .page_result import PageResult
+
+from collections import OrderedDict
+
+import base64
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+try:
+    from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+except ImportError:  # Python 2 Compatibility
+    from urlparse import urlsplit, urlunsplit, parse_qsl
+    from urllib import urlencode
+
+
+class PageCache(object):
+
+    default_ports = {"http": 80, "https": 443}
+
+    def __init__(self, ttl=300, max_entries=1000, store=None, screenshots=False, clock=None):
+        if ttl <= 0:
+            raise SeleniumRespectfulError("'ttl' is expected to be a positive number")
+
+        if max_entries < 1:
+            raise SeleniumRespectfulError("'max_entries' is expected to be a positive integer")
+
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.store = store
+        self.screenshots = screenshots
+        self.clock = clock or time.time
+
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, url):
+        key = self.normalize_url(url)
+        now = self.clock()
+
+        with self._lock:
+            entry = self._entries.pop(key, None)
+
+            if entry is not None and entry["expires_at"] > now:
+                self._entries[key] = entry
+                return self._page_result(url, entry)
+
+        if self.store is None:
+            return None
+
+        entry = self.store.get(key)
+
+        if entry is None:
+            return None
+
+        if entry["expires_at"] <= now:
+            self.store.delete(key)
+            return None
+
+        self._remember(key, entry)
+
+        return self._page_result(url, entry)
+
+    def set(self, url, page_result):
+        key = self.normalize_url(url)
+
+        entry = {
+            "url": page_result.url,
+            "realms": list(page_result.realms),
+            "final_url": page_result.final_url,
+            "page_source": page_result.page_source,
+            "screenshot": page_result.screenshot,
+            "expires_at": self.clock() + self.ttl
+        }
+
+        self._remember(key, entry)
+
+        if self.store is not None:
+            self.store.set(key, entry, self.ttl)
+
+    def invalidate(self, url):
+        key = self.normalize_url(url)
+
+        with self._lock:
+            self._entries.pop(key, None)
+
+        if self.store is not None:
+            self.store.delete(key)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    @classmethod
+    def normalize_url(cls, url):
+        parts = urlsplit(url if "//" in url else "//" + url)
+
+        scheme = (parts.scheme or "http").lower()
+        host = (parts.hostname or "").rstrip(".").lower()
+
+        if parts.port is not None and parts.port != cls.default_ports.get(scheme):
+            host = "%s:%d" % (host, parts.port)
+
+        query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+
+        return urlunsplit((scheme, host, parts.path or "/", query, ""))
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    @staticmethod
+    def _page_result(url, entry):
+        return PageResult(
+            url,
+            list(entry["realms"]),
+            final_url=entry["final_url"],
+            page_source=entry["page_source"],
+            screenshot=entry["screenshot"],
+            from_cache=True
+        )
+
+
+class PageStore(object):
+
+    def get(self, key):
+        raise NotImplementedError()
+
+    def set(self, key, entry, ttl):
+        raise NotImplementedError()
+
+    def delete(self, key):
+        raise NotImplementedError()
+
+    @staticmethod
+    def _encode_entry(entry):
+        entry = dict(entry)
+
+        if entry["screenshot"] is not None:
+            entry["screenshot"] = base64.b64encode(entry["screenshot"]).decode("ascii")
+
+        return json.dumps(entry)
+
+    @staticmethod
+    def _decode_entry(encoded_entry):
+        entry = json.loads(encoded_entry)
+
+        if entry["screenshot"] is not None:
+            entry["screenshot"] = base64.b64decode(entry["screenshot"])
+
+        return entry
+
+    @staticmethod
+    def _hash(key):
+        return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+
+class RedisPageStore(PageStore):
+
+    def __init__(self, backend):
+        if backend.asynchronous:
+            raise SeleniumRespectfulError("'backend' is expected to be a synchronous RedisBackend")
+
+        self.backend = backend
+
+    def get(self, key):
+        encoded_entry = self.backend.redis.get(self._redis_key(key))
+
+        return None if encoded_entry is None else self._decode_entry(encoded_entry.decode("utf-8"))
+
+    def set(self, key, entry, ttl):
+        self.backend.redis.set(self._redis_key(key), self._encode_entry(entry), px=int(ttl * 1000))
+
+    def delete(self, key):
+        self.backend.redis.delete(self._redis_key(key))
+
+    def _redis_key(self, key):
+        return "%s:PAGES:%s" % (self.backend.prefix, self._hash(key))
+
+
+class FilePageStore(PageStore):
+
+    def __init__(self, path):
+        self.path = path
+
+        if not os.path.isdir(path):
+            os.makedirs(path)
+
+    def get(self, key):
+        try:
+            with open(self._file_path(key), "r") as f:
+                entry = self._decode_entry(f.read())
+        except (IOError, OSError, ValueError):
+            return None
+
+        return entry
+
+    def set(self, key, entry, ttl):
+        fd, temporary_path = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+
+        with os.fdopen(fd, "w") as f:
+            f.write(self._encode_entry(entry))
+
+        os.rename(temporary_path, self._file_path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._file_path(key))
+        except OSError:
+            pass
+
+    def _file_path(self, key):
+        return os.path.join(self.path, "%s.json" % self._hash(key))
@@ -0,0 +1,12 @@
+class PageResult(object):
+
+    def __init__(self, url, realms, final_url=None, page_source=None, screenshot=None, from_cache=False):
+        self.url = url
+        self.realms = realms
+        self.final_url = final_url
+        self.page_source = page_source
+        self.screenshot = screenshot
+        self.from_cache = from_cache
+
+    def __repr__(self):
+        return "<PageResult %s%s>" % (self.url, " (cached)" if self.from_cache else "")
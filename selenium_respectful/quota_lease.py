@@ -0,0 +1,28 @@
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
+
+class QuotaLease(object):
+
+    def __init__(self, reservation, ttl, clock=None):
+        self.reservation = reservation
+        self.remaining = reservation.amount
+        self.clock = clock or monotonic
+        self.expires_at = self.clock() + ttl
+
+    @property
+    def expired(self):
+        return self.clock() >= self.expires_at
+
+    def spend(self):
+        if self.remaining <= 0 or self.expired:
+            return False
+
+        self.remaining -= 1
+
+        return True
+
+    def __repr__(self):
+        return "<QuotaLease %s: %d/%d>" % (", ".join(self.reservation.realms), self.remaining, self.reservation.amount)
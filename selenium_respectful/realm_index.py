@@ -0,0 +1,97 @@
+from .exceptions import SeleniumRespectfulError
+
+import re
+import fnmatch
+
+try:
+    from urllib.parse import urlsplit
+except ImportError:  # Python 2 Compatibility
+    from urlparse import urlsplit
+
+
+class RealmIndex(object):
+
+    glob_characters = re.compile(r"[*?\[]")
+
+    def __init__(self):
+        self._root = self._node()
+
+    def add(self, realm, patterns):
+        for pattern in patterns:
+            self._add_pattern(realm, pattern)
+
+    def match(self, url):
+        host = self.host(url)
+
+        if not host:
+            return list()
+
+        labels = host.split(".")
+
+        realms = set()
+        node = self._root
+
+        for i in range(len(labels), 0, -1):
+            self._match_globs(node, host, realms)
+
+            node = node["children"].get(labels[i - 1])
+
+            if node is None:
+                break
+
+            realms.update(node["domain"])
+
+            if i == 1:
+                realms.update(node["exact"])
+            else:
+                realms.update(node["subdomains"])
+        else:
+            self._match_globs(node, host, realms)
+
+        return sorted(realms)
+
+    @staticmethod
+    def host(url):
+        if "//" not in url:
+            url = "//" + url
+
+        return (urlsplit(url).hostname or "").rstrip(".").lower()
+
+    def _add_pattern(self, realm, pattern):
+        pattern = pattern.strip().rstrip(".").lower()
+
+        if not pattern:
+            raise SeleniumRespectfulError("Realm patterns can't be empty")
+
+        if pattern.startswith("."):
+            self._node_for(pattern[1:].split("."))["domain"].add(realm)
+        elif pattern.startswith("*.") and not self.glob_characters.search(pattern[2:]):
+            self._node_for(pattern[2:].split("."))["subdomains"].add(realm)
+        elif not self.glob_characters.search(pattern):
+            self._node_for(pattern.split("."))["exact"].add(realm)
+        else:
+            labels = pattern.split(".")
+            literal_labels = list()
+
+            while len(labels) > 1 and not self.glob_characters.search(labels[-1]):
+                literal_labels.insert(0, labels.pop())
+
+            self._node_for(literal_labels)["globs"].append((re.compile(fnmatch.translate(pattern)), realm))
+
+    def _node_for(self, labels):
+        node = self._root
+
+        for label in reversed(labels):
+            node = node["children"].setdefault(label, self._node())
+
+        return node
+
+    @staticmethod
+    def _match_globs(node, host, realms):
+        for regex, realm in node["globs"]:
+            if regex.match(host):
+                realms.add(realm)
+
+    @staticmethod
+    def _node():
+        return {"children": dict(), "exact": set(), "subdomains": set(), "domain": set(), "globs": list()}
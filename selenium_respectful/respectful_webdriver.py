@@ -1,6 +1,11 @@
 from .exceptions import SeleniumRespectfulError, SeleniumRespectfulRateLimitedError
 
-from redis import StrictRedis, ConnectionError
+from .backends import Backend, MemoryBackend, RedisBackend, QueueTicket, Reservation
+
+from .metrics import null_metrics
+from .page_result import PageResult
+from .quota_lease import QuotaLease
+from .realm_index import RealmIndex
 
 from selenium.webdriver.remote.webdriver import WebDriver
 
@@ -8,6 +13,9 @@ from types import LambdaType
 
 import yaml
 import copy
+import itertools
+import os
+import threading
 import uuid
 import time
 import inspect
@@ -17,6 +25,11 @@ try:
 except NameError:  # Python 2 Compatibility
     FileNotFoundError = IOError
 
+try:
+    from time import monotonic
+except ImportError:  # Python 2 Compatibility
+    from time import time as monotonic
+
 
 class RespectfulWebdriver:
 
@@ -24,11 +37,59 @@ class RespectfulWebdriver:
         "redis": {
             "host": "localhost",
             "port": 6379,
-            "database": 0
+            "database": 0,
+            "prefix": "SeleniumRequester",
+            "cluster": False
         },
-        "safety_threshold": 0
+        "backend": "redis",
+        "safety_threshold": 0,
+        "max_wait": None,
+        "realm_cache_ttl": 5,
+        "lease_size": 1,
+        "lease_ttl": 1,
+        "rate_increase": 1,
+        "rate_decrease": 0.5,
+        "queue_ttl": 5,
+        "fail_fast": True,
+        "concurrency_ttl": 60
     }
 
+    algorithms = ["sliding_window_log", "sliding_window_counter", "gcra"]
+
+    max_priority = 9
+
+    backends = ["redis", "memory"]
+
+    config_rules = [
+        ("safety_threshold", lambda value: isinstance(value, int) and value >= 0, "a positive integer"),
+        ("realm_cache_ttl", lambda value: isinstance(value, (int, float)) and value >= 0, "a positive number"),
+        (
+            "max_wait", lambda value: value is None or isinstance(value, (int, float)) and value >= 0,
+            "a positive number"
+        ),
+        ("lease_size", lambda value: isinstance(value, int) and value >= 1, "a positive integer"),
+        ("lease_ttl", lambda value: isinstance(value, (int, float)) and value > 0, "a positive number"),
+        ("rate_increase", lambda value: isinstance(value, (int, float)) and value > 0, "a positive number"),
+        ("rate_decrease", lambda value: isinstance(value, (int, float)) and 0 < value < 1, "a number between 0 and 1"),
+        ("queue_ttl", lambda value: isinstance(value, (int, float)) and value > 0, "a positive number"),
+        ("fail_fast", lambda value: isinstance(value, bool), "a boolean"),
+        ("concurrency_ttl", lambda value: isinstance(value, (int, float)) and value > 0, "a positive number")
+    ]
+
+    redis_config_rules = [
+        ("prefix", lambda value: isinstance(value, str) and len(value) > 0, "a non-empty string"),
+        ("cluster", lambda value: isinstance(value, bool), "a boolean"),
+        (
+            "registry_shards", lambda value: value is None or type(value) == int and value > 0,
+            "a positive integer"
+        )
+    ]
+
+    config_path = "selenium-respectful.config.yml"
+
+    _config_cache = dict()
+    _config_cache_lock = threading.Lock()
+
     def __init__(self, **kwargs):
         self.config = self._load_config()
 
@@ -37,16 +98,22 @@ class RespectfulWebdriver:
         if not WebDriver in self.webdriver.__class__.__bases__:
             raise SeleniumRespectfulError("The provided webdriver does not inherit from RemoteWebDriver")
 
-        self.redis = StrictRedis(
-            host=self.config["redis"]["host"],
-            port=self.config["redis"]["port"],
-            db=self.config["redis"]["database"],
-        )
+        self.backend = kwargs.get("backend") or self._build_backend()
+        self.metrics = kwargs.get("metrics") or null_metrics
+        self.throttle_detector = kwargs.get("throttle_detector")
+        self.page_cache = kwargs.get("page_cache")
+        self.clock = kwargs.get("clock") or monotonic
 
-        try:
-            self.redis.echo("Testing Connection")
-        except ConnectionError:
-            raise SeleniumRespectfulError("Could not establish a connection to the provided Redis server")
+        self._realms_cache = dict()
+        self._registered_realms_cache = None
+        self._realms_cache_version = None
+        self._realms_cache_validated_at = None
+        self._realm_index = None
+
+        self._leases = dict()
+        self._leases_lock = threading.Lock()
+
+        self._throttled_realms = dict()
 
     def __getattr__(self, attr):
         if attr == "get":
@@ -54,74 +121,256 @@ class RespectfulWebdriver:
         else:
             return getattr(self.webdriver, attr)
 
+    @property
+    def redis(self):
+        return getattr(self.backend, "redis", None)
+
     @property
     def redis_prefix(self):
-        return "SeleniumRequester"
+        return getattr(self.backend, "prefix", None)
+
+    def get_many(self, requests, lookahead=50):
+        requests = iter(requests)
+        pending = list()
+
+        while True:
+            for request in itertools.islice(requests, lookahead - len(pending)):
+                url, realms = request if isinstance(request, (tuple, list)) else (request, None)
+                page_result = None if self.page_cache is None else self._cached_page(url)
+
+                if page_result is not None:
+                    yield page_result
+                    continue
 
-    def register_realm(self, realm, max_requests, timespan):
-        redis_key = self._realm_redis_key(realm)
+                if realms is None:
+                    realms = self.resolve_realms(url)
 
-        if not self.redis.hexists(redis_key, "max_requests"):
-            self.redis.hmset(redis_key, {"max_requests": max_requests, "timespan": timespan})
-            self.redis.sadd("%s:REALMS" % self.redis_prefix, realm)
+                pending.append([url, self._request_realms(realms, list()), None])
+
+            if not len(pending):
+                return
+
+            retry_at = None
+
+            for request in pending:
+                url, realms, ready_at = request
+
+                if ready_at is not None and ready_at > self.clock():
+                    retry_at = ready_at if retry_at is None else min(retry_at, ready_at)
+                    continue
+
+                try:
+                    self._perform_webdriver_get(lambda: self.webdriver.get(url), realms=realms)
+                except SeleniumRespectfulRateLimitedError as e:
+                    retry_at = self._defer_request(request, e, retry_at)
+                    continue
+
+                pending.remove(request)
+
+                yield self._fetched_page(url, realms)
+                break
+            else:
+                time.sleep(max(retry_at - self.clock(), 0))
+
+    def resolve_realms(self, url):
+        if self._realm_index is None:
+            self._realm_index = self._build_realm_index(self.backend.fetch_realms_info(self.fetch_registered_realms()))
+
+        return self._realm_index.match(url)
+
+    def register_realm(self, realm, max_requests, timespan, algorithm="sliding_window_log", patterns=None,
+                       min_requests=None, windows=None, max_concurrent=None, priority_shares=None):
+        realm_info = self._realm_info(
+            max_requests, timespan, algorithm=algorithm, patterns=patterns, min_requests=min_requests, windows=windows,
+            max_concurrent=max_concurrent, priority_shares=priority_shares
+        )
+
+        if self.backend.register_realm(realm, realm_info):
+            self._clear_realms_cache()
 
         return True
 
     def register_realms(self, realm_tuples):
-        for realm_tuple in realm_tuples:
-            self.register_realm(*realm_tuple)
+        realms_info = [(realm_tuple[0], self._realm_info(*realm_tuple[1:])) for realm_tuple in realm_tuples]
+
+        if len(self.backend.register_realms(realms_info)):
+            self._clear_realms_cache()
 
         return True
 
     def update_realm(self, realm, **kwargs):
-        redis_key = self._realm_redis_key(realm)
-        updatable_keys = ["max_requests", "timespan"]
+        realm_info = self.backend.fetch_realm_info(realm) if self._updates_bounds(kwargs) else dict()
+        updates = self._realm_updates(kwargs, realm_info)
 
-        for updatable_key in updatable_keys:
-            if updatable_key in kwargs and type(kwargs[updatable_key]) == int:
-                self.redis.hset(redis_key, updatable_key, kwargs[updatable_key])
+        if len(updates) and self.backend.update_realm(realm, updates):
+            self._clear_realms_cache()
 
         return True
 
     def unregister_realm(self, realm):
-        self.redis.delete(self._realm_redis_key(realm))
-        self.redis.srem("%s:REALMS" % self.redis_prefix, realm)
-
-        request_keys = self.redis.keys("%s:REQUEST:%s:*" % (self.redis_prefix, realm))
-        [self.redis.delete(k) for k in request_keys]
+        self.backend.unregister_realm(realm)
+        self._clear_realms_cache()
 
         return True
 
     def unregister_realms(self, realms):
-        for realm in realms:
-            self.unregister_realm(realm)
+        self.backend.unregister_realms(list(realms))
+        self._clear_realms_cache()
 
         return True
 
     def fetch_registered_realms(self):
-        return list(map(lambda k: k.decode("utf-8"), self.redis.smembers("%s:REALMS" % self.redis_prefix)))
+        self._validate_realms_cache()
+
+        if self._registered_realms_cache is None:
+            self._registered_realms_cache = self.backend.fetch_registered_realms()
+
+        return list(self._registered_realms_cache)
 
     def realm_max_requests(self, realm):
-        realm_info = self._fetch_realm_info(realm)
-        return int(realm_info["max_requests".encode("utf-8")].decode("utf-8"))
+        return self._fetch_realm_info(realm)["max_requests"]
 
     def realm_timespan(self, realm):
-        realm_info = self._fetch_realm_info(realm)
-        return int(realm_info["timespan".encode("utf-8")].decode("utf-8"))
+        return self._fetch_realm_info(realm)["timespan"]
+
+    def realm_algorithm(self, realm):
+        return self._fetch_realm_info(realm)["algorithm"]
+
+    def realm_patterns(self, realm):
+        return self._fetch_realm_info(realm)["patterns"]
+
+    def realm_min_requests(self, realm):
+        return self._fetch_realm_info(realm)["min_requests"]
+
+    def realm_windows(self, realm):
+        return [tuple(window) for window in self._fetch_realm_info(realm)["windows"]]
+
+    def realm_max_concurrent(self, realm):
+        return self._fetch_realm_info(realm)["max_concurrent"]
+
+    def realm_priority_shares(self, realm):
+        return dict((priority, share) for priority, share in self._fetch_realm_info(realm)["priority_shares"])
+
+    def realm_current_max_requests(self, realm):
+        return Backend.effective_max_requests(self.backend.fetch_realm_info(realm))
+
+    def adapt_rates(self, realms, throttled):
+        rates = dict()
+
+        for realm in realms:
+            if self._fetch_realm_info(realm).get("min_requests") is None:
+                continue
+
+            started_at = self.clock()
+
+            rates[realm] = self.backend.adapt_rate(realm, throttled, **self._adapt_rate_kwargs())
+
+            if self.metrics.enabled:
+                self._record_round_trip("adapt", started_at)
+
+        return rates
+
+    def realms_status(self, realms=None):
+        if realms is None:
+            realms = self.fetch_registered_realms()
+
+        if not len(realms):
+            return dict()
+
+        return self._realms_status(self._reserve_requests(list(realms)))
+
+    def migrate_legacy_requests(self, realms=None):
+        if realms is None:
+            realms = self.fetch_registered_realms()
+
+        return self.backend.migrate_legacy_requests(realms)
+
+    def warmup(self):
+        self.backend.warmup()
+
+        realms = self.fetch_registered_realms()
+        self._realms_cache.update(self.backend.fetch_realms_info(realms))
+
+        return True
+
+    def release_leases(self):
+        for lease in self._pop_leases():
+            self._release_lease(lease)
+
+        return True
+
+    def reserve_request(self, realms, wait=False, max_wait=None, priority=0):
+        priority = self._request_priority(priority)
+
+        if not wait:
+            return self._granted_reservation(self._reserve_request(realms, priority=priority))
+
+        deadline = self._wait_deadline(max_wait)
+        ticket = self._wait_ticket(priority)
+        waited = 0
+
+        try:
+            while True:
+                reservation = self._reserve_request(realms, ticket=ticket, priority=priority)
+
+                if reservation.reserved:
+                    return reservation
+
+                delay = self._retry_delay(self._rate_limited_error(reservation), deadline)
+
+                waited_at = self.clock()
+                self._wait_turn(ticket, delay)
+                waited += self.clock() - waited_at
+        finally:
+            if not ticket.served:
+                self.backend.leave_queue(realms, ticket)
+
+            if self.metrics.enabled:
+                self.metrics.observe("wait_seconds", waited)
+
+    def release_request(self, reservation):
+        self._release_concurrency(reservation)
+
+        return True
 
     def _load_config(self):
         try:
-            with open("selenium-respectful.config.yml", "r") as f:
-                config = yaml.load(f)
+            config_mtime = os.path.getmtime(self.config_path)
+        except (IOError, OSError):
+            return copy.deepcopy(self.__class__.default_config)
 
-            if "safety_threshold" not in config:
-                config["safety_threshold"] = self.__class__.default_config.get("safety_threshold")
-            else:
-                if not isinstance(config["safety_threshold"], int) or config["safety_threshold"] < 0:
-                    raise SeleniumRespectfulError(
-                        "'safety_threshold' key must be a positive integer in 'selenium-respectful.config.yml'"
+        cache_key = (os.path.abspath(self.config_path), config_mtime)
+
+        with self._config_cache_lock:
+            if cache_key not in self._config_cache:
+                self._config_cache.clear()
+                self._config_cache[cache_key] = self._parse_config()
+
+            return copy.deepcopy(self._config_cache[cache_key])
+
+    def _parse_config(self):
+        with open(self.config_path, "r") as f:
+            config = yaml.safe_load(f) or dict()
+
+        for key, is_valid, expectation in self.__class__.config_rules:
+            if key not in config:
+                config[key] = self.__class__.default_config.get(key)
+            elif not is_valid(config[key]):
+                raise SeleniumRespectfulError(
+                    "'%s' key must be %s in 'selenium-respectful.config.yml'" % (key, expectation)
+                )
+
+        if "backend" not in config:
+            config["backend"] = self.__class__.default_config.get("backend")
+        else:
+            if config["backend"] not in self.__class__.backends:
+                raise SeleniumRespectfulError(
+                    "'backend' key must be one of %s in 'selenium-respectful.config.yml'" % (
+                        ", ".join(self.__class__.backends)
                     )
+                )
 
+        if config["backend"] == "redis":
             if "redis" not in config:
                 raise SeleniumRespectfulError("'redis' key is missing from 'selenium-respectful.config.yml'")
 
@@ -139,82 +388,572 @@ class RespectfulWebdriver:
                         "is" if len(missing_redis_keys) == 1 else "are"
                     )
                 )
-        except FileNotFoundError:
-            return copy.deepcopy(self.__class__.default_config)
+
+            for key, is_valid, expectation in self.__class__.redis_config_rules:
+                if key in config["redis"] and not is_valid(config["redis"][key]):
+                    raise SeleniumRespectfulError(
+                        "'%s' key of the 'redis' configuration must be %s in 'selenium-respectful.config.yml'" % (
+                            key, expectation
+                        )
+                    )
+
+        return config
+
+    def _build_backend(self):
+        if self.config["backend"] == "memory":
+            return MemoryBackend.shared()
+
+        return RedisBackend(**self._redis_backend_kwargs())
+
+    def _redis_backend_kwargs(self):
+        redis_config = self.config["redis"]
+
+        return {
+            "host": redis_config["host"],
+            "port": redis_config["port"],
+            "database": redis_config["database"],
+            "prefix": redis_config.get("prefix", "SeleniumRequester"),
+            "cluster": redis_config.get("cluster", False),
+            "registry_shards": redis_config.get("registry_shards")
+        }
+
+    @classmethod
+    def _realm_info(cls, max_requests, timespan, algorithm="sliding_window_log", patterns=None, min_requests=None,
+                    windows=None, max_concurrent=None, priority_shares=None):
+        if algorithm not in cls.algorithms:
+            raise SeleniumRespectfulError(
+                "'%s' is not a valid algorithm. Expected one of: %s" % (algorithm, ", ".join(cls.algorithms))
+            )
+
+        if patterns is not None:
+            RealmIndex().add(None, patterns)
+
+        realm_info = {
+            "max_requests": max_requests,
+            "timespan": timespan,
+            "algorithm": algorithm,
+            "patterns": patterns or list()
+        }
+
+        if min_requests is not None:
+            if type(min_requests) != int or not 0 < min_requests <= max_requests:
+                raise SeleniumRespectfulError("'min_requests' must be a positive integer up to 'max_requests'")
+
+            realm_info["min_requests"] = min_requests
+
+        if windows is not None:
+            realm_info["windows"] = cls._realm_windows(windows)
+
+        if max_concurrent is not None:
+            if type(max_concurrent) != int or max_concurrent <= 0:
+                raise SeleniumRespectfulError("'max_concurrent' must be a positive integer")
+
+            realm_info["max_concurrent"] = max_concurrent
+
+        if priority_shares is not None:
+            realm_info["priority_shares"] = cls._realm_priority_shares(priority_shares)
+
+        return realm_info
+
+    @staticmethod
+    def _realm_windows(windows):
+        realm_windows = list()
+
+        for window in windows:
+            if len(window) != 2 or any(type(value) != int or value <= 0 for value in window):
+                raise SeleniumRespectfulError("'windows' must be a list of (max_requests, timespan) positive integers")
+
+            realm_windows.append(list(window))
+
+        return realm_windows
+
+    @classmethod
+    def _realm_priority_shares(cls, priority_shares):
+        if not isinstance(priority_shares, dict) or sum(priority_shares.values()) >= 1 or any(
+            type(priority) != int or not 0 < priority <= cls.max_priority or not isinstance(share, (int, float)) or
+            not 0 < share < 1 for priority, share in priority_shares.items()
+        ):
+            raise SeleniumRespectfulError(
+                "'priority_shares' must map priorities from 1 to %d to shares of the realm adding up to less than 1" % (
+                    cls.max_priority
+                )
+            )
+
+        return [[priority, priority_shares[priority]] for priority in sorted(priority_shares)]
+
+    @staticmethod
+    def _updates_bounds(kwargs):
+        return kwargs.get("min_requests") is not None or kwargs.get("max_requests") is not None
+
+    @classmethod
+    def _realm_updates(cls, kwargs, realm_info=None):
+        updatable_keys = ["max_requests", "timespan", "min_requests", "max_concurrent"]
+        updates = dict()
+
+        for updatable_key in updatable_keys:
+            if updatable_key in kwargs and type(kwargs[updatable_key]) == int:
+                updates[updatable_key] = kwargs[updatable_key]
+
+        min_requests = kwargs.get("min_requests")
+
+        if min_requests is not None and (type(min_requests) != int or min_requests <= 0):
+            raise SeleniumRespectfulError("'min_requests' must be a positive integer up to 'max_requests'")
+
+        # The bounds are checked against the stored values of the realm they aren't updated with
+        bounds = dict(realm_info or dict(), **updates)
+
+        if None not in (bounds.get("min_requests"), bounds.get("max_requests")) and (
+            bounds["min_requests"] > bounds["max_requests"]
+        ):
+            raise SeleniumRespectfulError("'min_requests' must be a positive integer up to 'max_requests'")
+
+        max_concurrent = kwargs.get("max_concurrent")
+
+        if max_concurrent is not None and (type(max_concurrent) != int or max_concurrent <= 0):
+            raise SeleniumRespectfulError("'max_concurrent' must be a positive integer")
+
+        if kwargs.get("algorithm") in cls.algorithms:
+            updates["algorithm"] = kwargs["algorithm"]
+
+        if isinstance(kwargs.get("patterns"), list):
+            RealmIndex().add(None, kwargs["patterns"])
+            updates["patterns"] = kwargs["patterns"]
+
+        if isinstance(kwargs.get("windows"), list):
+            updates["windows"] = cls._realm_windows(kwargs["windows"])
+
+        if isinstance(kwargs.get("priority_shares"), dict):
+            updates["priority_shares"] = cls._realm_priority_shares(kwargs["priority_shares"])
+
+        return updates
 
     def _can_perform_get(self, realm):
-        return self._requests_in_timespan(realm) < (self.realm_max_requests(realm) - self.config["safety_threshold"])
+        return not len(self._reserve_requests([realm]).rate_limited_realms)
 
     def _realm_redis_key(self, realm):
-        return "%s:REALMS:%s" % (self.redis_prefix, realm)
+        return self.backend.realm_key(realm)
+
+    def _realm_requests_redis_key(self, realm):
+        return self.backend.realm_requests_key(realm)
 
     def _fetch_realm_info(self, realm):
-        redis_key = self._realm_redis_key(realm)
-        return self.redis.hgetall(redis_key)
+        self._validate_realms_cache()
+
+        if realm not in self._realms_cache:
+            self._realms_cache[realm] = self.backend.fetch_realm_info(realm)
+
+        return self._realms_cache[realm]
+
+    def _validate_realms_cache(self, realms_version=None):
+        if realms_version is None:
+            if self._realms_cache_is_fresh():
+                return
+
+            realms_version = self.backend.realms_version()
+
+        self._track_realms_version(realms_version)
+
+    def _realms_cache_is_fresh(self):
+        validated_at = self._realms_cache_validated_at
+
+        return validated_at is not None and self.clock() - validated_at < self.config["realm_cache_ttl"]
+
+    def _track_realms_version(self, realms_version):
+        if realms_version != self._realms_cache_version:
+            self._realms_cache_version = realms_version
+            self._clear_realms_cache()
+
+        self._realms_cache_validated_at = self.clock()
+
+    def _clear_realms_cache(self):
+        self._realms_cache = dict()
+        self._registered_realms_cache = None
+        self._realm_index = None
+        self._throttled_realms = dict()
 
     def _requests_in_timespan(self, realm):
-        return len(
-            self.redis.scan(
-                cursor=0,
-                match="%s:REQUEST:%s:*" % (self.redis_prefix, realm),
-                count=self._redis_keys_in_db() + 100
-            )[1]
+        return self._reserve_requests([realm]).counts[realm]
+
+    def _reserve_requests(self, realms, request_uuid=None, amount=1, ticket=None, priority=0):
+        started_at = self.clock()
+
+        reservation = self.backend.reserve(realms, **self._reserve_kwargs(request_uuid, amount, ticket, priority))
+
+        self._track_reservation(reservation, request_uuid, ticket, started_at)
+        self._validate_realms_cache(realms_version=reservation.realms_version)
+        self._remember_throttled_realms(reservation, priority)
+
+        return reservation
+
+    def _reserve_kwargs(self, request_uuid, amount, ticket, priority):
+        return dict(
+            request_id=request_uuid,
+            safety_threshold=self.config["safety_threshold"],
+            amount=amount,
+            ticket=ticket,
+            concurrency_ttl=self.config["concurrency_ttl"],
+            priority=priority
         )
 
-    def _redis_keys_in_db(self):
-        return self.redis.info().get("db%d" % self.config["redis"]["database"]).get("keys")
+    def _track_reservation(self, reservation, request_uuid, ticket, started_at):
+        if ticket is not None:
+            ticket.track(reservation)
+
+        if self.metrics.enabled:
+            self._record_round_trip("reserve" if request_uuid is not None else "peek", started_at)
+
+            if request_uuid is not None:
+                self._record_decisions(reservation)
 
     def _selenium_webdriver_proxy_get(self, *args, **kwargs):
-        realms = kwargs.pop("realms", list())
+        url = self._get_url(args, kwargs)
 
-        if not len(realms):
-            raise SeleniumRespectfulError("'realms' is a required kwarg")
+        if self.page_cache is not None:
+            page_result = self._cached_page(url)
 
-        wait = kwargs.pop("wait", False)
+            if page_result is not None:
+                return page_result
 
-        return self._webdriver_get(lambda: self.webdriver.get(*args, **kwargs), realms=realms, wait=wait)
+        realms, additional_realms, wait, max_wait, priority = self._pop_get_options(kwargs)
 
-    def _webdriver_get(self, get_func, realms=None, wait=False):
-        registered_realms = self.fetch_registered_realms()
+        if realms is None:
+            realms = self.resolve_realms(url)
 
-        for realm in realms:
-            if realm not in registered_realms:
-                raise SeleniumRespectfulError("Realm '%s' hasn't been registered" % realm)
+        realms = self._request_realms(realms, additional_realms)
 
-        if wait:
-            while True:
-                try:
-                    return self._perform_webdriver_get(get_func, realms=realms)
-                except SeleniumRespectfulRateLimitedError:
-                    pass
+        result = self._webdriver_get(
+            lambda: self.webdriver.get(*args, **kwargs), realms=realms, wait=wait, max_wait=max_wait, priority=priority)
+
+        if self.page_cache is None:
+            return result
 
-                time.sleep(1)
+        return self._fetched_page(url, realms)
+
+    def _webdriver_get(self, get_func, realms=None, wait=False, max_wait=None, priority=0):
+        return self._perform_webdriver_get(get_func, realms=realms, wait=wait, max_wait=max_wait, priority=priority)
+
+    def _wait_turn(self, ticket, delay):
+        # At the head of every queue, only the realms themselves hold the request back until a slot frees up
+        if ticket.blocked_on is None:
+            time.sleep(delay)
         else:
-            return self._perform_webdriver_get(get_func, realms=realms)
+            self.backend.wait_turn(ticket, delay)
 
-    def _perform_webdriver_get(self, get_func, realms=None):
+    def _perform_webdriver_get(self, get_func, realms=None, wait=False, max_wait=None, priority=0):
         self._validate_get_func(get_func)
 
-        rate_limited_realms = list()
+        reservation = self.reserve_request(realms, wait=wait, max_wait=max_wait, priority=priority)
+
+        try:
+            return self._load_page(get_func, realms)
+        finally:
+            self.release_request(reservation)
+
+    def _load_page(self, get_func, realms):
+        if self.throttle_detector is None and not self.metrics.enabled:
+            return get_func()
+
+        started_at = self.clock()
+
+        try:
+            result = get_func()
+        finally:
+            load_seconds = self._observe_load(started_at)
+
+        if self.throttle_detector is not None:
+            self.adapt_rates(realms, self.throttle_detector(self.webdriver, load_seconds))
+
+        return result
+
+    def _reserve_request(self, realms, ticket=None, priority=0):
+        reservation, stale_leases = self._local_reservation(realms, ticket, priority)
+
+        for lease in stale_leases:
+            self._release_lease(lease)
+
+        if reservation is not None:
+            return reservation
+
+        reservation = self._reserve_requests(
+            realms, request_uuid=str(uuid.uuid4()), amount=self.config["lease_size"], ticket=ticket, priority=priority
+        )
+
+        replaced_lease = self._store_lease(realms, reservation, priority)
+
+        if replaced_lease is not None:
+            self._release_lease(replaced_lease)
+
+        return reservation
+
+    def _local_reservation(self, realms, ticket=None, priority=0):
+        # Requests are answered without a round trip when their realms are known to be rate-limited or a lease
+        # still holds some, along with the leases gone stale that have to be given back
+        if ticket is None:
+            reservation = self._throttled_reservation(realms, priority)
+
+            if reservation is not None:
+                return reservation, list()
+
+        if self.config["lease_size"] <= 1:
+            return None, list()
+
+        return self._spend_lease(realms, priority)
+
+    def _spend_lease(self, realms, priority=0):
+        # Leases are kept per priority, as lower priorities may be held back from part of a realm
+        with self._leases_lock:
+            lease = self._leases.get((tuple(realms), priority))
+
+            # Expired leases of other realms are given back too, as their realms may not be requested again
+            stale_leases = [
+                self._leases.pop(key) for key, other_lease in list(self._leases.items())
+                if other_lease is not lease and other_lease.expired
+            ]
+
+            if lease is None:
+                return None, stale_leases
+
+            if lease.spend():
+                if self.metrics.enabled:
+                    self._record_decisions(lease.reservation)
+
+                return lease.reservation, stale_leases
+
+            del self._leases[(tuple(realms), priority)]
+
+        return None, stale_leases + [lease]
+
+    def _store_lease(self, realms, reservation, priority=0):
+        if not reservation.reserved or self.config["lease_size"] <= 1:
+            return None
+
+        lease = QuotaLease(reservation, self.config["lease_ttl"], clock=self.clock)
+        lease.spend()
+
+        with self._leases_lock:
+            replaced_lease = self._leases.get((tuple(realms), priority))
+            self._leases[(tuple(realms), priority)] = lease
+
+        return replaced_lease
 
+    def _pop_leases(self):
+        with self._leases_lock:
+            leases = list(self._leases.values())
+            self._leases = dict()
+
+        return leases
+
+    def _release_lease(self, lease):
+        if lease.remaining > 0:
+            self._forget_throttled_realms(lease.reservation.realms)
+
+            started_at = self.clock()
+
+            self.backend.release(lease.reservation, lease.remaining, safety_threshold=self.config["safety_threshold"])
+
+            if self.metrics.enabled:
+                self._record_round_trip("release", started_at)
+
+    def _release_concurrency(self, reservation):
+        if len(reservation.concurrent_realms):
+            started_at = self.clock()
+
+            self.backend.release_concurrency(reservation)
+
+            if self.metrics.enabled:
+                self._record_round_trip("release_concurrency", started_at)
+
+    def _remember_throttled_realms(self, reservation, priority=0):
+        if not self.config["fail_fast"]:
+            return
+
+        now = self.clock()
+
+        for realm in reservation.realms:
+            wait = reservation.waits.get(realm)
+
+            if realm in reservation.rate_limited_realms and wait:
+                self._throttled_realms[realm] = (now + wait, reservation.binding_windows.get(realm), priority)
+            else:
+                self._throttled_realms.pop(realm, None)
+
+    def _forget_throttled_realms(self, realms):
         for realm in realms:
-            if not self._can_perform_get(realm):
-                rate_limited_realms.append(realm)
+            self._throttled_realms.pop(realm, None)
 
-        if not len(rate_limited_realms):
-            for realm in realms:
-                request_uuid = str(uuid.uuid4())
+    def _throttled_reservation(self, realms, priority=0):
+        if not self.config["fail_fast"] or not len(self._throttled_realms):
+            return None
 
-                self.redis.setex(
-                    name="%s:REQUEST:%s:%s" % (self.redis_prefix, realm, request_uuid),
-                    time=self.realm_timespan(realm),
-                    value=request_uuid
-                )
+        now = self.clock()
+        waits = dict()
+        binding_windows = dict()
 
-            return get_func()
-        else:
-            raise SeleniumRespectfulRateLimitedError(
-                "Currently rate-limited on Realm(s): %s" % ", ".join(rate_limited_realms))
+        # Realms known to be rate-limited are rejected locally, without a round trip, until they free up.
+        # Higher priorities than the one that was rate-limited may still have room, and are checked
+        for realm in realms:
+            throttled_until, binding_window, throttled_priority = self._throttled_realms.get(realm, (0, None, 0))
+
+            if throttled_until <= now or priority > throttled_priority:
+                continue
+
+            waits[realm] = throttled_until - now
+
+            if binding_window is not None:
+                binding_windows[realm] = binding_window
+
+        if not len(waits):
+            return None
+
+        reservation = Reservation(
+            False,
+            realms,
+            rate_limited_realms=[realm for realm in realms if realm in waits],
+            waits=waits,
+            binding_windows=binding_windows
+        )
+
+        if self.metrics.enabled:
+            self._record_decisions(reservation)
+
+        return reservation
+
+    def _record_round_trip(self, operation, started_at):
+        self.metrics.increment("limiter_round_trips_total", labels={"operation": operation})
+        self.metrics.observe("limiter_seconds", self.clock() - started_at, labels={"operation": operation})
+
+    def _record_decisions(self, reservation):
+        for realm in reservation.realms:
+            if reservation.reserved:
+                self.metrics.increment("decisions_total", labels={"realm": realm, "decision": "allowed"})
+            elif realm in reservation.rate_limited_realms:
+                self.metrics.increment("decisions_total", labels={"realm": realm, "decision": "rejected"})
+
+    @staticmethod
+    def _realms_status(reservation):
+        return dict([
+            (realm, {
+                "used": reservation.counts[realm],
+                "remaining": reservation.availables[realm],
+                "queued": reservation.queue_lengths.get(realm, 0),
+                "retry_after": reservation.waits[realm],
+                "window": reservation.binding_windows.get(realm)
+            })
+            for realm in reservation.realms
+        ])
+
+    def _cached_page(self, url):
+        page_result = self.page_cache.get(url)
+
+        if self.metrics.enabled:
+            self.metrics.increment("page_cache_total", labels={"result": "miss" if page_result is None else "hit"})
+
+        return page_result
+
+    def _fetched_page(self, url, realms):
+        if self.page_cache is None:
+            return self._page_result(url, realms)
+
+        page_result = self._page_result(url, realms, screenshot=self.page_cache.screenshots)
+        self.page_cache.set(url, page_result)
+
+        return page_result
+
+    def _page_result(self, url, realms, screenshot=False):
+        return PageResult(
+            url,
+            realms,
+            final_url=self.webdriver.current_url,
+            page_source=self.webdriver.page_source,
+            screenshot=self.webdriver.get_screenshot_as_png() if screenshot else None
+        )
+
+    @staticmethod
+    def _get_url(args, kwargs):
+        return args[0] if len(args) else kwargs.get("url", "")
+
+    @staticmethod
+    def _request_realms(realms, additional_realms):
+        realms = list(realms) + [realm for realm in additional_realms if realm not in realms]
+
+        if not len(realms):
+            raise SeleniumRespectfulError("'realms' is a required kwarg when no registered realm matches the url")
+
+        return realms
+
+    @classmethod
+    def _request_priority(cls, priority):
+        if type(priority) != int or not 0 <= priority <= cls.max_priority:
+            raise SeleniumRespectfulError("'priority' must be an integer from 0 to %d" % cls.max_priority)
+
+        return priority
+
+    @staticmethod
+    def _rate_limited_error(reservation):
+        return SeleniumRespectfulRateLimitedError(
+            "Currently rate-limited on Realm(s): %s" % ", ".join(reservation.rate_limited_realms),
+            realms=reservation.rate_limited_realms,
+            retry_after=reservation.retry_after,
+            windows=dict([
+                (realm, reservation.binding_windows[realm])
+                for realm in reservation.rate_limited_realms if realm in reservation.binding_windows
+            ])
+        )
+
+    def _pop_get_options(self, kwargs):
+        return (
+            kwargs.pop("realms", None),
+            kwargs.pop("additional_realms", list()),
+            kwargs.pop("wait", False),
+            kwargs.pop("max_wait", self.config["max_wait"]),
+            self._request_priority(kwargs.pop("priority", 0))
+        )
+
+    def _adapt_rate_kwargs(self):
+        return dict(increase=self.config["rate_increase"], decrease=self.config["rate_decrease"])
+
+    def _wait_ticket(self, priority):
+        return QueueTicket(ttl=self.config["queue_ttl"], priority=priority)
+
+    def _observe_load(self, started_at):
+        load_seconds = self.clock() - started_at
+
+        if self.metrics.enabled:
+            self.metrics.observe("get_seconds", load_seconds)
+
+        return load_seconds
+
+    @staticmethod
+    def _build_realm_index(realms_info):
+        realm_index = RealmIndex()
+
+        for realm, realm_info in realms_info.items():
+            realm_index.add(realm, realm_info.get("patterns", list()))
+
+        return realm_index
+
+    @classmethod
+    def _granted_reservation(cls, reservation):
+        if not reservation.reserved:
+            raise cls._rate_limited_error(reservation)
+
+        return reservation
+
+    def _wait_deadline(self, max_wait):
+        return None if max_wait is None else self.clock() + max_wait
+
+    def _defer_request(self, request, rate_limited_error, retry_at):
+        request[2] = self.clock() + (rate_limited_error.retry_after if rate_limited_error.retry_after is not None else 1)
+
+        return request[2] if retry_at is None else min(retry_at, request[2])
+
+    def _retry_delay(self, rate_limited_error, deadline):
+        delay = rate_limited_error.retry_after if rate_limited_error.retry_after is not None else 1
+
+        if deadline is not None and self.clock() + delay > deadline:
+            raise rate_limited_error
+
+        return delay
 
     @staticmethod
     def _validate_get_func(get_func):
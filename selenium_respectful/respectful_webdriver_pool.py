@@ -0,0 +1,195 @@
+from .exceptions import SeleniumRespectfulError
+
+from .metrics import null_metrics
+from .respectful_webdriver import RespectfulWebdriver, monotonic
+
+from contextlib import contextmanager
+
+import threading
+
+try:
+    import queue
+except ImportError:  # Python 2 Compatibility
+    import Queue as queue
+
+
+class RespectfulWebdriverPool(object):
+
+    def __init__(self, webdriver_factory, size=1, max_uses=None, max_age=None, health_check=None, backend=None,
+                 metrics=None, throttle_detector=None):
+        if size < 1:
+            raise SeleniumRespectfulError("'size' is expected to be a positive integer")
+
+        self.webdriver_factory = webdriver_factory
+        self.size = size
+        self.max_uses = max_uses
+        self.max_age = max_age
+        self.health_check = health_check or self._default_health_check
+        self.metrics = metrics or null_metrics
+        self.throttle_detector = throttle_detector
+
+        self._idle = queue.Queue()
+        self._leased = set()
+        self._lock = threading.Lock()
+        self._closed = False
+
+        self.backend = backend
+
+        driver = self._start_driver()
+
+        self.backend = driver.backend
+        self.config = driver.config
+
+        # Requests are reserved by a limiter of its own, which is never leased, so the state it keeps between
+        # requests (realms cache, throttled realms, leases) is never touched by the threads using the drivers.
+        # It never drives its webdriver
+        self._limiter = RespectfulWebdriver(
+            webdriver=driver.webdriver,
+            backend=self.backend,
+            metrics=self.metrics
+        )
+
+        self._idle.put(driver)
+
+        for _ in range(size - 1):
+            self._idle.put(self._start_driver())
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @contextmanager
+    def get(self, *args, **kwargs):
+        realms = kwargs.pop("realms", None)
+        additional_realms = kwargs.pop("additional_realms", list())
+
+        if realms is None:
+            with self._lock:
+                realms = self._limiter.resolve_realms(RespectfulWebdriver._get_url(args, kwargs))
+
+        realms = RespectfulWebdriver._request_realms(realms, additional_realms)
+
+        wait = kwargs.pop("wait", False)
+        max_wait = kwargs.pop("max_wait", self.config["max_wait"])
+        lease_timeout = kwargs.pop("lease_timeout", None)
+        priority = RespectfulWebdriver._request_priority(kwargs.pop("priority", 0))
+
+        # The webdriver is leased first, so no slot or quota of the realms is held while waiting for one
+        driver = self._acquire(timeout=lease_timeout)
+
+        try:
+            reservation = self._limiter.reserve_request(realms, wait=wait, max_wait=max_wait, priority=priority)
+            started_at = monotonic()
+
+            try:
+                driver.webdriver.get(*args, **kwargs)
+                load_seconds = monotonic() - started_at
+            finally:
+                self._limiter.release_request(reservation)
+
+            if self.metrics.enabled:
+                self.metrics.observe("get_seconds", load_seconds)
+
+            if self.throttle_detector is not None:
+                self._limiter.adapt_rates(realms, self.throttle_detector(driver.webdriver, load_seconds))
+
+            yield driver
+        finally:
+            self._release(driver)
+
+    @contextmanager
+    def lease(self, timeout=None):
+        driver = self._acquire(timeout=timeout)
+
+        try:
+            yield driver
+        finally:
+            self._release(driver)
+
+    def close(self):
+        with self._lock:
+            self._closed = True
+
+        self._limiter.release_leases()
+
+        while True:
+            try:
+                driver = self._idle.get_nowait()
+            except queue.Empty:
+                break
+
+            self._quit_driver(driver)
+
+    def _acquire(self, timeout=None):
+        if self._closed:
+            raise SeleniumRespectfulError("The pool has been closed")
+
+        try:
+            driver = self._idle.get(timeout=timeout)
+        except queue.Empty:
+            raise SeleniumRespectfulError("No webdriver was released by the pool within %s seconds" % timeout)
+
+        if self._is_expired(driver) or not self._is_healthy(driver):
+            self._quit_driver(driver)
+            driver = self._start_driver()
+
+        with self._lock:
+            self._leased.add(driver)
+
+        return driver
+
+    def _release(self, driver):
+        driver.pool_uses += 1
+
+        with self._lock:
+            self._leased.discard(driver)
+            closed = self._closed
+
+        if closed:
+            self._quit_driver(driver)
+        elif self._is_expired(driver):
+            self._quit_driver(driver)
+            self._idle.put(self._start_driver())
+        else:
+            self._idle.put(driver)
+
+    def _start_driver(self):
+        driver = RespectfulWebdriver(
+            webdriver=self.webdriver_factory(),
+            backend=self.backend,
+            metrics=self.metrics,
+            throttle_detector=self.throttle_detector
+        )
+
+        driver.pool_uses = 0
+        driver.pool_started_at = monotonic()
+
+        return driver
+
+    def _is_expired(self, driver):
+        if self.max_uses is not None and driver.pool_uses >= self.max_uses:
+            return True
+
+        if self.max_age is not None and monotonic() - driver.pool_started_at >= self.max_age:
+            return True
+
+        return False
+
+    def _is_healthy(self, driver):
+        try:
+            return self.health_check(driver.webdriver) is not False
+        except Exception:
+            return False
+
+    @staticmethod
+    def _quit_driver(driver):
+        try:
+            driver.webdriver.quit()
+        except Exception:
+            pass
+
+    @staticmethod
+    def _default_health_check(webdriver):
+        webdriver.current_url
@@ -9,6 +9,7 @@ except(IOError, ImportError):
 
 packages = [
     'selenium_respectful',
+    'selenium_respectful.backends',
 ]
 
 requires = [
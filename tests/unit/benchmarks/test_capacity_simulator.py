@@ -0,0 +1,108 @@
+# -*- coding: utf-8 -*-
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "..", "..", "benchmarks"))
+
+import capacity_simulator
+
+import argparse
+
+
+def simulation_arguments(**kwargs):
+    arguments = {
+        "trace": None, "duration": 600, "rate": 2, "seed": 1,
+        "realms": [capacity_simulator.realm_spec("TEST123:10:60:2"), capacity_simulator.realm_spec("TEST234:30:60")],
+        "algorithm": "sliding_window_log", "safety_threshold": 0, "workers": 4, "latency": 3, "latency_jitter": 0.5,
+        "max_wait": 30, "queue_ttl": 5, "concurrency_ttl": 60, "lease_size": 1, "lease_ttl": 60
+    }
+    arguments.update(kwargs)
+
+    return argparse.Namespace(**arguments)
+
+
+def most_in_a_timespan(calls, timespan):
+    return max(len([other for other in calls if call.loaded_at <= other.loaded_at < call.loaded_at + timespan])
+               for call in calls)
+
+
+def most_in_flight(calls):
+    return max(len([other for other in calls if other.loaded_at <= call.loaded_at < other.completed_at])
+               for call in calls)
+
+
+# Tests
+def test_the_simulation_should_serve_or_drop_every_call_within_the_limits_of_its_realms():
+    arguments = simulation_arguments()
+    realms = capacity_simulator.build_realms(arguments)
+
+    calls = capacity_simulator.Simulation(arguments, realms, capacity_simulator.load_calls(arguments, realms)).run()
+
+    served = [call for call in calls if call.reservation is not None]
+    dropped = [call for call in calls if call.dropped]
+
+    assert len(served) and len(dropped)
+    assert len(served) + len(dropped) == len(calls)
+    assert all(call.loaded_at - call.at <= arguments.max_wait for call in served)
+
+    for realm, realm_info in realms:
+        realm_served = [call for call in served if realm in call.realms]
+
+        assert most_in_a_timespan(realm_served, realm_info["timespan"]) <= realm_info["max_requests"]
+        assert most_in_flight(realm_served) <= realm_info.get("max_concurrent", arguments.workers)
+
+    report = capacity_simulator.report(arguments, realms, calls, 0)
+
+    assert report["served"] == len(served)
+    assert report["dropped"] == len(dropped)
+
+
+def test_the_simulation_should_drop_the_calls_that_would_wait_past_their_max_wait():
+    arguments = simulation_arguments(
+        realms=[capacity_simulator.realm_spec("TEST123:1:10")], workers=1, latency=1, latency_jitter=0, max_wait=15
+    )
+    realms = capacity_simulator.build_realms(arguments)
+
+    calls = capacity_simulator.Simulation(arguments, realms, [
+        capacity_simulator.Call(i, 0, "http://test123.simulated/%d" % i, ["TEST123"]) for i in range(3)
+    ]).run()
+
+    assert [call.dropped for call in calls] == [False, False, True]
+    assert [call.loaded_at - call.at for call in calls[:2]] == [0, 10]
+
+    report = capacity_simulator.report(arguments, realms, calls, 0)
+
+    assert report["dropped"] == 1
+    assert report["delay_max"] == 10
+
+
+def test_the_simulation_should_wake_the_calls_waiting_on_requests_in_flight_as_soon_as_they_complete():
+    arguments = simulation_arguments(
+        realms=[capacity_simulator.realm_spec("TEST123:100:60:1")], workers=2, latency=1.5, latency_jitter=0,
+        max_wait=None
+    )
+    realms = capacity_simulator.build_realms(arguments)
+
+    calls = capacity_simulator.Simulation(arguments, realms, [
+        capacity_simulator.Call(i, 0, "http://test123.simulated/%d" % i, ["TEST123"]) for i in range(3)
+    ]).run()
+
+    assert [call.loaded_at for call in calls] == [0, 1.5, 3]
+
+
+def test_the_simulation_should_reserve_through_the_leases_and_throttled_realms_of_its_drivers():
+    arguments = simulation_arguments(
+        realms=[capacity_simulator.realm_spec("TEST123:4:60")], workers=1, latency=1, latency_jitter=0, max_wait=0,
+        lease_size=2
+    )
+    realms = capacity_simulator.build_realms(arguments)
+
+    simulation = capacity_simulator.Simulation(arguments, realms, [
+        capacity_simulator.Call(i, i, "http://test123.simulated/%d" % i, ["TEST123"]) for i in range(6)
+    ])
+    calls = simulation.run()
+
+    assert [call.dropped for call in calls] == [False] * 4 + [True] * 2
+    assert calls[0].reservation is calls[1].reservation
+    assert calls[2].reservation is calls[3].reservation
+    assert simulation.drivers[0]._throttled_realms["TEST123"][0] > calls[-1].at
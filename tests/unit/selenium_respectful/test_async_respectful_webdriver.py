@@ -0,0 +1,187 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium_respectful import AsyncRespectfulWebdriver
+from selenium_respectful import SeleniumRespectfulError, SeleniumRespectfulRateLimitedError
+from selenium_respectful import PageCache, RedisPageStore
+from selenium_respectful.backends import MemoryBackend, RedisBackend, AsyncRedisBackend, AsyncBackendAdapter
+
+from selenium.webdriver.phantomjs.webdriver import WebDriver
+
+import asyncio
+import time
+
+webdriver = WebDriver()
+
+
+def run(coroutine):
+    return asyncio.get_event_loop().run_until_complete(coroutine)
+
+
+# Tests
+def test_the_instance_should_use_the_async_redis_backend_by_default():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+    assert isinstance(driver.backend, AsyncRedisBackend)
+
+
+def test_the_instance_should_wrap_synchronous_backends():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+    assert isinstance(driver.backend, AsyncBackendAdapter)
+
+
+def test_the_instance_should_be_able_to_register_a_realm():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+
+    run(driver.register_realm("TEST123", max_requests=100, timespan=300))
+
+    assert run(driver.realm_max_requests("TEST123")) == 100
+    assert run(driver.realm_timespan("TEST123")) == 300
+    assert "TEST123" in run(driver.fetch_registered_realms())
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_not_allow_a_request_to_be_made_on_an_unregistered_realm():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+
+    with pytest.raises(SeleniumRespectfulError):
+        run(driver.get("http://google.com", realms=["TEST123"]))
+
+
+def test_the_instance_should_resolve_the_realms_of_a_request_from_its_url():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    run(driver.register_realm("TEST123", max_requests=1, timespan=5, patterns=[".google.com"]))
+
+    assert run(driver.resolve_realms("http://www.google.com")) == ["TEST123"]
+
+    run(driver.get("http://google.com"))
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        run(driver.get("http://www.google.com"))
+
+    with pytest.raises(SeleniumRespectfulError):
+        run(driver.get("http://example.com"))
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_not_allow_get_many_requests_without_realms():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    async def get_many(requests):
+        return [page_result async for page_result in driver.get_many(requests)]
+
+    with pytest.raises(SeleniumRespectfulError):
+        run(get_many(["http://example.com"]))
+
+    with pytest.raises(SeleniumRespectfulError):
+        run(get_many([("http://example.com", [])]))
+
+
+def test_the_instance_should_share_its_page_cache_through_a_synchronous_redis_backend():
+    with pytest.raises(SeleniumRespectfulError):
+        RedisPageStore(AsyncRedisBackend())
+
+    with pytest.raises(SeleniumRespectfulError):
+        RedisPageStore(AsyncBackendAdapter(RedisBackend()))
+
+    driver = AsyncRespectfulWebdriver(
+        webdriver=webdriver, backend=MemoryBackend(), page_cache=PageCache(store=RedisPageStore(RedisBackend()))
+    )
+
+    driver.page_cache.store.delete(PageCache.normalize_url("http://google.com"))
+    run(driver.register_realm("TEST123", max_requests=1, timespan=5))
+
+    try:
+        assert not run(driver.get("http://google.com", realms=["TEST123"])).from_cache
+
+        driver.page_cache.clear()
+
+        assert run(driver.get("http://google.com", realms=["TEST123"])).from_cache
+    finally:
+        driver.page_cache.store.delete(PageCache.normalize_url("http://google.com"))
+        run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_be_able_to_migrate_legacy_request_keys_of_a_registered_realm():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+
+    run(driver.register_realm("TEST123", max_requests=1000, timespan=5))
+
+    run(driver.redis.set("%s:REQUEST:%s:%s" % (driver.redis_prefix, "TEST123", "LEGACY1"), "LEGACY1", ex=5))
+    run(driver.redis.set("%s:REQUEST:%s:%s" % (driver.redis_prefix, "TEST123", "LEGACY2"), "LEGACY2", ex=5))
+
+    try:
+        assert run(driver.migrate_legacy_requests(["TEST123"])) == 2
+
+        assert run(driver._requests_in_timespan("TEST123")) == 2
+        assert not len(run(driver.redis.keys("%s:REQUEST:%s:*" % (driver.redis_prefix, "TEST123"))))
+    finally:
+        run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_perform_the_request_if_it_is_allowed_to_on_a_registered_realm():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+
+    run(driver.register_realm("TEST123", max_requests=1000, timespan=5))
+
+    run(driver.get("http://google.com", realms=["TEST123"]))
+    assert run(driver.find_element_by_tag_name("body")) is not None
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_return_a_rate_limit_exception_if_the_request_is_not_allowed_on_a_registered_realm():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver)
+
+    run(driver.register_realm("TEST123", max_requests=0, timespan=5))
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        run(driver.get("http://google.com", realms=["TEST123"]))
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_be_able_to_wait_for_requests_without_blocking_the_event_loop():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    run(driver.register_realm("TEST123", max_requests=1, timespan=1))
+
+    ticks = list()
+
+    async def tick():
+        for _ in range(10):
+            ticks.append(time.time())
+            await asyncio.sleep(0.1)
+
+    async def get_twice():
+        await driver.get("http://google.com", realms=["TEST123"], wait=True)
+        await driver.get("http://google.com", realms=["TEST123"], wait=True)
+
+    run(asyncio.gather(tick(), get_twice()))
+
+    assert len(ticks) == 10
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_the_instance_should_reserve_and_release_requests_without_performing_them():
+    driver = AsyncRespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    run(driver.register_realm("TEST123", max_requests=100, timespan=60, max_concurrent=1))
+
+    reservation = run(driver.reserve_request(["TEST123"]))
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        run(driver.reserve_request(["TEST123"], wait=True, max_wait=0.1))
+
+    run(driver.release_request(reservation))
+
+    assert run(driver.reserve_request(["TEST123"], wait=True, max_wait=0.1)).reserved
+
+    run(driver.unregister_realm("TEST123"))
+
+
+def test_teardown():
+    webdriver.quit()
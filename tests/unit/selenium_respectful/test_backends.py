@@ -0,0 +1,610 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium_respectful import SeleniumRespectfulError
+from selenium_respectful.backends import MemoryBackend, FileBackend, RedisBackend, QueueTicket
+
+import threading
+import time
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+def realm_info(max_requests, timespan, algorithm):
+    return {"max_requests": max_requests, "timespan": timespan, "algorithm": algorithm}
+
+
+# Tests
+def test_the_memory_backend_should_be_able_to_register_a_realm():
+    backend = MemoryBackend()
+
+    assert backend.register_realm("TEST123", realm_info(100, 300, "sliding_window_log"))
+    assert not backend.register_realm("TEST123", realm_info(1000, 3000, "gcra"))
+
+    assert backend.fetch_realm_info("TEST123") == {
+        "max_requests": 100, "timespan": 300, "algorithm": "sliding_window_log", "patterns": [], "min_requests": None,
+        "windows": [], "max_concurrent": None, "priority_shares": []
+    }
+
+    assert backend.fetch_registered_realms() == ["TEST123"]
+
+
+def test_the_memory_backend_should_bump_its_realms_version_on_every_change():
+    backend = MemoryBackend()
+
+    backend.register_realm("TEST123", realm_info(100, 300, "sliding_window_log"))
+    assert backend.realms_version() == 1
+
+    backend.update_realm("TEST123", {"max_requests": 1000})
+    assert backend.realms_version() == 2
+
+    backend.unregister_realm("TEST123")
+    assert backend.realms_version() == 3
+
+
+def test_the_memory_backend_should_register_and_unregister_realms_in_bulk():
+    backend = MemoryBackend()
+
+    backend.register_realm("TEST123", realm_info(100, 300, "sliding_window_log"))
+
+    registered = backend.register_realms([
+        ("TEST123", realm_info(1000, 3000, "gcra")),
+        ("TEST234", realm_info(10, 60, "gcra")),
+        ("TEST345", realm_info(20, 60, "sliding_window_counter"))
+    ])
+
+    assert registered == ["TEST234", "TEST345"]
+    assert backend.fetch_realm_info("TEST123")["max_requests"] == 100
+    assert backend.realms_version() == 2
+
+    backend.unregister_realms(["TEST123", "TEST234", "TEST345"])
+
+    assert backend.fetch_registered_realms() == []
+    assert backend.realms_version() == 3
+
+
+def test_the_memory_backend_should_reject_reservations_on_unregistered_realms():
+    backend = MemoryBackend()
+
+    with pytest.raises(SeleniumRespectfulError):
+        backend.reserve(["TEST123"], request_id="1")
+
+
+def test_the_memory_backend_should_enforce_the_limit_of_a_realm_with_every_algorithm():
+    for algorithm in ["sliding_window_log", "sliding_window_counter", "gcra"]:
+        clock = Clock()
+        backend = MemoryBackend(clock=clock)
+
+        backend.register_realm("TEST123", realm_info(3, 10, algorithm))
+
+        assert backend.reserve(["TEST123"], request_id="1").reserved
+        assert backend.reserve(["TEST123"], request_id="2").reserved
+        assert backend.reserve(["TEST123"], request_id="3").reserved
+
+        reservation = backend.reserve(["TEST123"], request_id="4")
+
+        assert not reservation.reserved
+        assert reservation.rate_limited_realms == ["TEST123"]
+        assert reservation.retry_after > 0
+
+        clock.now += reservation.retry_after
+
+        assert backend.reserve(["TEST123"], request_id="5").reserved
+
+
+def test_the_memory_backend_should_reserve_all_realms_or_none():
+    backend = MemoryBackend()
+
+    backend.register_realm("TEST123", realm_info(10, 300, "sliding_window_log"))
+    backend.register_realm("TEST234", realm_info(0, 300, "sliding_window_log"))
+
+    reservation = backend.reserve(["TEST123", "TEST234"], request_id="1")
+
+    assert not reservation.reserved
+    assert reservation.rate_limited_realms == ["TEST234"]
+    assert reservation.retry_after is None
+
+    assert backend.reserve(["TEST123"]).counts["TEST123"] == 0
+
+
+def test_the_memory_backend_should_not_reserve_when_peeking():
+    backend = MemoryBackend()
+
+    backend.register_realm("TEST123", realm_info(10, 300, "sliding_window_log"))
+
+    assert not backend.reserve(["TEST123"]).reserved
+    assert backend.reserve(["TEST123"]).counts["TEST123"] == 0
+
+
+def test_the_memory_backend_should_report_the_remaining_requests_of_every_realm():
+    for algorithm in ["sliding_window_log", "sliding_window_counter", "gcra"]:
+        backend = MemoryBackend(clock=Clock())
+
+        backend.register_realm("TEST123", realm_info(10, 300, algorithm))
+        backend.register_realm("TEST234", realm_info(2, 300, algorithm))
+
+        reservation = backend.reserve(["TEST123", "TEST234"], request_id="1", amount=2)
+
+        assert reservation.availables == {"TEST123": 8, "TEST234": 0}
+
+        reservation = backend.reserve(["TEST123", "TEST234"], safety_threshold=1)
+
+        assert reservation.availables == {"TEST123": 7, "TEST234": 0}
+        assert reservation.waits["TEST123"] == 0
+        assert reservation.waits["TEST234"] > 0
+
+
+def test_the_memory_backend_should_adapt_the_rate_of_adaptive_realms_between_their_bounds():
+    backend = MemoryBackend(clock=Clock())
+
+    backend.register_realm("TEST123", dict(realm_info(8, 300, "sliding_window_log"), min_requests=2))
+    backend.register_realm("TEST234", realm_info(8, 300, "sliding_window_log"))
+
+    assert backend.effective_max_requests(backend.fetch_realm_info("TEST123")) == 2
+    assert backend.adapt_rate("TEST234", False) is None
+
+    for _ in range(4):
+        backend.adapt_rate("TEST123", False)
+
+    assert backend.effective_max_requests(backend.fetch_realm_info("TEST123")) == 3
+    assert backend.reserve(["TEST123"], request_id="1", amount=5).amount == 3
+
+    assert backend.adapt_rate("TEST123", True, decrease=0.5) == 2
+    assert backend.reserve(["TEST123"], request_id="2").rate_limited_realms == ["TEST123"]
+
+    for _ in range(100):
+        backend.adapt_rate("TEST123", False, increase=5)
+
+    assert backend.effective_max_requests(backend.fetch_realm_info("TEST123")) == 8
+
+
+def test_the_memory_backend_should_enforce_every_window_of_a_realm_and_report_the_binding_one():
+    for algorithm in ["sliding_window_log", "sliding_window_counter", "gcra"]:
+        clock = Clock()
+        backend = MemoryBackend(clock=clock)
+
+        backend.register_realm("TEST123", dict(realm_info(3, 300, algorithm), windows=[[2, 10]]))
+
+        assert backend.reserve(["TEST123"], request_id="1").reserved
+        assert backend.reserve(["TEST123"], request_id="2").availables == {"TEST123": 0}
+
+        reservation = backend.reserve(["TEST123"], request_id="3")
+
+        assert not reservation.reserved
+        assert reservation.binding_windows == {"TEST123": (2, 10)}
+        assert 0 < reservation.retry_after <= 15
+
+        clock.now += reservation.retry_after
+
+        assert backend.reserve(["TEST123"], request_id="4").reserved
+
+        reservation = backend.reserve(["TEST123"], request_id="5")
+
+        assert not reservation.reserved
+        assert reservation.binding_windows == {"TEST123": (3, 300)}
+        assert reservation.retry_after > 15
+
+        backend.update_realm("TEST123", {"windows": [[2, 100]]})
+
+        assert backend.reserve(["TEST123"]).binding_windows == {"TEST123": (3, 300)}
+
+
+def test_the_memory_backend_should_grant_freed_slots_to_queued_tickets_in_order():
+    clock = Clock()
+    backend = MemoryBackend(clock=clock)
+
+    backend.register_realm("TEST123", realm_info(1, 10, "sliding_window_log"))
+
+    first = QueueTicket()
+    second = QueueTicket()
+    second.enqueued_at = first.enqueued_at + 1
+
+    assert backend.reserve(["TEST123"], request_id="1").reserved
+    assert backend.reserve(["TEST123"], request_id="2", ticket=first).queued_realms == []
+    assert backend.reserve(["TEST123"], request_id="3", ticket=second).queued_realms == ["TEST123"]
+
+    clock.now += 10
+
+    peek = backend.reserve(["TEST123"])
+
+    assert peek.rate_limited_realms == ["TEST123"]
+    assert peek.availables == {"TEST123": 0}
+    assert peek.queue_lengths == {"TEST123": 2}
+
+    assert not backend.reserve(["TEST123"], request_id="4").reserved
+    assert not backend.reserve(["TEST123"], request_id="5", ticket=second).reserved
+    assert backend.reserve(["TEST123"], request_id="6", ticket=first).reserved
+
+    assert backend.wait_turn(second, 0)
+
+    backend.leave_queue(["TEST123"], second)
+    clock.now += 10
+
+    assert backend.reserve(["TEST123"], request_id="7").reserved
+
+    abandoned = QueueTicket(ttl=5)
+
+    assert not backend.reserve(["TEST123"], request_id="8", ticket=abandoned).reserved
+
+    clock.now += 15
+
+    assert backend.reserve(["TEST123"], request_id="9").reserved
+
+
+def test_the_memory_backend_should_cap_the_requests_in_flight_on_a_realm_until_they_are_released():
+    clock = Clock()
+    backend = MemoryBackend(clock=clock)
+
+    backend.register_realm("TEST123", dict(realm_info(100, 10, "sliding_window_log"), max_concurrent=2))
+
+    first = backend.reserve(["TEST123"], request_id="1", amount=5, concurrency_ttl=30)
+
+    assert first.reserved
+    assert first.amount == 1
+    assert first.concurrent_realms == ["TEST123"]
+
+    assert backend.reserve(["TEST123"], request_id="2", concurrency_ttl=30).reserved
+
+    ticket = QueueTicket()
+    reservation = backend.reserve(["TEST123"], request_id="3", ticket=ticket, concurrency_ttl=30)
+
+    assert not reservation.reserved
+    assert reservation.queued_realms == ["TEST123"]
+    assert reservation.retry_after is None
+
+    backend.release_concurrency(first)
+
+    assert backend.wait_turn(ticket, 0)
+    assert not backend.reserve(["TEST123"], request_id="4").reserved
+    assert backend.reserve(["TEST123"], request_id="5", ticket=ticket, concurrency_ttl=30).reserved
+
+    clock.now += 30
+
+    assert backend.reserve(["TEST123"], request_id="6").reserved
+    assert backend.reserve(["TEST123"], request_id="7").reserved
+    assert not backend.reserve(["TEST123"], request_id="8").reserved
+
+
+def test_the_memory_backend_should_hold_the_share_of_higher_priorities_back_while_they_use_it():
+    clock = Clock()
+    backend = MemoryBackend(clock=clock)
+
+    backend.register_realm("TEST123", dict(realm_info(10, 10, "sliding_window_log"), priority_shares=[[1, 0.3]]))
+
+    assert backend.reserve(["TEST123"], request_id="1", amount=8).amount == 8
+    assert backend.reserve(["TEST123"], request_id="2", priority=1).reserved
+    assert not backend.reserve(["TEST123"], request_id="3").reserved
+    assert backend.reserve(["TEST123"], request_id="4", priority=1).reserved
+
+    clock.now += 10
+
+    assert backend.reserve(["TEST123"], request_id="5", amount=10).amount == 10
+
+    low = QueueTicket()
+    high = QueueTicket(priority=1)
+    high.enqueued_at = low.enqueued_at + 1
+
+    assert backend.reserve(["TEST123"], request_id="6", ticket=low).queued_realms == []
+    assert backend.reserve(["TEST123"], request_id="7", ticket=high).queued_realms == []
+    assert backend.reserve(["TEST123"], request_id="8", ticket=low).queued_realms == ["TEST123"]
+
+
+def test_the_memory_backend_should_release_requests_under_the_limit_they_were_reserved_with():
+    clock = Clock()
+    backend = MemoryBackend(clock=clock)
+
+    backend.register_realm("TEST123", dict(realm_info(10, 10, "gcra"), priority_shares=[[1, 0.5]]))
+
+    assert backend.reserve(["TEST123"], request_id="1", priority=1).reserved
+
+    reservation = backend.reserve(["TEST123"], request_id="2", amount=10)
+
+    assert reservation.amount == 4
+    assert reservation.held_shares == {"TEST123": 0.5}
+
+    backend.release(reservation, 4)
+
+    assert backend.reserve(["TEST123"], request_id="3", amount=10).amount == 4
+
+
+def test_the_memory_backend_should_never_go_over_the_limit_of_a_realm_when_used_by_multiple_threads():
+    backend = MemoryBackend()
+
+    backend.register_realm("TEST123", realm_info(50, 300, "sliding_window_log"))
+
+    results = list()
+
+    def reserve():
+        for i in range(10):
+            results.append(backend.reserve(["TEST123"], request_id=str(i)).reserved)
+
+    threads = [threading.Thread(target=reserve) for _ in range(10)]
+
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert results.count(True) == 50
+
+
+def test_the_memory_backend_should_reserve_up_to_the_requested_amount_and_release_the_unused_requests():
+    for algorithm in ["sliding_window_log", "sliding_window_counter", "gcra"]:
+        backend = MemoryBackend(clock=Clock())
+
+        backend.register_realm("TEST123", realm_info(10, 300, algorithm))
+        backend.register_realm("TEST234", realm_info(6, 300, algorithm))
+
+        assert backend.reserve(["TEST123"], request_id="1").reserved
+
+        reservation = backend.reserve(["TEST123", "TEST234"], request_id="2", amount=8)
+
+        assert reservation.reserved
+        assert reservation.amount == 6
+        assert reservation.counts == {"TEST123": 7, "TEST234": 6}
+
+        backend.release(reservation, 4)
+
+        assert backend.reserve(["TEST123", "TEST234"]).counts == {"TEST123": 3, "TEST234": 2}
+
+
+def test_the_redis_backend_should_shard_its_realm_registry_under_its_prefix():
+    backend = RedisBackend(prefix="SeleniumRequesterTenant", registry_shards=4)
+
+    for realm in ["TEST123", "TEST234", "TEST345"]:
+        backend.register_realm(realm, realm_info(10, 300, "sliding_window_log"))
+
+    assert sorted(backend.fetch_registered_realms()) == ["TEST123", "TEST234", "TEST345"]
+    assert backend.registry_key("TEST123") in backend.registry_keys()
+    assert backend.realm_key("TEST123") == "SeleniumRequesterTenant:REALMS:TEST123"
+
+    assert backend.reserve(["TEST123", "TEST234"], request_id="1").reserved
+
+    for realm in ["TEST123", "TEST234", "TEST345"]:
+        backend.unregister_realm(realm)
+
+    assert backend.fetch_registered_realms() == []
+
+
+def test_the_redis_backend_should_register_and_unregister_realms_in_bulk():
+    backend = RedisBackend(prefix="SeleniumRequesterBulk")
+    realms = ["TEST%d" % i for i in range(500)]
+
+    backend.unregister_realms(realms)
+    backend.register_realm("TEST0", realm_info(5, 300, "gcra"))
+
+    registered = backend.register_realms([(realm, realm_info(10, 300, "sliding_window_log")) for realm in realms])
+
+    assert registered == realms[1:]
+    assert sorted(backend.fetch_registered_realms()) == sorted(realms)
+    assert backend.fetch_realm_info("TEST0")["algorithm"] == "gcra"
+    assert backend.reserve(["TEST1", "TEST2"], request_id="1").reserved
+
+    backend.unregister_realms(realms)
+
+    assert backend.fetch_registered_realms() == []
+    assert not backend.redis.exists(backend.realm_key("TEST1"), backend.realm_requests_key("TEST1"))
+
+
+def test_the_redis_backend_should_enforce_every_window_of_a_realm_and_report_the_binding_one():
+    backend = RedisBackend(prefix="SeleniumRequesterWindows")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", dict(realm_info(3, 300, "sliding_window_log"), windows=[[2, 10]]))
+
+    assert backend.fetch_realm_info("TEST123")["windows"] == [[2, 10]]
+
+    assert backend.reserve(["TEST123"], request_id="1").reserved
+    assert backend.reserve(["TEST123"], request_id="2").availables == {"TEST123": 0}
+
+    reservation = backend.reserve(["TEST123"], request_id="3")
+
+    assert not reservation.reserved
+    assert reservation.binding_windows == {"TEST123": (2, 10)}
+    assert 0 < reservation.retry_after <= 10
+
+    backend.update_realm("TEST123", {"windows": [[2, 100]]})
+
+    assert not backend.redis.exists(backend.realm_window_requests_key("TEST123", 1))
+    assert backend.reserve(["TEST123"]).binding_windows == {"TEST123": (3, 300)}
+
+    backend.unregister_realm("TEST123")
+
+
+def test_the_redis_backend_should_unlink_the_window_requests_of_an_unregistered_realm():
+    backend = RedisBackend(prefix="SeleniumRequesterWindows")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", dict(realm_info(3, 300, "sliding_window_log"), windows=[[2, 10], [1, 5]]))
+
+    assert backend.reserve(["TEST123"], request_id="1").reserved
+
+    backend.unregister_realm("TEST123")
+
+    assert not backend.redis.exists(
+        backend.realm_window_requests_key("TEST123", 1), backend.realm_window_requests_key("TEST123", 2)
+    )
+
+    backend.register_realm("TEST123", dict(realm_info(3, 300, "gcra"), windows=[[2, 10], [1, 5]]))
+
+    try:
+        assert backend.reserve(["TEST123"], request_id="2").reserved
+        assert not backend.reserve(["TEST123"], request_id="3").reserved
+    finally:
+        backend.unregister_realm("TEST123")
+
+
+def test_the_redis_backend_should_grant_freed_slots_to_queued_tickets_in_order():
+    backend = RedisBackend(prefix="SeleniumRequesterQueues")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", realm_info(1, 300, "sliding_window_log"))
+
+    first = QueueTicket()
+    second = QueueTicket()
+    second.enqueued_at = first.enqueued_at + 1
+
+    assert backend.reserve(["TEST123"], request_id="1").reserved
+    assert backend.reserve(["TEST123"], request_id="2", ticket=first).queued_realms == []
+
+    second.track(backend.reserve(["TEST123"], request_id="3", ticket=second))
+
+    assert second.blocked_on == "TEST123"
+    assert backend.redis.zrange(backend.realm_queue_key("TEST123"), 0, -1) == [
+        first.id.encode("utf-8"), second.id.encode("utf-8")
+    ]
+    assert backend.reserve(["TEST123"]).queue_lengths == {"TEST123": 2}
+
+    started_at = time.time()
+
+    assert not backend.wait_turn(second, 0.1)
+    assert time.time() - started_at < 0.5
+
+    backend.leave_queue(["TEST123"], first)
+
+    assert backend.wait_turn(second, 1)
+    assert backend.reserve(["TEST123"], request_id="4", ticket=second).queued_realms == []
+
+    backend.unregister_realm("TEST123")
+
+    assert not backend.redis.exists(backend.realm_queue_key("TEST123"))
+
+
+def test_the_redis_backend_should_cap_the_requests_in_flight_on_a_realm_until_they_are_released():
+    backend = RedisBackend(prefix="SeleniumRequesterConcurrency")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", dict(realm_info(100, 300, "sliding_window_log"), max_concurrent=1))
+
+    assert backend.fetch_realm_info("TEST123")["max_concurrent"] == 1
+
+    first = backend.reserve(["TEST123"], request_id="1", amount=5)
+
+    assert first.reserved
+    assert first.amount == 1
+    assert first.concurrent_realms == ["TEST123"]
+
+    ticket = QueueTicket()
+    ticket.track(backend.reserve(["TEST123"], request_id="2", ticket=ticket))
+
+    assert ticket.blocked_on == "TEST123"
+
+    backend.release_concurrency(first)
+
+    assert backend.wait_turn(ticket, 1)
+    assert backend.reserve(["TEST123"], request_id="3", ticket=ticket).reserved
+
+    backend.unregister_realm("TEST123")
+
+    assert not backend.redis.exists(backend.realm_in_flight_key("TEST123"))
+
+
+def test_the_redis_backend_should_hold_the_share_of_higher_priorities_back_while_they_use_it():
+    backend = RedisBackend(prefix="SeleniumRequesterPriorities")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", dict(realm_info(10, 300, "sliding_window_log"), priority_shares=[[1, 0.3]]))
+
+    assert backend.fetch_realm_info("TEST123")["priority_shares"] == [[1, 0.3]]
+
+    assert backend.reserve(["TEST123"], request_id="1", amount=8).amount == 8
+    assert backend.reserve(["TEST123"], request_id="2", priority=1).reserved
+    assert not backend.reserve(["TEST123"], request_id="3").reserved
+    assert backend.reserve(["TEST123"], request_id="4", priority=1).reserved
+
+    low = QueueTicket()
+    high = QueueTicket(priority=1)
+    high.enqueued_at = low.enqueued_at + 1
+
+    backend.reserve(["TEST123"], request_id="5", ticket=low)
+    backend.reserve(["TEST123"], request_id="6", ticket=high)
+
+    assert backend.redis.zrange(backend.realm_queue_key("TEST123"), 0, -1) == [
+        high.id.encode("utf-8"), low.id.encode("utf-8")
+    ]
+
+    backend.unregister_realm("TEST123")
+
+    assert not backend.redis.exists(backend.realm_demand_key("TEST123"))
+
+
+def test_the_redis_backend_should_release_requests_under_the_limit_they_were_reserved_with():
+    backend = RedisBackend(prefix="SeleniumRequesterPriorities")
+
+    backend.unregister_realm("TEST123")
+    backend.register_realm("TEST123", dict(realm_info(10, 10, "gcra"), priority_shares=[[1, 0.5]]))
+
+    assert backend.reserve(["TEST123"], request_id="1", priority=1).reserved
+
+    reservation = backend.reserve(["TEST123"], request_id="2", amount=10)
+
+    assert reservation.amount == 4
+    assert reservation.held_shares == {"TEST123": 0.5}
+
+    backend.release(reservation, 4)
+
+    assert backend.reserve(["TEST123"], request_id="3", amount=10).amount == 4
+
+    backend.unregister_realm("TEST123")
+
+
+def test_the_redis_backend_should_defer_its_connection_check_to_first_use():
+    backend = RedisBackend(port=1)
+
+    with pytest.raises(SeleniumRespectfulError):
+        backend.warmup()
+
+    with pytest.raises(SeleniumRespectfulError):
+        backend.fetch_registered_realms()
+
+
+def test_the_redis_backend_should_share_a_connection_pool_between_instances():
+    backend = RedisBackend()
+    other_backend = RedisBackend()
+
+    assert backend.redis.connection_pool is other_backend.redis.connection_pool
+    assert RedisBackend(database=1).redis.connection_pool is not backend.redis.connection_pool
+
+
+def test_the_file_backend_should_share_its_state_between_instances(tmpdir):
+    path = str(tmpdir.join("selenium-respectful.state"))
+
+    backend = FileBackend(path)
+    other_backend = FileBackend(path)
+
+    backend.register_realm("TEST123", realm_info(1, 300, "gcra"))
+
+    assert other_backend.fetch_registered_realms() == ["TEST123"]
+
+    assert backend.reserve(["TEST123"], request_id="1").reserved
+    assert not other_backend.reserve(["TEST123"], request_id="2").reserved
+
+
+def test_the_file_backend_should_wake_the_waiters_of_other_instances(tmpdir):
+    path = str(tmpdir.join("selenium-respectful.state"))
+
+    backend = FileBackend(path)
+    other_backend = FileBackend(path)
+
+    backend.register_realm("TEST123", dict(realm_info(100, 300, "gcra"), max_concurrent=1))
+
+    first = backend.reserve(["TEST123"], request_id="1")
+    ticket = QueueTicket()
+
+    assert first.reserved
+    assert not other_backend.reserve(["TEST123"], request_id="2", ticket=ticket).reserved
+    assert not other_backend.wait_turn(ticket, 0)
+
+    timer = threading.Timer(0.1, backend.release_concurrency, args=(first,))
+    timer.start()
+
+    assert other_backend.wait_turn(ticket, 5)
+    assert not other_backend.wait_turn(ticket, 0)
+    assert other_backend.reserve(["TEST123"], request_id="2", ticket=ticket).reserved
+
+    timer.join()
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+from selenium_respectful import MetricsSink, PrometheusMetricsSink
+
+
+# Tests
+def test_the_default_metrics_sink_should_be_disabled():
+    metrics = MetricsSink()
+
+    assert not metrics.enabled
+
+    metrics.increment("decisions_total", labels={"realm": "TEST123", "decision": "allowed"})
+    metrics.observe("get_seconds", 0.5)
+
+
+def test_the_prometheus_metrics_sink_should_render_counters():
+    metrics = PrometheusMetricsSink()
+
+    metrics.increment("decisions_total", labels={"realm": "TEST123", "decision": "allowed"})
+    metrics.increment("decisions_total", labels={"realm": "TEST123", "decision": "allowed"})
+    metrics.increment("decisions_total", labels={"realm": "TEST\"234", "decision": "rejected"})
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE selenium_respectful_decisions_total counter" in lines
+    assert 'selenium_respectful_decisions_total{decision="allowed",realm="TEST123"} 2' in lines
+    assert 'selenium_respectful_decisions_total{decision="rejected",realm="TEST\\"234"} 1' in lines
+
+
+def test_the_prometheus_metrics_sink_should_render_cumulative_histograms():
+    metrics = PrometheusMetricsSink(buckets=[0.1, 1])
+
+    metrics.observe("get_seconds", 0.05)
+    metrics.observe("get_seconds", 0.5)
+    metrics.observe("get_seconds", 5)
+
+    lines = metrics.render().splitlines()
+
+    assert "# TYPE selenium_respectful_get_seconds histogram" in lines
+    assert 'selenium_respectful_get_seconds_bucket{le="0.1"} 1' in lines
+    assert 'selenium_respectful_get_seconds_bucket{le="1"} 2' in lines
+    assert 'selenium_respectful_get_seconds_bucket{le="+Inf"} 3' in lines
+    assert "selenium_respectful_get_seconds_sum 5.55" in lines
+    assert "selenium_respectful_get_seconds_count 3" in lines
@@ -0,0 +1,78 @@
+# -*- coding: utf-8 -*-
+from selenium_respectful import PageCache, FilePageStore, PageResult, SeleniumRespectfulError
+
+import pytest
+
+
+class Clock:
+
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+# Tests
+def test_the_page_cache_should_normalize_urls():
+    assert PageCache.normalize_url("HTTP://Example.COM:80?b=2&a=1#top") == "http://example.com/?a=1&b=2"
+    assert PageCache.normalize_url("example.com/path") == "http://example.com/path"
+    assert PageCache.normalize_url("https://example.com:8443/") == "https://example.com:8443/"
+
+
+def test_the_page_cache_should_validate_its_arguments():
+    with pytest.raises(SeleniumRespectfulError):
+        PageCache(ttl=0)
+
+    with pytest.raises(SeleniumRespectfulError):
+        PageCache(max_entries=0)
+
+
+def test_the_page_cache_should_expire_its_entries_after_their_ttl():
+    clock = Clock()
+    cache = PageCache(ttl=10, clock=clock)
+
+    cache.set("http://example.com", PageResult("http://example.com", ["TEST123"], page_source="<html></html>"))
+
+    page_result = cache.get("http://EXAMPLE.com/")
+
+    assert page_result.from_cache
+    assert page_result.url == "http://EXAMPLE.com/"
+    assert page_result.realms == ["TEST123"]
+    assert page_result.page_source == "<html></html>"
+
+    clock.now += 10
+
+    assert cache.get("http://example.com") is None
+
+
+def test_the_page_cache_should_evict_its_least_recently_used_entries():
+    cache = PageCache(max_entries=2)
+
+    for url in ["http://a.com", "http://b.com"]:
+        cache.set(url, PageResult(url, ["TEST123"]))
+
+    cache.get("http://a.com")
+    cache.set("http://c.com", PageResult("http://c.com", ["TEST123"]))
+
+    assert cache.get("http://a.com") is not None
+    assert cache.get("http://b.com") is None
+    assert cache.get("http://c.com") is not None
+
+
+def test_the_page_cache_should_share_its_entries_through_a_store(tmpdir):
+    clock = Clock()
+
+    cache = PageCache(ttl=10, store=FilePageStore(str(tmpdir)), clock=clock)
+    other_cache = PageCache(ttl=10, store=FilePageStore(str(tmpdir)), clock=clock)
+
+    cache.set("http://example.com", PageResult("http://example.com", ["TEST123"], screenshot=b"\x89PNG"))
+
+    assert other_cache.get("http://example.com").screenshot == b"\x89PNG"
+
+    clock.now += 10
+
+    cache.clear()
+
+    assert cache.get("http://example.com") is None
+    assert not len(tmpdir.listdir())
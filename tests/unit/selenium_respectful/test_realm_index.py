@@ -0,0 +1,59 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium_respectful import SeleniumRespectfulError
+from selenium_respectful.realm_index import RealmIndex
+
+
+# Tests
+def test_the_realm_index_should_match_exact_hosts():
+    realm_index = RealmIndex()
+    realm_index.add("TEST123", ["google.com"])
+
+    assert realm_index.match("http://google.com/?q=1") == ["TEST123"]
+    assert realm_index.match("https://GOOGLE.com.:443") == ["TEST123"]
+    assert realm_index.match("http://www.google.com") == []
+    assert realm_index.match("http://oogle.com") == []
+
+
+def test_the_realm_index_should_match_a_domain_and_its_subdomains():
+    realm_index = RealmIndex()
+    realm_index.add("TEST123", [".google.com"])
+
+    assert realm_index.match("http://google.com") == ["TEST123"]
+    assert realm_index.match("http://maps.www.google.com") == ["TEST123"]
+    assert realm_index.match("http://notgoogle.com") == []
+
+
+def test_the_realm_index_should_match_subdomains_only_with_a_wildcard():
+    realm_index = RealmIndex()
+    realm_index.add("TEST123", ["*.google.com"])
+
+    assert realm_index.match("http://google.com") == []
+    assert realm_index.match("http://www.google.com") == ["TEST123"]
+    assert realm_index.match("http://maps.www.google.com") == ["TEST123"]
+
+
+def test_the_realm_index_should_match_glob_patterns():
+    realm_index = RealmIndex()
+    realm_index.add("TEST123", ["api-*.example.com"])
+    realm_index.add("TEST234", ["www.google.*"])
+
+    assert realm_index.match("http://api-eu.example.com") == ["TEST123"]
+    assert realm_index.match("http://www.example.com") == []
+    assert realm_index.match("http://www.google.co.uk") == ["TEST234"]
+
+
+def test_the_realm_index_should_return_every_matching_realm():
+    realm_index = RealmIndex()
+    realm_index.add("TEST123", [".google.com"])
+    realm_index.add("TEST234", ["www.google.com", "example.com"])
+    realm_index.add("TEST345", ["*"])
+
+    assert realm_index.match("http://www.google.com") == ["TEST123", "TEST234", "TEST345"]
+    assert realm_index.match("example.com/path") == ["TEST234", "TEST345"]
+
+
+def test_the_realm_index_should_reject_empty_patterns():
+    with pytest.raises(SeleniumRespectfulError):
+        RealmIndex().add("TEST123", [" "])
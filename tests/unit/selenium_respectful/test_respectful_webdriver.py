@@ -3,8 +3,13 @@ import pytest
 
 from selenium_respectful import RespectfulWebdriver
 from selenium_respectful import SeleniumRespectfulError, SeleniumRespectfulRateLimitedError
+from selenium_respectful import PrometheusMetricsSink, PageCache
+from selenium_respectful.backends import MemoryBackend, RedisBackend
 
 import redis
+import threading
+import time
+import uuid
 
 from selenium.webdriver.remote.webdriver import WebDriver as BaseWebDriver
 from selenium.webdriver.phantomjs.webdriver import WebDriver
@@ -29,6 +34,51 @@ def test_the_instance_should_have_a_property_that_holds_the_config():
     assert isinstance(driver.config, dict)
 
 
+def test_the_instance_should_load_the_configuration_file_once_per_process(tmpdir, monkeypatch):
+    tmpdir.join("selenium-respectful.config.yml").write(
+        "redis:\n    host: localhost\n    port: 6379\n    database: 0\n\nsafety_threshold: 2\n"
+    )
+
+    monkeypatch.chdir(str(tmpdir))
+
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    assert driver.config["safety_threshold"] == 2
+    assert driver.config["realm_cache_ttl"] == RespectfulWebdriver.default_config["realm_cache_ttl"]
+
+    driver.config["safety_threshold"] = 5
+
+    assert len(RespectfulWebdriver._config_cache) == 1
+    assert RespectfulWebdriver(webdriver=webdriver).config["safety_threshold"] == 2
+
+
+def test_the_instance_should_validate_the_optional_keys_of_the_redis_configuration(tmpdir, monkeypatch):
+    monkeypatch.chdir(str(tmpdir))
+
+    for redis_config in ["prefix: ''", "cluster: 'yes'", "registry_shards: 0", "registry_shards: two"]:
+        tmpdir.join("selenium-respectful.config.yml").write(
+            "redis:\n    host: localhost\n    port: 6379\n    database: 0\n    %s\n" % redis_config
+        )
+
+        with pytest.raises(SeleniumRespectfulError):
+            RespectfulWebdriver(webdriver=webdriver)
+
+        RespectfulWebdriver._config_cache.clear()
+
+
+def test_the_instance_should_be_able_to_warm_up_its_backend_and_realm_cache():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300)
+
+    other_driver = RespectfulWebdriver(webdriver=webdriver)
+
+    assert other_driver.warmup()
+    assert "TEST123" in other_driver._realms_cache
+
+    driver.unregister_realm("TEST123")
+
+
 def test_the_instance_should_have_a_property_that_holds_a_valid_webdriver():
     driver = RespectfulWebdriver(webdriver=webdriver)
     assert BaseWebDriver in driver.webdriver.__class__.__bases__
@@ -44,6 +94,37 @@ def test_the_instance_should_have_a_property_that_holds_a_redis_object():
     assert isinstance(driver.redis, redis.StrictRedis)
 
 
+def test_the_instance_should_use_the_redis_backend_by_default():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    assert isinstance(driver.backend, RedisBackend)
+
+
+def test_the_instance_should_accept_a_backend():
+    backend = MemoryBackend()
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=backend)
+
+    assert driver.backend is backend
+    assert driver.redis is None
+
+
+def test_the_instance_should_be_able_to_rate_limit_requests_with_the_memory_backend():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    driver.register_realm("TEST123", max_requests=1, timespan=5)
+
+    assert driver.realm_max_requests("TEST123") == 1
+    assert "TEST123" in driver.fetch_registered_realms()
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    driver.unregister_realm("TEST123")
+
+    assert "TEST123" not in driver.fetch_registered_realms()
+
+
 def test_the_instance_should_have_a_property_that_holds_a_redis_prefix():
     driver = RespectfulWebdriver(webdriver=webdriver)
     assert driver.redis_prefix == "SeleniumRequester"
@@ -100,6 +181,75 @@ def test_the_instance_should_be_able_to_register_multiple_realms():
     driver.unregister_realm("TEST345")
 
 
+def test_the_instance_should_register_a_realm_with_the_sliding_window_log_algorithm_by_default():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300)
+
+    assert driver.realm_algorithm("TEST123") == "sliding_window_log"
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_be_able_to_register_a_realm_with_a_specific_algorithm():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300, algorithm="gcra")
+    driver.register_realm("TEST234", max_requests=100, timespan=300, algorithm="sliding_window_counter")
+
+    assert driver.realm_algorithm("TEST123") == "gcra"
+    assert driver.realm_algorithm("TEST234") == "sliding_window_counter"
+
+    driver.unregister_realm("TEST123")
+    driver.unregister_realm("TEST234")
+
+
+def test_the_instance_should_reject_invalid_algorithms_when_registering_a_realm():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST123", max_requests=100, timespan=300, algorithm="FOO")
+
+
+def test_the_instance_should_enforce_the_limit_of_a_realm_with_every_algorithm():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    for algorithm in RespectfulWebdriver.algorithms:
+        driver.register_realm("TEST123", max_requests=3, timespan=300, algorithm=algorithm)
+
+        self = driver
+        get_func = lambda: self.webdriver.get("http://tests.com")
+
+        try:
+            driver._perform_webdriver_get(get_func, realms=["TEST123"])
+            driver._perform_webdriver_get(get_func, realms=["TEST123"])
+            driver._perform_webdriver_get(get_func, realms=["TEST123"])
+
+            assert driver._requests_in_timespan("TEST123") == 3
+
+            with pytest.raises(SeleniumRespectfulRateLimitedError):
+                driver._perform_webdriver_get(get_func, realms=["TEST123"])
+        finally:
+            driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_keep_a_constant_amount_of_state_for_the_gcra_and_sliding_window_counter_algorithms():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=1000, timespan=300, algorithm="gcra")
+    driver.register_realm("TEST234", max_requests=1000, timespan=300, algorithm="sliding_window_counter")
+
+    for _ in range(10):
+        driver._reserve_requests(["TEST123", "TEST234"], request_uuid=str(uuid.uuid4()))
+
+    assert driver.redis.type(driver._realm_requests_redis_key("TEST123")) == b"string"
+    assert driver.redis.hlen(driver._realm_requests_redis_key("TEST234")) == 3
+
+    driver.unregister_realm("TEST123")
+    driver.unregister_realm("TEST234")
+
+
 def test_the_instance_should_not_overwrite_when_registering_a_realm():
     driver = RespectfulWebdriver(webdriver=webdriver)
 
@@ -134,6 +284,52 @@ def test_the_instance_should_be_able_to_fetch_a_list_of_registered_realms():
     driver.unregister_realm("TEST123")
 
 
+def test_the_instance_should_be_able_to_update_the_algorithm_of_a_registered_realm():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300)
+    driver._reserve_requests(["TEST123"], request_uuid=str(uuid.uuid4()))
+
+    driver.update_realm("TEST123", algorithm="gcra")
+
+    assert driver.realm_algorithm("TEST123") == "gcra"
+    assert driver._requests_in_timespan("TEST123") == 0
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_cache_the_information_of_registered_realms():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300)
+
+    assert driver.realm_max_requests("TEST123") == 100
+    assert "TEST123" in driver._realms_cache
+
+    driver.redis.hset(driver._realm_redis_key("TEST123"), "max_requests", 1000)
+
+    assert driver.realm_max_requests("TEST123") == 100
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_invalidate_its_realm_cache_when_a_realm_is_updated_by_another_instance():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    other_driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=300)
+
+    assert other_driver.realm_max_requests("TEST123") == 100
+
+    driver.update_realm("TEST123", max_requests=1000)
+
+    other_driver._can_perform_get("TEST123")
+
+    assert other_driver.realm_max_requests("TEST123") == 1000
+
+    driver.unregister_realm("TEST123")
+
+
 def test_the_instance_should_ignore_invalid_values_when_updating_a_realm():
     driver = RespectfulWebdriver(webdriver=webdriver)
 
@@ -201,11 +397,11 @@ def test_the_instance_should_be_able_to_fetch_the_information_of_a_registered_re
 
     driver.register_realm("TEST123", max_requests=100, timespan=300)
 
-    assert b"max_requests" in driver._fetch_realm_info("TEST123")
-    assert driver._fetch_realm_info("TEST123")[b"max_requests"] == b"100"
+    assert "max_requests" in driver._fetch_realm_info("TEST123")
+    assert driver._fetch_realm_info("TEST123")["max_requests"] == 100
 
-    assert b"timespan" in driver._fetch_realm_info("TEST123")
-    assert driver._fetch_realm_info("TEST123")[b"timespan"] == b"300"
+    assert "timespan" in driver._fetch_realm_info("TEST123")
+    assert driver._fetch_realm_info("TEST123")["timespan"] == 300
 
     driver.unregister_realm("TEST123")
 
@@ -260,6 +456,56 @@ def test_the_instance_should_be_able_to_determine_the_amount_of_requests_perform
     driver.unregister_realm("TEST123")
 
 
+def test_the_instance_should_track_the_requests_of_a_realm_in_a_single_sorted_set():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+    self = driver
+    get_func = lambda: self.webdriver.get("http://google.com")
+
+    driver._perform_webdriver_get(get_func, realms=["TEST123"])
+    driver._perform_webdriver_get(get_func, realms=["TEST123"])
+
+    assert driver.redis.zcard(driver._realm_requests_redis_key("TEST123")) == 2
+    assert not len(driver.redis.keys("%s:REQUEST:%s:*" % (driver.redis_prefix, "TEST123")))
+
+    driver.unregister_realm("TEST123")
+
+    assert not driver.redis.exists(driver._realm_requests_redis_key("TEST123"))
+
+
+def test_the_instance_should_be_able_to_migrate_legacy_request_keys_of_a_registered_realm():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+    driver.redis.setex("%s:REQUEST:%s:%s" % (driver.redis_prefix, "TEST123", "LEGACY1"), 5, "LEGACY1")
+    driver.redis.setex("%s:REQUEST:%s:%s" % (driver.redis_prefix, "TEST123", "LEGACY2"), 5, "LEGACY2")
+
+    assert driver.migrate_legacy_requests(["TEST123"]) == 2
+
+    assert driver._requests_in_timespan("TEST123") == 2
+    assert not len(driver.redis.keys("%s:REQUEST:%s:*" % (driver.redis_prefix, "TEST123")))
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_not_keep_partial_reservations_when_rate_limited_on_one_of_multiple_realms():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=1000, timespan=5)
+    driver.register_realm("TEST234", max_requests=0, timespan=5)
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123", "TEST234"])
+
+    assert driver._requests_in_timespan("TEST123") == 0
+
+    driver.unregister_realm("TEST123")
+    driver.unregister_realm("TEST234")
+
+
 def test_the_instance_should_be_able_to_determine_if_it_can_perform_a_request_for_a_registered_realm():
     driver = RespectfulWebdriver(webdriver=webdriver)
     
@@ -340,6 +586,108 @@ def test_the_instance_should_return_a_rate_limit_exception_if_the_request_is_not
     driver.unregister_realm("TEST234")
 
 
+def test_the_instance_should_never_go_over_the_limit_of_a_realm_when_requests_are_issued_in_parallel():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    driver.register_realm("TEST123", max_requests=10, timespan=300)
+
+    results = list()
+
+    def reserve():
+        results.append(driver._reserve_requests(["TEST123"], request_uuid=str(uuid.uuid4())).reserved)
+
+    threads = [threading.Thread(target=reserve) for _ in range(25)]
+
+    [thread.start() for thread in threads]
+    [thread.join() for thread in threads]
+
+    assert results.count(True) == 10
+    assert driver._requests_in_timespan("TEST123") == 10
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_rate_limit_exception_should_provide_the_rate_limited_realms_and_when_to_retry():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    driver.register_realm("TEST123", max_requests=1, timespan=5)
+    driver.register_realm("TEST234", max_requests=10, timespan=5)
+
+    driver.get("http://google.com", realms=["TEST123", "TEST234"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError) as e:
+        driver.get("http://google.com", realms=["TEST123", "TEST234"])
+
+    assert e.value.realms == ["TEST123"]
+    assert 0 < e.value.retry_after <= 5
+
+    driver.update_realm("TEST123", max_requests=0)
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError) as e:
+        driver.get("http://google.com", realms=["TEST123", "TEST234"])
+
+    assert e.value.retry_after is None
+
+    driver.unregister_realm("TEST123")
+    driver.unregister_realm("TEST234")
+
+
+def test_the_instance_should_reject_requests_on_throttled_realms_locally_until_they_free_up():
+    backend = MemoryBackend()
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=backend)
+
+    driver.register_realm("TEST123", max_requests=1, timespan=1)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    reserve = backend.reserve
+    reservations = list()
+
+    def counted_reserve(*args, **kwargs):
+        reservations.append(args)
+        return reserve(*args, **kwargs)
+
+    backend.reserve = counted_reserve
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError) as e:
+        driver.get("http://google.com", realms=["TEST123"])
+
+    assert reservations == []
+    assert 0 < e.value.retry_after <= 1
+    assert e.value.windows == {"TEST123": (1, 1)}
+
+    time.sleep(e.value.retry_after)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert len(reservations) == 1
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_raise_a_rate_limit_exception_if_the_wait_would_exceed_the_max_wait():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    driver.register_realm("TEST123", max_requests=1, timespan=300)
+
+    driver.get("http://google.com", realms=["TEST123"], wait=True)
+
+    started_at = time.time()
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"], wait=True, max_wait=5)
+
+    assert time.time() - started_at < 5
+
+    driver.unregister_realm("TEST123")
+
+
 def test_the_instance_should_be_able_to_wait_for_a_request_to_be_allowed_on_a_registered_realm():
     driver = RespectfulWebdriver(webdriver=webdriver)
     driver.config["safety_threshold"] = 0
@@ -368,6 +716,421 @@ def test_the_instance_should_be_able_to_wait_for_a_request_to_be_allowed_on_mult
     driver.unregister_realm("TEST234")
 
 
+def test_the_instance_should_serve_waiting_requests_in_the_order_they_started_waiting():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    driver.register_realm("TEST123", max_requests=2, timespan=1, algorithm="gcra")
+
+    served = list()
+
+    def wait_for_request(i):
+        worker = RespectfulWebdriver(webdriver=webdriver)
+        worker.get("http://google.com", realms=["TEST123"], wait=True, max_wait=10)
+
+        served.append(i)
+
+    driver.get("http://google.com", realms=["TEST123"])
+    driver.get("http://google.com", realms=["TEST123"])
+
+    threads = list()
+
+    for i in range(4):
+        threads.append(threading.Thread(target=wait_for_request, args=(i,)))
+        threads[-1].start()
+
+        time.sleep(0.05)
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    [thread.join() for thread in threads]
+
+    assert served == [0, 1, 2, 3]
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_cap_the_requests_in_flight_on_a_realm():
+    backend = MemoryBackend()
+    rejections = list()
+
+    class InFlightWebDriver(BaseWebDriver):
+
+        def __init__(self):
+            pass
+
+        def get(self, url):
+            try:
+                other_driver.get(url, realms=["TEST123"])
+            except SeleniumRespectfulRateLimitedError as e:
+                rejections.append(e)
+
+    driver = RespectfulWebdriver(webdriver=InFlightWebDriver(), backend=backend)
+    other_driver = RespectfulWebdriver(webdriver=webdriver, backend=backend)
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST123", max_requests=100, timespan=60, max_concurrent=0)
+
+    driver.register_realm("TEST123", max_requests=100, timespan=60, max_concurrent=1)
+
+    for max_concurrent in [0, -1, 1.5]:
+        with pytest.raises(SeleniumRespectfulError):
+            driver.update_realm("TEST123", max_concurrent=max_concurrent)
+
+    assert driver.realm_max_concurrent("TEST123") == 1
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert len(rejections) == 1
+    assert rejections[0].retry_after is None
+
+    other_driver.get("http://google.com", realms=["TEST123"])
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_keep_a_share_of_a_realm_for_higher_priorities():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+    driver.config["safety_threshold"] = 0
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST123", max_requests=10, timespan=60, priority_shares={1: 0.5, 2: 0.5})
+
+    driver.register_realm("TEST123", max_requests=10, timespan=60, priority_shares={1: 0.2})
+
+    assert driver.realm_priority_shares("TEST123") == {1: 0.2}
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.get("http://google.com", realms=["TEST123"], priority=10)
+
+    for _ in range(8):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    driver.get("http://google.com", realms=["TEST123"], priority=1)
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    driver.get("http://google.com", realms=["TEST123"], priority=1)
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"], priority=1)
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_be_able_to_get_many_urls_and_yield_their_page_results():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+
+    driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+    requests = [("http://google.com", ["TEST123"]), ("http://google.com/?q=1", ["TEST123"])]
+    results = list(driver.get_many(requests))
+
+    assert [result.url for result in results] == ["http://google.com", "http://google.com/?q=1"]
+    assert all(["<body" in result.page_source for result in results])
+    assert all([result.realms == ["TEST123"] for result in results])
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_get_the_urls_of_available_realms_while_other_realms_are_rate_limited():
+    driver = RespectfulWebdriver(webdriver=webdriver)
+    driver.config["safety_threshold"] = 0
+
+    driver.register_realm("TEST123", max_requests=1, timespan=2)
+    driver.register_realm("TEST234", max_requests=1000, timespan=2)
+
+    requests = [
+        ("http://google.com/?q=1", ["TEST123"]),
+        ("http://google.com/?q=2", ["TEST123"]),
+        ("http://google.com/?q=3", ["TEST234"]),
+        ("http://google.com/?q=4", ["TEST234"]),
+    ]
+
+    results = [result.url for result in driver.get_many(requests)]
+
+    assert results == [
+        "http://google.com/?q=1",
+        "http://google.com/?q=3",
+        "http://google.com/?q=4",
+        "http://google.com/?q=2"
+    ]
+
+    driver.unregister_realm("TEST123")
+    driver.unregister_realm("TEST234")
+
+
+def test_the_instance_should_not_allow_get_many_requests_without_realms():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    with pytest.raises(SeleniumRespectfulError):
+        list(driver.get_many(["http://example.com"]))
+
+    with pytest.raises(SeleniumRespectfulError):
+        list(driver.get_many([("http://example.com", [])]))
+
+
+def test_the_instance_should_resolve_the_realms_of_a_request_from_its_url():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    driver.register_realm("TEST123", max_requests=1, timespan=5, patterns=[".google.com"])
+    driver.register_realm("TEST234", max_requests=1000, timespan=5, patterns=["*.google.com"])
+    driver.register_realm("TEST345", max_requests=1000, timespan=5)
+
+    assert driver.realm_patterns("TEST123") == [".google.com"]
+    assert driver.realm_patterns("TEST345") == []
+
+    assert driver.resolve_realms("http://google.com") == ["TEST123"]
+    assert driver.resolve_realms("http://www.google.com/?q=1") == ["TEST123", "TEST234"]
+    assert driver.resolve_realms("http://example.com") == []
+
+    driver.get("http://google.com", additional_realms=["TEST345"])
+
+    assert driver._requests_in_timespan("TEST123") == 1
+    assert driver._requests_in_timespan("TEST345") == 1
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://www.google.com")
+
+    driver.get("http://www.google.com", realms=["TEST234"])
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.get("http://example.com")
+
+    driver.update_realm("TEST345", patterns=["example.com"])
+
+    assert driver.resolve_realms("http://example.com") == ["TEST345"]
+
+    results = list(driver.get_many(["http://example.com/?q=1"]))
+
+    assert [result.realms for result in results] == [["TEST345"]]
+
+    driver.unregister_realms(["TEST123", "TEST234", "TEST345"])
+
+
+def test_the_instance_should_reject_empty_realm_patterns():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST123", max_requests=1, timespan=5, patterns=[""])
+
+
+def test_the_instance_should_spend_leased_requests_without_reserving_them_again():
+    backend = MemoryBackend()
+
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=backend)
+    driver.config["lease_size"] = 5
+    driver.config["lease_ttl"] = 0.5
+
+    driver.register_realm("TEST123", max_requests=8, timespan=300)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver._requests_in_timespan("TEST123") == 5
+
+    for i in range(4):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver._requests_in_timespan("TEST123") == 5
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver._requests_in_timespan("TEST123") == 8
+
+    driver.release_leases()
+
+    assert driver._requests_in_timespan("TEST123") == 6
+
+    time.sleep(0.5)
+
+    driver.get("http://google.com", realms=["TEST123"])
+    driver.get("http://google.com", realms=["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"])
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_give_back_the_expired_leases_of_other_realms_on_its_next_get():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+    driver.config["lease_size"] = 5
+    driver.config["lease_ttl"] = 0.1
+
+    driver.register_realm("TEST123", max_requests=10, timespan=300)
+    driver.register_realm("TEST234", max_requests=10, timespan=300)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver._requests_in_timespan("TEST123") == 5
+
+    time.sleep(0.1)
+
+    driver.get("http://google.com", realms=["TEST234"])
+
+    assert driver._requests_in_timespan("TEST123") == 1
+    assert driver._requests_in_timespan("TEST234") == 5
+
+    driver.release_leases()
+
+
+def test_the_instance_should_reserve_and_release_requests_without_performing_them():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    driver.register_realm("TEST123", max_requests=100, timespan=60, max_concurrent=1)
+
+    reservation = driver.reserve_request(["TEST123"])
+
+    assert reservation.reserved
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.reserve_request(["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.reserve_request(["TEST123"], wait=True, max_wait=0.1)
+
+    driver.release_request(reservation)
+
+    assert driver.reserve_request(["TEST123"], wait=True, max_wait=0.1).reserved
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_be_able_to_fetch_the_status_of_many_realms_at_once():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    driver.register_realm("TEST123", max_requests=10, timespan=5)
+    driver.register_realm("TEST234", max_requests=1, timespan=5)
+
+    driver.get("http://google.com", realms=["TEST123", "TEST234"])
+
+    status = driver.realms_status()
+
+    assert status["TEST123"] == {"used": 1, "remaining": 9, "queued": 0, "retry_after": 0, "window": (10, 5)}
+    assert status["TEST234"]["used"] == 1
+    assert status["TEST234"]["remaining"] == 0
+    assert 0 < status["TEST234"]["retry_after"] <= 5
+
+    assert list(driver.realms_status(["TEST123"]).keys()) == ["TEST123"]
+
+    driver.unregister_realms(["TEST123", "TEST234"])
+
+
+def test_the_instance_should_enforce_every_window_of_a_realm():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend())
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST123", max_requests=10, timespan=300, windows=[(2, 0)])
+
+    driver.register_realm("TEST123", max_requests=10, timespan=300, windows=[(2, 5)])
+
+    assert driver.realm_windows("TEST123") == [(2, 5)]
+
+    driver.get("http://google.com", realms=["TEST123"])
+    driver.get("http://google.com", realms=["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError) as e:
+        driver.get("http://google.com", realms=["TEST123"])
+
+    assert e.value.windows == {"TEST123": (2, 5)}
+    assert 0 < e.value.retry_after <= 5
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_adapt_the_rate_of_adaptive_realms_from_the_throttle_detector():
+    throttled = list()
+
+    driver = RespectfulWebdriver(
+        webdriver=webdriver,
+        backend=MemoryBackend(),
+        throttle_detector=lambda webdriver, load_seconds: len(throttled) > 0
+    )
+
+    driver.register_realm("TEST123", max_requests=10, timespan=5, min_requests=2)
+
+    assert driver.realm_min_requests("TEST123") == 2
+    assert driver.realm_current_max_requests("TEST123") == 2
+    assert driver.adapt_rates(["TEST123"], False) == {"TEST123": 2.5}
+
+    driver.get("http://google.com", realms=["TEST123"])
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver.realm_current_max_requests("TEST123") == 3
+
+    throttled.append(True)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    assert driver.realm_current_max_requests("TEST123") == 2
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.register_realm("TEST234", max_requests=10, timespan=5, min_requests=20)
+
+    for min_requests in [0, -1, 20, 2.5]:
+        with pytest.raises(SeleniumRespectfulError):
+            driver.update_realm("TEST123", min_requests=min_requests)
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.update_realm("TEST123", max_requests=4, min_requests=5)
+
+    driver.update_realm("TEST123", min_requests=10)
+
+    assert driver.realm_min_requests("TEST123") == 10
+
+    with pytest.raises(SeleniumRespectfulError):
+        driver.update_realm("TEST123", max_requests=5)
+
+    driver.update_realm("TEST123", max_requests=20)
+
+    assert driver.realm_max_requests("TEST123") == 20
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_serve_repeated_navigations_from_its_page_cache():
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend(), page_cache=PageCache(ttl=60))
+
+    driver.register_realm("TEST123", max_requests=1, timespan=5)
+
+    page_result = driver.get("http://google.com", realms=["TEST123"])
+
+    assert not page_result.from_cache
+    assert page_result.page_source
+
+    page_result = driver.get("http://GOOGLE.com/", realms=["TEST123"])
+
+    assert page_result.from_cache
+    assert page_result.realms == ["TEST123"]
+    assert driver._requests_in_timespan("TEST123") == 1
+
+    driver.unregister_realm("TEST123")
+
+
+def test_the_instance_should_report_limiter_and_browser_metrics():
+    metrics = PrometheusMetricsSink()
+
+    driver = RespectfulWebdriver(webdriver=webdriver, backend=MemoryBackend(), metrics=metrics)
+    driver.register_realm("TEST123", max_requests=1, timespan=5)
+
+    driver.get("http://google.com", realms=["TEST123"])
+
+    with pytest.raises(SeleniumRespectfulRateLimitedError):
+        driver.get("http://google.com", realms=["TEST123"], wait=True, max_wait=1)
+
+    lines = metrics.render().splitlines()
+
+    assert 'selenium_respectful_decisions_total{decision="allowed",realm="TEST123"} 1' in lines
+    assert 'selenium_respectful_decisions_total{decision="rejected",realm="TEST123"} 1' in lines
+    assert 'selenium_respectful_limiter_round_trips_total{operation="reserve"} 2' in lines
+    assert "selenium_respectful_get_seconds_count 1" in lines
+    assert "selenium_respectful_wait_seconds_count 1" in lines
+
+    driver.unregister_realm("TEST123")
+
+
 def test_the_instance_should_recognize_the_webdriver_proxy_methods():
     driver = RespectfulWebdriver(webdriver=webdriver)
 
@@ -0,0 +1,130 @@
+# -*- coding: utf-8 -*-
+import pytest
+
+from selenium_respectful import RespectfulWebdriver, RespectfulWebdriverPool
+from selenium_respectful import SeleniumRespectfulError, SeleniumRespectfulRateLimitedError
+
+from selenium.webdriver.phantomjs.webdriver import WebDriver
+
+import threading
+
+
+# Tests
+def test_the_pool_should_pre_start_its_webdrivers_with_a_shared_backend():
+    with RespectfulWebdriverPool(WebDriver, size=2) as pool:
+        assert pool._idle.qsize() == 2
+
+        with pool.lease() as driver:
+            with pool.lease() as other_driver:
+                assert isinstance(driver, RespectfulWebdriver)
+                assert driver is not other_driver
+                assert driver.backend is other_driver.backend is pool.backend
+
+
+def test_the_pool_should_perform_the_request_on_a_leased_webdriver_if_it_is_allowed_to():
+    with RespectfulWebdriverPool(WebDriver, size=1) as pool:
+        with pool.lease() as driver:
+            driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+        with pool.get("http://google.com", realms=["TEST123"]) as driver:
+            assert driver.find_element_by_tag_name("body") is not None
+
+        assert pool._idle.qsize() == 1
+
+        with pool.lease() as driver:
+            driver.unregister_realm("TEST123")
+
+
+def test_the_pool_should_not_lease_a_webdriver_if_the_request_is_not_allowed():
+    with RespectfulWebdriverPool(WebDriver, size=1) as pool:
+        with pool.lease() as driver:
+            driver.register_realm("TEST123", max_requests=0, timespan=5)
+
+        with pytest.raises(SeleniumRespectfulRateLimitedError):
+            with pool.get("http://google.com", realms=["TEST123"]):
+                pass
+
+        assert pool._idle.qsize() == 1
+
+        with pool.lease() as driver:
+            driver.unregister_realm("TEST123")
+
+
+def test_the_pool_should_recycle_webdrivers_after_their_max_uses():
+    started = list()
+
+    def webdriver_factory():
+        started.append(WebDriver())
+        return started[-1]
+
+    with RespectfulWebdriverPool(webdriver_factory, size=1, max_uses=2) as pool:
+        with pool.lease():
+            pass
+
+        with pool.lease():
+            pass
+
+        with pool.lease() as driver:
+            assert driver.webdriver is started[-1]
+
+    assert len(started) == 2
+
+
+def test_the_pool_should_replace_unhealthy_webdrivers():
+    started = list()
+
+    def webdriver_factory():
+        started.append(WebDriver())
+        return started[-1]
+
+    with RespectfulWebdriverPool(webdriver_factory, size=1, health_check=lambda webdriver: False) as pool:
+        with pool.lease() as driver:
+            assert driver.webdriver is started[-1]
+
+    assert len(started) == 2
+
+
+def test_the_pool_should_raise_if_no_webdriver_is_released_in_time():
+    with RespectfulWebdriverPool(WebDriver, size=1) as pool:
+        with pool.lease():
+            with pytest.raises(SeleniumRespectfulError):
+                with pool.lease(timeout=0.1):
+                    pass
+
+
+def test_the_pool_should_not_reserve_a_request_while_no_webdriver_is_released():
+    with RespectfulWebdriverPool(WebDriver, size=1) as pool:
+        with pool.lease() as driver:
+            driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+            assert driver is not pool._limiter
+
+            with pytest.raises(SeleniumRespectfulError):
+                with pool.get("http://google.com", realms=["TEST123"], lease_timeout=0.1):
+                    pass
+
+            assert driver._requests_in_timespan("TEST123") == 0
+
+            driver.unregister_realm("TEST123")
+
+
+def test_the_pool_should_share_its_webdrivers_between_threads():
+    with RespectfulWebdriverPool(WebDriver, size=2) as pool:
+        with pool.lease() as driver:
+            driver.register_realm("TEST123", max_requests=1000, timespan=5)
+
+        results = list()
+
+        def get():
+            with pool.get("http://google.com", realms=["TEST123"], wait=True) as driver:
+                results.append(driver.find_element_by_tag_name("body") is not None)
+
+        threads = [threading.Thread(target=get) for _ in range(4)]
+
+        [thread.start() for thread in threads]
+        [thread.join() for thread in threads]
+
+        assert results == [True] * 4
+
+        with pool.lease() as driver:
+            driver.unregister_realm("TEST123")